@@ -3,8 +3,14 @@ API Package for FitFuel Backend
 Contains route definitions and API schemas
 """
 
+import asyncio
 from fastapi import FastAPI
-from .routes import auth, menu, statistics, watch_data
+from .routes import auth, debug, meals, menu, statistics, watch_data
+from ..config import settings
+from ..database.cache import get_cache
+from ..database.connection import SessionLocal, engine
+from ..database.partitions import partition_maintenance_loop
+from ..services.statistics.user_stats import UserStatsCounters, user_stats_flush_loop
 
 def init_app() -> FastAPI:
     app = FastAPI(title="FitFuel API")
@@ -12,7 +18,41 @@ def init_app() -> FastAPI:
     # Register routes
     app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
     app.include_router(menu.router, prefix="/menu", tags=["Menu"])
+    app.include_router(meals.router, prefix="/meals", tags=["Meals"])
     app.include_router(statistics.router, prefix="/statistics", tags=["Statistics"])
     app.include_router(watch_data.router, prefix="/watch-data", tags=["Watch Data"])
+    if settings.DEBUG_ENDPOINTS_ENABLED:
+        app.include_router(debug.router, prefix="/debug", tags=["Debug"])
+    
+    @app.on_event("startup")
+    async def start_cache_listener():
+        await get_cache().start_invalidation_listener()
+
+    @app.on_event("startup")
+    async def start_partition_maintenance():
+        app.state.partition_maintenance = asyncio.create_task(
+            partition_maintenance_loop(engine, settings.WATCH_DATA_MAINTENANCE_INTERVAL)
+        )
+
+    @app.on_event("startup")
+    async def start_user_stats_flush():
+        app.state.user_stats_flush = asyncio.create_task(user_stats_flush_loop(
+            UserStatsCounters(get_cache()),
+            SessionLocal,
+            settings.USER_STATS_FLUSH_INTERVAL,
+            settings.USER_STATS_FLUSH_BATCH
+        ))
+
+    @app.on_event("shutdown")
+    async def close_cache():
+        # Persist counters while the cache and database are still open
+        app.state.user_stats_flush.cancel()
+        await UserStatsCounters(get_cache()).flush(SessionLocal, settings.USER_STATS_FLUSH_BATCH)
+        await get_cache().close()
+
+    @app.on_event("shutdown")
+    async def close_database():
+        app.state.partition_maintenance.cancel()
+        await engine.dispose()
     
     return app 
\ No newline at end of file
@@ -0,0 +1,18 @@
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from ..database import get_db
+from ..database.models import User
+from ..services.auth import AuthService
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)) -> User:
+    """Get the user the request's bearer token was issued to"""
+    user = await AuthService(db).get_user_from_token(token)
+    if user is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired access token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user
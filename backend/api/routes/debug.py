@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from typing import Dict
+from ...database.cache import RedisCache, get_cache
+
+router = APIRouter()
+
+@router.get("/cache")
+async def get_cache_stats(cache: RedisCache = Depends(get_cache)) -> Dict:
+    """Get cache hit ratios, payload sizes and latency per key namespace"""
+    return {
+        "healthy": await cache.health_check(),
+        **cache.get_stats()
+    }
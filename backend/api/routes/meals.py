@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict
+from ..dependencies import get_current_user
+from ..schemas import MealLogBatch
+from ...config import settings
+from ...database import get_db
+from ...database.cache import RedisCache, get_cache
+from ...database.models import User
+from ...services.statistics import MealTracker
+
+router = APIRouter()
+
+@router.post("/bulk")
+async def track_meals_bulk(
+    batch: MealLogBatch,
+    user: User = Depends(get_current_user),
+    db=Depends(get_db),
+    cache: RedisCache = Depends(get_cache)
+) -> Dict:
+    """Track meals queued offline; safe to retry with the same idempotency keys"""
+    if len(batch.meals) > settings.MEAL_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.MEAL_BULK_MAX_SIZE} meals per upload"
+        )
+
+    result = await MealTracker(db, cache).track_meals_bulk(
+        user.id,
+        [meal.model_dump() for meal in batch.meals]
+    )
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from datetime import datetime
 
@@ -22,4 +22,16 @@ class MealBase(BaseModel):
     
 class MealCreate(MealBase):
     meal_type: str
-    scheduled_time: datetime 
\ No newline at end of file
+    scheduled_time: datetime 
+class MealLog(BaseModel):
+    idempotency_key: str = Field(..., min_length=1, max_length=64)
+    meal_type: str
+    consumed_at: datetime
+    location: str = "home"
+    items: List[str] = []
+    nutritional_info: Dict = {}
+    image_url: Optional[str] = None
+    expected_meal: Optional[Dict] = None
+
+class MealLogBatch(BaseModel):
+    meals: List[MealLog]
@@ -0,0 +1,4 @@
+"""
+Benchmarks Package
+Standalone micro-benchmarks, run with ``python -m backend.benchmarks.<name>``
+"""
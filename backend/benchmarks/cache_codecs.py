@@ -0,0 +1,77 @@
+from typing import Callable, Dict, List
+import random
+import time
+import numpy as np
+from ..database.codecs import ValueSerializer, available_codecs, zstandard, lz4_frame
+
+def make_vision_results(count: int = 50, seed: int = 7) -> List[Dict]:
+    """Build vision results shaped like VisionManager's cached values"""
+    rng = np.random.default_rng(seed)
+    results = []
+    for i in range(count):
+        if i % 2 == 0:
+            # CLIP: one float32 image embedding
+            results.append({
+                "model": "clip",
+                "category": random.choice(["meal", "snack", "drink"]),
+                "confidence": float(rng.random()),
+                "embeddings": rng.standard_normal((1, 512)).astype(np.float32).tolist()
+            })
+        else:
+            # Generative models: decoded text plus generated token ids
+            tokens = rng.integers(0, 32000, size=(1, 256)).tolist()
+            results.append({
+                "model": "idefics",
+                "description": "A plate of grilled chicken with rice and steamed broccoli.",
+                "confidence": float(rng.random()),
+                "raw_outputs": tokens
+            })
+    return results
+
+def time_per_call(fn: Callable, values: List, repeat: int) -> float:
+    """Get mean microseconds per call of fn over values"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for value in values:
+            fn(value)
+    return (time.perf_counter() - start) / (repeat * len(values)) * 1e6
+
+def run(repeat: int = 20) -> List[Dict]:
+    values = make_vision_results()
+    compressions = [None]
+    if zstandard is not None:
+        compressions.append("zstd")
+    if lz4_frame is not None:
+        compressions.append("lz4")
+
+    baseline = ValueSerializer(codec="json")
+    baseline_size = sum(len(baseline.dumps(v)) for v in values)
+
+    rows = []
+    for codec in available_codecs():
+        for compression in compressions:
+            serializer = ValueSerializer(codec=codec, compression=compression)
+            encoded = [serializer.dumps(v) for v in values]
+            assert [serializer.loads(e) for e in encoded] == values
+
+            size = sum(len(e) for e in encoded)
+            rows.append({
+                "codec": codec,
+                "compression": compression or "none",
+                "bytes": size,
+                "ratio": baseline_size / size,
+                "encode_us": time_per_call(serializer.dumps, values, repeat),
+                "decode_us": time_per_call(serializer.loads, encoded, repeat)
+            })
+    return rows
+
+def main() -> None:
+    print(f"{'codec':<8} {'compression':<12} {'bytes':>9} {'x json':>7} {'encode us':>10} {'decode us':>10}")
+    for row in run():
+        print(
+            f"{row['codec']:<8} {row['compression']:<12} {row['bytes']:>9} "
+            f"{row['ratio']:>7.2f} {row['encode_us']:>10.1f} {row['decode_us']:>10.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
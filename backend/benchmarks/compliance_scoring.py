@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional, Tuple
+import random
+import time
+import numpy as np
+from ..services.statistics.compliance_scoring import ComplianceScorer
+from ..services.statistics.meal_tracker import MealTracker
+
+PAIRS = 100_000
+INGREDIENTS = [f"ingredient_{i}" for i in range(2000)]
+NUTRIENTS = ["protein", "carbs", "fats", "fiber", "calories", "sugar", "sodium"]
+
+def synthetic_pairs(pairs: int = PAIRS, seed: int = 5) -> Tuple[List[Dict], List[Optional[Dict]]]:
+    """Meals and expected meals with overlapping ingredients and shuffled nutrient keys"""
+    rng = random.Random(seed)
+    actual, expected = [], []
+    for _ in range(pairs):
+        menu_items = rng.sample(INGREDIENTS, rng.randrange(0, 8))
+        eaten = [item for item in menu_items if rng.random() < 0.7] + rng.sample(INGREDIENTS, rng.randrange(0, 3))
+        targets = {n: rng.choice([0, rng.uniform(1, 80), rng.randrange(1, 900)]) for n in rng.sample(NUTRIENTS, rng.randrange(0, 6))}
+        values = {n: rng.uniform(0, 120) for n in rng.sample(NUTRIENTS, rng.randrange(0, 7))}
+        actual.append({"items": eaten + eaten[:1], "nutritional_info": values})
+        expected.append(None if rng.random() < 0.05 else {"items": menu_items, "nutritional_info": targets})
+    return actual, expected
+
+def scalar_scores(tracker: MealTracker, actual: List[Dict], expected: List[Optional[Dict]]) -> np.ndarray:
+    """The per-meal scores MealTracker._calculate_compliance produces"""
+    scores = []
+    for meal, target in zip(actual, expected):
+        if not target:
+            scores.append(1.0)
+            continue
+        ingredient = tracker._calculate_ingredient_similarity(meal["items"], target.get("items", []))
+        nutrition = tracker._calculate_nutritional_similarity(meal["nutritional_info"], target.get("nutritional_info", {}))
+        scores.append(ingredient * 0.6 + nutrition * 0.4)
+    return np.array(scores)
+
+def run(pairs: int = PAIRS, menu_size: int = 21) -> Dict:
+    actual, expected = synthetic_pairs(pairs)
+    tracker = MealTracker(db_session=None)
+    scorer = ComplianceScorer(tracker.similarity_threshold)
+
+    start = time.perf_counter()
+    scalar = scalar_scores(tracker, actual, expected)
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = scorer.score(actual, expected)
+    batch_s = time.perf_counter() - start
+
+    # Bit-for-bit, not approximately
+    assert np.array_equal(scalar, batch["score"]), np.flatnonzero(scalar != batch["score"])[:10]
+    assert np.array_equal(scalar >= tracker.similarity_threshold, batch["is_compliant"])
+
+    # Rescoring history after a menu change: history is encoded once, the menu each time
+    history = scorer.encode(actual)
+    menu = [target for target in expected if target][:menu_size]
+    assignment = np.random.default_rng(3).integers(0, len(menu), size=pairs)
+
+    start = time.perf_counter()
+    rescored_scalar = scalar_scores(tracker, actual, [menu[i] for i in assignment])
+    rescore_scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rescored = scorer.score_encoded(history, scorer.encode(menu), assignment)
+    rescore_batch_s = time.perf_counter() - start
+
+    assert np.array_equal(rescored_scalar, rescored["score"])
+    return {
+        "pairs": pairs,
+        "scalar_s": scalar_s,
+        "batch_s": batch_s,
+        "rescore_scalar_s": rescore_scalar_s,
+        "rescore_batch_s": rescore_batch_s
+    }
+
+def main() -> None:
+    result = run()
+    print(f"{result['pairs']} pairs, scores identical to MealTracker's")
+    print(
+        f"score pairs:    scalar {result['scalar_s']:.3f} s, "
+        f"encode+score {result['batch_s']:.3f} s ({result['scalar_s'] / result['batch_s']:.1f}x)"
+    )
+    print(
+        f"rescore vs menu: scalar {result['rescore_scalar_s']:.3f} s, "
+        f"batch {result['rescore_batch_s']:.3f} s ({result['rescore_scalar_s'] / result['rescore_batch_s']:.1f}x)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+from typing import Dict, List, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import json
+import random
+import time
+import numpy as np
+import pandas as pd
+from ..services.statistics.historical_analyzer import MEAL_COLUMNS, HistoricalAnalyzer, meal_frame
+from ..services.statistics.nutrition_rollups import ADDITIVE_COLUMNS
+from ..services.statistics.trend_partials import TrendPartial, summarize_days
+from .trend_engine import legacy_labels
+
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+MEALS_PER_DAY = 6  # three main meals and three snacks
+
+def synthetic_history(days: int, seed: int = 7) -> Tuple[List[Tuple], pd.DataFrame, List[Dict]]:
+    """Meal rows as selected by _get_meal_frame, daily rollups and daily health data"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for day in range(days):
+        for i in range(MEALS_PER_DAY):
+            skipped = rng.random() < 0.05
+            rows.append((
+                start + timedelta(days=day, hours=7 + 2 * i, minutes=rng.randrange(-45, 45)),
+                MEAL_TYPES[min(i, 3)],
+                "SKIPPED" if skipped else "COMPLETED",
+                "outside" if rng.random() < 0.1 else "home",
+                None if skipped else rng.random()
+            ))
+
+    daily = pd.DataFrame([
+        {
+            "day": start + timedelta(days=day),
+            "meal_type": meal_type,
+            **{column: rng.uniform(0, 100) for column in ADDITIVE_COLUMNS}
+        }
+        for day in range(days)
+        for meal_type in MEAL_TYPES
+    ])
+    health = [
+        {
+            "scheduled_time": start + timedelta(days=day),
+            "steps": rng.randrange(2000, 15000),
+            "sleep_duration": rng.randrange(300, 540)
+        }
+        for day in range(days)
+    ]
+    return rows, daily, health
+
+def legacy_best_days(df: pd.DataFrame) -> List[Dict]:
+    """_find_best_compliance_days as it was: a day-name groupby, then a strftime rescan per day"""
+    best_days = df.groupby(df['scheduled_time'].dt.strftime('%A'))[
+        'compliance_score'
+    ].mean().sort_values(ascending=False)
+
+    def confidence(day: str) -> float:
+        day_data = df[df['scheduled_time'].dt.strftime('%A') == day]
+        if len(day_data) < 3:
+            return 0.5
+        std_dev = day_data['compliance_score'].std()
+        return max(0.1, min(1.0, (1 - std_dev) * (1 - 1 / len(day_data))))
+
+    return [
+        {"day": day, "average_score": float(score), "confidence": confidence(day)}
+        for day, score in best_days.items()
+    ]
+
+def legacy_challenging_meals(df: pd.DataFrame) -> List[Dict]:
+    """_identify_challenging_meals as it was, built with iterrows"""
+    problem_meals = df[df['compliance_score'] < 0.7].groupby('meal_type').agg({
+        'compliance_score': ['count', 'mean']
+    }).reset_index()
+    return [
+        {
+            # Selecting from the two-level columns gave a one-element Series
+            "meal_type": row['meal_type'].iloc[0],
+            "frequency": row['compliance_score']['count'],
+            "avg_score": row['compliance_score']['mean']
+        }
+        for _, row in problem_meals.iterrows()
+    ]
+
+def legacy_time_consistency(df: pd.DataFrame) -> Dict:
+    """_analyze_time_consistency as it was, built with iterrows"""
+    time_variance = df.groupby('meal_type')['hour'].agg(['std', 'mean'])
+    return {
+        meal_type: {
+            "consistency_score": max(0, 1 - std / 24),
+            "typical_time": f"{int(mean):02d}:00"
+        }
+        for meal_type, (std, mean) in time_variance.iterrows()
+    }
+
+def legacy_energy_correlation(analyzer: HistoricalAnalyzer, df: pd.DataFrame) -> Dict:
+    """_correlate_with_energy as it was, masking the frame once per meal type"""
+    energy_impact = {}
+    for meal_type in df['meal_type'].unique():
+        meal_data = df[df['meal_type'] == meal_type]
+        if len(meal_data) > 0:
+            correlation = np.corrcoef(meal_data['compliance_score'], meal_data['energy_level'])[0, 1]
+            energy_impact[meal_type] = {
+                "correlation": float(correlation),
+                "impact_level": analyzer._categorize_correlation(correlation)
+            }
+    return energy_impact
+
+def legacy_pipeline(analyzer: HistoricalAnalyzer, meals: List[Dict], weeks: pd.DataFrame, health: List[Dict]) -> Dict:
+    """The analyses as they ran before the shared frame: one DataFrame per analysis, in turn"""
+    df = pd.DataFrame(meals)
+    weekly = df.groupby(pd.Grouper(key='scheduled_time', freq='W'))['compliance_score'].mean()
+    compliance = {
+        "weekly_scores": weekly.to_dict(),
+        "overall_trend": legacy_labels(weekly.to_numpy()[None])[0],
+        "best_days": legacy_best_days(df),
+        "challenging_meals": legacy_challenging_meals(df)
+    }
+
+    nutrition = analyzer._analyze_nutritional_trends(weeks, TrendPartial.of_summary(weeks))
+
+    df = pd.DataFrame(meals)
+    df['hour'] = df['scheduled_time'].dt.hour
+    df['day_of_week'] = df['scheduled_time'].dt.day_name()
+    timing = legacy_time_consistency(df)
+
+    meal_df = pd.DataFrame(meals).sort_values('scheduled_time')
+    merged = pd.merge_asof(
+        meal_df, pd.DataFrame(health), on='scheduled_time',
+        direction='backward', tolerance=pd.Timedelta(days=1)
+    )
+    return {"compliance": compliance, "nutrition": nutrition, "timing": timing, "merged": len(merged)}
+
+async def frame_pipeline(analyzer: HistoricalAnalyzer, rows: List[Tuple], weeks: pd.DataFrame, health: List[Dict]) -> Dict:
+    """The same analyses over one meal frame, run side by side as _compute_trends does"""
+    meals = meal_frame(rows)
+    weekdays = analyzer._weekday_stats(meals)
+    trends = TrendPartial.of_summary(weeks)
+
+    def merged() -> int:
+        return len(pd.merge_asof(
+            meals, pd.DataFrame(health), on='scheduled_time',
+            direction='backward', tolerance=pd.Timedelta(days=1)
+        ))
+
+    results = await asyncio.gather(
+        asyncio.to_thread(analyzer._analyze_compliance_trends, meals, weekdays, weeks, trends),
+        asyncio.to_thread(analyzer._analyze_nutritional_trends, weeks, trends),
+        asyncio.to_thread(analyzer._analyze_time_consistency, meals),
+        asyncio.to_thread(merged)
+    )
+    return dict(zip(("compliance", "nutrition", "timing", "merged"), results))
+
+def check_equal(legacy: Dict, frame: Dict) -> None:
+    """The frame pipeline must reproduce the legacy results.
+
+    Weekly compliance now comes from the rollups rather than the meals;
+    benchmarks/trend_partials.py checks it against the batch computation.
+    """
+    expected, actual = legacy["compliance"], frame["compliance"]
+    assert expected["best_days"] == actual["best_days"]
+    assert expected["challenging_meals"] == actual["challenging_meals"]
+    assert legacy["timing"] == frame["timing"]
+    assert legacy["merged"] == frame["merged"]
+
+def run(day_counts=(30, 365), repeat: int = 5) -> List[Dict]:
+    analyzer = HistoricalAnalyzer(None, None, None, None)
+    results = []
+    for days in day_counts:
+        rows, daily, health = synthetic_history(days)
+        weeks = summarize_days(daily)
+        # What Meal.to_dict used to hand the analyzer, newest first
+        meals = [dict(zip(MEAL_COLUMNS, row)) for row in reversed(rows)]
+
+        check_equal(
+            legacy_pipeline(analyzer, meals, weeks, health),
+            asyncio.run(frame_pipeline(analyzer, rows, weeks, health))
+        )
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            legacy_pipeline(analyzer, meals, weeks, health)
+        legacy_ms = (time.perf_counter() - start) / repeat * 1000
+
+        async def timed() -> float:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                await frame_pipeline(analyzer, rows, weeks, health)
+            return (time.perf_counter() - start) / repeat * 1000
+
+        results.append({
+            "days": days,
+            "meals": len(rows),
+            "legacy_ms": legacy_ms,
+            "frame_ms": asyncio.run(timed())
+        })
+    return results
+
+def run_weekdays(meal_count: int = 100_000, repeat: int = 5) -> Dict:
+    """Time best-day statistics over meal_count meals, legacy vs one grouped pass"""
+    analyzer = HistoricalAnalyzer(None, None, None, None)
+    rows, _, _ = synthetic_history(meal_count // MEALS_PER_DAY)
+    meals = meal_frame(rows)
+    legacy_input = pd.DataFrame(meals[list(MEAL_COLUMNS)])
+
+    assert legacy_best_days(legacy_input) == analyzer._find_best_compliance_days(analyzer._weekday_stats(meals))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy_best_days(legacy_input)
+    legacy_ms = (time.perf_counter() - start) / repeat * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        analyzer._find_best_compliance_days(analyzer._weekday_stats(meals))
+    grouped_ms = (time.perf_counter() - start) / repeat * 1000
+
+    return {"meals": len(rows), "legacy_ms": legacy_ms, "grouped_ms": grouped_ms}
+
+def run_hot_spots(meal_count: int = 100_000, repeat: int = 5) -> List[Dict]:
+    """Time each rewritten analysis over meal_count meals against its old version"""
+    analyzer = HistoricalAnalyzer(None, None, None, None)
+    rows, _, _ = synthetic_history(meal_count // MEALS_PER_DAY)
+    meals = meal_frame(rows)
+    rng = np.random.default_rng(3)
+    # Energy loosely following compliance, so correlations are not all zero
+    meals['energy_level'] = meals['compliance_score'].fillna(0.5) * 4 + rng.normal(0, 1, len(meals))
+
+    paths = [
+        ("challenging meals", legacy_challenging_meals, analyzer._identify_challenging_meals),
+        ("time consistency", legacy_time_consistency, analyzer._analyze_time_consistency),
+        (
+            "energy correlation",
+            lambda df: legacy_energy_correlation(analyzer, df),
+            analyzer._correlate_with_energy
+        )
+    ]
+    results = []
+    for name, legacy, current in paths:
+        # Through JSON, so NaN correlations compare equal
+        assert json.dumps(legacy(meals)) == json.dumps(current(meals)), name
+        timings = []
+        for analysis in (legacy, current):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                analysis(meals)
+            timings.append((time.perf_counter() - start) / repeat * 1000)
+        results.append({"path": name, "legacy_ms": timings[0], "current_ms": timings[1]})
+    return results
+
+def main() -> None:
+    print("Analysis latency after the queries, legacy vs shared frame")
+    print(f"{'days':>6} {'meals':>7} {'legacy':>11} {'frame':>11} {'speedup':>8}")
+    for row in run():
+        print(
+            f"{row['days']:>6} {row['meals']:>7} {row['legacy_ms']:>8.2f} ms "
+            f"{row['frame_ms']:>8.2f} ms {row['legacy_ms'] / row['frame_ms']:>7.1f}x"
+        )
+
+    row = run_weekdays()
+    print(f"\nBest compliance days over {row['meals']} meals")
+    print(
+        f"strftime rescans {row['legacy_ms']:.2f} ms, one weekday groupby {row['grouped_ms']:.2f} ms, "
+        f"{row['legacy_ms'] / row['grouped_ms']:.1f}x"
+    )
+
+    print(f"\nRewritten analyses over {run_weekdays.__defaults__[0]} meals")
+    print(f"{'path':>20} {'legacy':>11} {'current':>11} {'speedup':>8}")
+    for row in run_hot_spots():
+        print(
+            f"{row['path']:>20} {row['legacy_ms']:>8.2f} ms {row['current_ms']:>8.2f} ms "
+            f"{row['legacy_ms'] / row['current_ms']:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from typing import Dict, List, Tuple
+from datetime import datetime, timedelta
+import random
+import time
+from sqlalchemy import and_, create_engine, insert, or_, select, text
+from sqlalchemy.dialects import sqlite
+from ..database.connection import Base
+from ..database.models import Meal, MealRecord, MealStatus, MealType, Menu, WatchData
+from ..services.statistics.historical_analyzer import MEAL_COLUMNS, meal_column
+from ..services.statistics.meal_stream import STREAM_COLUMNS
+
+USERS = 200
+ROWS_PER_USER = 500
+
+def seed(conn, users: int = USERS, rows_per_user: int = ROWS_PER_USER, seed: int = 7) -> None:
+    """Fill the history tables with interleaved per-user rows"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    conn.execute(insert(Base.metadata.tables["users"]), [
+        {"id": user_id, "email": f"user{user_id}@example.com", "hashed_password": "x"}
+        for user_id in range(1, users + 1)
+    ])
+    meals, records, watch, menus = [], [], [], []
+    for i in range(rows_per_user):
+        for user_id in range(1, users + 1):
+            at = start + timedelta(hours=8 * i, minutes=rng.randrange(60))
+            records.append({"user_id": user_id, "meal_type": "lunch", "consumed_at": at})
+            meals.append({
+                "user_id": user_id,
+                "meal_type": MealType.LUNCH,
+                "status": MealStatus.COMPLETED,
+                "scheduled_time": at.replace(minute=0),
+                # Meals logged without a plan have only consumed_at
+                "consumed_at": at if i % 3 else None,
+                "compliance_score": rng.random()
+            })
+            watch.append({"user_id": user_id, "device_type": "FITBIT", "timestamp": at, "steps": rng.randrange(20000)})
+            if i % 7 == 0:
+                menus.append({"user_id": user_id, "meals": [], "created_at": at})
+    conn.execute(insert(Meal.__table__), meals)
+    conn.execute(insert(MealRecord.__table__), records)
+    conn.execute(insert(WatchData.__table__), watch)
+    conn.execute(insert(Menu.__table__), menus)
+    conn.execute(text("ANALYZE"))
+
+def history_queries(user_id: int) -> Dict[str, Tuple[object, str]]:
+    """The per-user history queries the services issue, with the index each must use"""
+    since = datetime(2024, 3, 1)
+    until = since + timedelta(days=30)
+    return {
+        "meal frame": (
+            select(*[meal_column(column) for column in MEAL_COLUMNS]).where(
+                Meal.user_id == user_id,
+                Meal.occurred_at.between(since, until)
+            ).order_by(Meal.occurred_at),
+            "ix_meals_user_id_occurred_at"
+        ),
+        "meal stream page": (
+            select(Meal.id, *[meal_column(column) for column in STREAM_COLUMNS]).where(
+                Meal.user_id == user_id,
+                Meal.occurred_at.between(since, until),
+                or_(
+                    Meal.occurred_at > since + timedelta(days=10),
+                    and_(Meal.occurred_at == since + timedelta(days=10), Meal.id > 1000)
+                )
+            ).order_by(Meal.occurred_at, Meal.id).limit(500),
+            "ix_meals_user_id_occurred_at"
+        ),
+        "meal history": (
+            select(MealRecord).where(
+                MealRecord.user_id == user_id,
+                MealRecord.consumed_at >= since
+            ).order_by(MealRecord.consumed_at.desc()),
+            "ix_meal_records_user_id_consumed_at"
+        ),
+        "recent meals": (
+            select(MealRecord).where(
+                MealRecord.user_id == user_id
+            ).order_by(MealRecord.consumed_at.desc()).limit(30),
+            "ix_meal_records_user_id_consumed_at"
+        ),
+        "health data": (
+            select(WatchData).where(
+                WatchData.user_id == user_id,
+                WatchData.timestamp.between(since, since + timedelta(days=30))
+            ).order_by(WatchData.timestamp),
+            "ix_watch_data_user_id_timestamp"
+        ),
+        "latest menu": (
+            select(Menu).where(
+                Menu.user_id == user_id
+            ).order_by(Menu.created_at.desc()).limit(1),
+            "ix_menus_user_id_created_at"
+        ),
+    }
+
+def create_history(conn, **kwargs) -> None:
+    """Create and seed the history tables"""
+    Base.metadata.create_all(conn, tables=[
+        Base.metadata.tables[name] for name in ("users", "meals", "meal_records", "watch_data", "menus")
+    ])
+    seed(conn, **kwargs)
+
+def explain(conn, query) -> List[str]:
+    compiled = query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+def check_plan(name: str, plan: List[str], index: str) -> None:
+    """A history query must seek its composite index and must not sort separately"""
+    assert any(index in step for step in plan), f"{name} does not use {index}: {plan}"
+    assert not any("TEMP B-TREE" in step for step in plan), f"{name} sorts in memory: {plan}"
+
+def run(repeat: int = 200) -> List[Dict]:
+    engine = create_engine("sqlite://")
+    rows = []
+    with engine.begin() as conn:
+        create_history(conn)
+
+        for name, (query, index) in history_queries(user_id=USERS // 2).items():
+            plan = explain(conn, query)
+            check_plan(name, plan, index)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(query).fetchall()
+            rows.append({
+                "query": name,
+                "plan": " | ".join(plan),
+                "ms": (time.perf_counter() - start) / repeat * 1000
+            })
+    return rows
+
+def main() -> None:
+    print(f"{USERS * ROWS_PER_USER} rows per history table")
+    for row in run():
+        print(f"{row['query']:<16} {row['ms']:>7.3f} ms  {row['plan']}")
+
+if __name__ == "__main__":
+    main()
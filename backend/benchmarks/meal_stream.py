@@ -0,0 +1,123 @@
+from typing import Any, Dict, List
+from datetime import datetime, timedelta
+import asyncio
+import math
+import random
+import time
+import tracemalloc
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from ..database.connection import Base
+from ..database.models import Meal, MealStatus, MealType, User
+from ..services.statistics.historical_analyzer import HistoricalAnalyzer
+
+MEALS_PER_DAY = 6  # three main meals and three snacks
+MEAL_TYPES = (MealType.BREAKFAST, MealType.LUNCH, MealType.DINNER, MealType.SNACK)
+FIRST_DAY = datetime(2019, 1, 1)
+
+def synthetic_meals(days: int, seed: int = 17) -> List[Dict]:
+    rng = random.Random(seed)
+    rows = []
+    for day in range(days):
+        for i in range(MEALS_PER_DAY):
+            skipped = rng.random() < 0.05
+            rows.append({
+                "user_id": 1,
+                "meal_type": MEAL_TYPES[min(i, 3)],
+                "status": MealStatus.SKIPPED if skipped else MealStatus.COMPLETED,
+                "location": "home",
+                "scheduled_time": FIRST_DAY + timedelta(days=day, hours=7 + 2 * i, minutes=rng.randrange(-45, 45)),
+                "compliance_score": None if skipped else rng.random()
+            })
+    return rows
+
+def frame_analyses(analyzer: HistoricalAnalyzer, meals) -> Dict:
+    weekdays = analyzer._weekday_stats(meals)
+    return {
+        "best_days": analyzer._find_best_compliance_days(weekdays),
+        "weekend_vs_weekday": analyzer._compare_weekend_weekday(weekdays),
+        "challenging_meals": analyzer._identify_challenging_meals(meals),
+        "meal_time_consistency": analyzer._analyze_time_consistency(meals),
+        "preferred_times": analyzer._identify_preferred_times(meals)
+    }
+
+def stream_analyses(analyzer: HistoricalAnalyzer, aggregates) -> Dict:
+    weekdays = aggregates.weekday_stats()
+    return {
+        "best_days": analyzer._find_best_compliance_days(weekdays),
+        "weekend_vs_weekday": analyzer._compare_weekend_weekday(weekdays),
+        "challenging_meals": aggregates.challenging_meals(),
+        "meal_time_consistency": aggregates.time_consistency(),
+        "preferred_times": aggregates.preferred_times()
+    }
+
+def check_close(expected: Any, actual: Any, path: str = "") -> None:
+    """Compare nested results, floats up to rounding of the running sums"""
+    if isinstance(expected, dict):
+        assert expected.keys() == actual.keys(), path
+        for key in expected:
+            check_close(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual), path
+        for i, (left, right) in enumerate(zip(expected, actual)):
+            check_close(left, right, f"{path}[{i}]")
+    elif isinstance(expected, float):
+        assert math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-12), (path, expected, actual)
+    else:
+        assert expected == actual, (path, expected, actual)
+
+async def measure(analyzer: HistoricalAnalyzer, user: User, days: int, streaming: bool) -> Dict:
+    start, end = FIRST_DAY, FIRST_DAY + timedelta(days=days)
+    tracemalloc.start()
+    started = time.perf_counter()
+    if streaming:
+        results = stream_analyses(analyzer, await analyzer._aggregate_meals(user, start, end))
+    else:
+        results = frame_analyses(analyzer, await analyzer._get_meal_frame(user, start, end))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"results": results, "ms": elapsed_ms, "peak_mb": peak / 2 ** 20}
+
+async def run_async(years=(1, 5, 10)) -> List[Dict]:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=[
+            User.__table__, Meal.__table__
+        ]))
+        await conn.execute(insert(User.__table__), [{"id": 1, "email": "user@example.com", "hashed_password": "x"}])
+        await conn.execute(insert(Meal.__table__), synthetic_meals(365 * max(years) + 3))
+
+    results = []
+    async with AsyncSession(engine) as db:
+        analyzer = HistoricalAnalyzer(db, None, None, None)
+        user = await db.get(User, 1)
+        for span in years:
+            days = 365 * span
+            frame = await measure(analyzer, user, days, streaming=False)
+            stream = await measure(analyzer, user, days, streaming=True)
+            check_close(frame["results"], stream["results"])
+            results.append({
+                "years": span,
+                "meals": days * MEALS_PER_DAY,
+                "frame_ms": frame["ms"],
+                "frame_mb": frame["peak_mb"],
+                "stream_ms": stream["ms"],
+                "stream_mb": stream["peak_mb"]
+            })
+    await engine.dispose()
+    return results
+
+def main() -> None:
+    print(f"Meal analyses at {MEALS_PER_DAY} meals/day, peak traced memory")
+    print(f"{'years':>5} {'meals':>7} {'frame':>20} {'streamed':>20}")
+    for row in asyncio.run(run_async()):
+        print(
+            f"{row['years']:>5} {row['meals']:>7} "
+            f"{row['frame_mb']:>7.2f} MB {row['frame_ms']:>6.0f} ms "
+            f"{row['stream_mb']:>7.2f} MB {row['stream_ms']:>6.0f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from typing import Dict, List
+from datetime import date, datetime, timedelta
+import random
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert, select
+from ..database.connection import Base
+from ..database.models import DailyNutritionRollup
+from ..database.upsert import accumulate
+
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+MEALS_PER_DAY = 6  # three main meals and three snacks
+PASS_SCORE = 0.8
+NUTRIENTS = ["protein", "carbs", "fats", "fiber", "calories"]
+
+def synthetic_meals(days: int, seed: int = 11) -> List[Dict]:
+    """Meals shaped like the analyzer's flattened Meal.to_dict rows"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    meals = []
+    for day in range(days):
+        for i in range(MEALS_PER_DAY):
+            meals.append({
+                "scheduled_time": start + timedelta(days=day, hours=7 + 2 * i),
+                "meal_type": MEAL_TYPES[min(i, 3)],
+                "location": "outside" if rng.random() < 0.1 else "home",
+                "status": "SKIPPED" if rng.random() < 0.05 else "COMPLETED",
+                "compliance_score": rng.random(),
+                "nutrition.protein": rng.uniform(5, 40),
+                "nutrition.carbs": rng.uniform(10, 90),
+                "nutrition.fats": rng.uniform(2, 30),
+                "nutrition.fiber": rng.uniform(0, 10),
+                "nutrition.calories": rng.uniform(100, 900)
+            })
+    return meals
+
+def rollup_row(meal: Dict) -> Dict:
+    """The contribution NutritionRollupService.record writes for a meal"""
+    skipped = meal["status"] == "SKIPPED"
+    score = None if skipped else meal["compliance_score"]
+    row = {
+        "user_id": 1,
+        "day": meal["scheduled_time"].date(),
+        "meal_type": meal["meal_type"],
+        "meal_count": 0 if skipped else 1,
+        "skipped_count": 1 if skipped else 0,
+        "outside_count": 1 if not skipped and meal["location"] == "outside" else 0,
+        "compliance_sum": score or 0.0,
+        "compliance_samples": 0 if score is None else 1,
+        "pass_count": 1 if score is not None and score >= PASS_SCORE else 0,
+        "fail_count": 1 if score is not None and score < PASS_SCORE else 0
+    }
+    for nutrient in NUTRIENTS:
+        row[nutrient] = 0.0 if skipped else meal[f"nutrition.{nutrient}"]
+    return row
+
+def from_meals(meals: List[Dict]) -> pd.DataFrame:
+    """Per-day totals the way the analyzer used to compute them"""
+    df = pd.DataFrame(meals)
+    for nutrient in NUTRIENTS:
+        df.loc[df["status"] == "SKIPPED", f"nutrition.{nutrient}"] = np.nan
+    daily = df.groupby(df["scheduled_time"].dt.date).agg({
+        f"nutrition.{nutrient}": "sum" for nutrient in NUTRIENTS
+    })
+    daily.columns = NUTRIENTS
+    daily["outside"] = df.groupby(df["scheduled_time"].dt.date)["location"].agg(
+        lambda x: "outside" in x[df.loc[x.index, "status"] != "SKIPPED"].values
+    )
+    return daily
+
+def from_rollups(conn, days: int) -> pd.DataFrame:
+    """Per-day totals read from the rollup table, as the analyzer does now"""
+    columns = [c.name for c in DailyNutritionRollup.__table__.columns]
+    rows = conn.execute(select(DailyNutritionRollup.__table__).where(
+        DailyNutritionRollup.user_id == 1,
+        DailyNutritionRollup.day.between(date(2024, 1, 1), date(2024, 1, 1) + timedelta(days=days))
+    )).fetchall()
+    frame = pd.DataFrame(rows, columns=columns)
+    daily = frame.groupby("day")[NUTRIENTS + ["outside_count"]].sum()
+    daily["outside"] = daily.pop("outside_count") > 0
+    return daily
+
+def run(day_counts=(90, 365, 1095), repeat: int = 5) -> List[Dict]:
+    results = []
+    for days in day_counts:
+        meals = synthetic_meals(days)
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn, tables=[
+                Base.metadata.tables["users"], DailyNutritionRollup.__table__
+            ])
+            conn.execute(insert(Base.metadata.tables["users"]), [
+                {"id": 1, "email": "user@example.com", "hashed_password": "x"}
+            ])
+
+            # Write path: one accumulating upsert per meal, as track_meal does
+            start = time.perf_counter()
+            for meal in meals:
+                conn.execute(accumulate(
+                    "sqlite",
+                    DailyNutritionRollup.__table__,
+                    [rollup_row(meal)],
+                    key_columns=("user_id", "day", "meal_type"),
+                    additive_columns=[c for c in rollup_row(meal) if c not in ("user_id", "day", "meal_type")]
+                ))
+            write_us = (time.perf_counter() - start) / len(meals) * 1e6
+
+            expected = from_meals(meals)
+            actual = from_rollups(conn, days)
+            actual.index = expected.index
+            pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                from_meals(meals)
+            meals_ms = (time.perf_counter() - start) / repeat * 1000
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                from_rollups(conn, days)
+            rollups_ms = (time.perf_counter() - start) / repeat * 1000
+
+            rollup_rows = conn.execute(select(DailyNutritionRollup.day)).fetchall()
+        results.append({
+            "days": days,
+            "meals": len(meals),
+            "rollup_rows": len(rollup_rows),
+            "meals_ms": meals_ms,
+            "rollups_ms": rollups_ms,
+            "write_us": write_us
+        })
+    return results
+
+def main() -> None:
+    print(f"{'days':>6} {'meals':>7} {'rows':>6} {'from meals':>11} {'from rollups':>13} {'upsert':>9}")
+    for row in run():
+        print(
+            f"{row['days']:>6} {row['meals']:>7} {row['rollup_rows']:>6} "
+            f"{row['meals_ms']:>8.2f} ms {row['rollups_ms']:>10.2f} ms {row['write_us']:>6.0f} us"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+from typing import Dict, List
+from datetime import date, timedelta
+import asyncio
+import random
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from ..database.connection import Base
+from ..database.models import DailyNutritionRollup
+from ..services.statistics.nutrition_rollups import ADDITIVE_COLUMNS
+from ..services.statistics.trend_engine import TrendEngine, least_squares_slopes, theil_sen_slopes, trend_labels
+from ..services.statistics.trend_partials import TrendPartial, summarize_days, trend_label
+
+def synthetic_series(rows: int, weeks: int, seed: int = 11) -> np.ndarray:
+    """Noisy weekly series with drifting levels, missing weeks and outlier weeks"""
+    rng = np.random.default_rng(seed)
+    slopes = rng.normal(0, 0.04, (rows, 1))
+    values = rng.uniform(0.3, 0.9, (rows, 1)) + slopes * np.arange(weeks) + rng.normal(0, 0.08, (rows, weeks))
+    values[rng.random((rows, weeks)) < 0.02] += 2.0
+    values[rng.random((rows, weeks)) < 0.1] = np.nan
+    # Some users logged only once in the window
+    values[rng.random(rows) < 0.01, 1:] = np.nan
+    return values
+
+def legacy_labels(values: np.ndarray) -> List[str]:
+    """One np.polyfit per series over its observed weeks, as the analyzer once labelled trends"""
+    labels = []
+    for row in values:
+        observed = ~np.isnan(row)
+        if observed.sum() < 2:
+            labels.append("insufficient_data")
+            continue
+        slope = np.polyfit(np.arange(len(row))[observed], row[observed], 1)[0]
+        labels.append(trend_label(slope))
+    return labels
+
+def reference_theil_sen(row: np.ndarray) -> float:
+    """Median of the pairwise slopes of one series, written out"""
+    points = [(x, y) for x, y in enumerate(row) if not np.isnan(y)]
+    slopes = [
+        (y2 - y1) / (x2 - x1)
+        for i, (x1, y1) in enumerate(points)
+        for x2, y2 in points[i + 1:]
+    ]
+    return float(np.median(slopes)) if slopes else np.nan
+
+def run_series(rows: int = 100_000, weeks: int = 26) -> Dict:
+    """Time labels for rows series: per-series polyfit vs the closed form, and Theil–Sen"""
+    values = synthetic_series(rows, weeks)
+
+    started = time.perf_counter()
+    expected = legacy_labels(values)
+    polyfit_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    labels = trend_labels(least_squares_slopes(values))
+    closed_ms = (time.perf_counter() - started) * 1000
+    assert labels.tolist() == expected
+
+    started = time.perf_counter()
+    robust = theil_sen_slopes(values)
+    theil_sen_ms = (time.perf_counter() - started) * 1000
+    reference = [reference_theil_sen(row) for row in values[:500]]
+    np.testing.assert_allclose(robust[:500], reference, rtol=1e-12, atol=1e-15)
+
+    return {
+        "series": rows,
+        "weeks": weeks,
+        "polyfit_ms": polyfit_ms,
+        "closed_ms": closed_ms,
+        "theil_sen_ms": theil_sen_ms
+    }
+
+def synthetic_rollups(users: int, days: int, first_day: date, seed: int = 13) -> List[Dict]:
+    rng = random.Random(seed)
+    rows = []
+    for user_id in range(1, users + 1):
+        drift = rng.uniform(-1, 1)
+        for offset in range(days):
+            if rng.random() < 0.2:
+                continue
+            meals = rng.randint(0, 3)
+            scored = rng.randint(0, meals)
+            rows.append({
+                **dict.fromkeys(ADDITIVE_COLUMNS, 0),
+                "user_id": user_id,
+                "day": first_day + timedelta(days=offset),
+                "meal_type": "lunch",
+                "meal_count": meals,
+                "protein": meals * rng.uniform(10, 30 + 20 * drift * offset / days),
+                "carbs": meals * rng.uniform(30, 90),
+                "fats": meals * rng.uniform(5, 25),
+                "calories": meals * rng.uniform(200, 700),
+                "compliance_sum": sum(rng.uniform(0.3, 1.0) for _ in range(scored)),
+                "compliance_samples": scored
+            })
+    return rows
+
+async def run_user_base(users: int = 300, days: int = 120) -> Dict:
+    """Label every user with TrendEngine and with the analyzer's per-user partials"""
+    first_day = date(2024, 3, 6)
+    last_day = first_day + timedelta(days=days - 1)
+    rows = synthetic_rollups(users, days, first_day)
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=[
+            Base.metadata.tables["users"], DailyNutritionRollup.__table__
+        ]))
+        await conn.execute(insert(Base.metadata.tables["users"]), [
+            {"id": user_id, "email": f"user{user_id}@example.com", "hashed_password": "x"}
+            for user_id in range(1, users + 1)
+        ])
+        await conn.execute(insert(DailyNutritionRollup.__table__), rows)
+
+    async with AsyncSession(engine) as db:
+        started = time.perf_counter()
+        trends = await TrendEngine(db).user_trends(first_day, last_day)
+        engine_ms = (time.perf_counter() - started) * 1000
+    await engine.dispose()
+
+    daily = pd.DataFrame(rows)
+    daily['day'] = pd.to_datetime(daily['day'])
+    started = time.perf_counter()
+    for user_id, user_daily in daily.groupby('user_id'):
+        assert trends[user_id] == TrendPartial.of_summary(summarize_days(user_daily)).trends(), user_id
+    per_user_ms = (time.perf_counter() - started) * 1000
+
+    return {"users": users, "days": days, "engine_ms": engine_ms, "per_user_ms": per_user_ms}
+
+def main() -> None:
+    row = run_series()
+    print(f"Trend labels for {row['series']} series of {row['weeks']} weeks")
+    print(
+        f"np.polyfit per series {row['polyfit_ms']:.1f} ms, closed form {row['closed_ms']:.1f} ms "
+        f"({row['polyfit_ms'] / row['closed_ms']:.0f}x), Theil–Sen {row['theil_sen_ms']:.1f} ms"
+    )
+
+    row = asyncio.run(run_user_base())
+    print(
+        f"\n{row['users']} users over {row['days']} days from rollups: TrendEngine {row['engine_ms']:.1f} ms "
+        f"including the query, per-user partials {row['per_user_ms']:.1f} ms excluding queries"
+    )
+
+if __name__ == "__main__":
+    main()
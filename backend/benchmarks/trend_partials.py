@@ -0,0 +1,182 @@
+from typing import Dict, List
+from datetime import date, timedelta
+import asyncio
+import math
+import random
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from ..database.connection import Base
+from ..database.memory_cache import MemoryCache
+from ..database.models import DailyNutritionRollup
+from ..services.statistics.historical_analyzer import HistoricalAnalyzer
+from ..services.statistics.nutrition_rollups import ADDITIVE_COLUMNS
+from ..services.statistics.trend_partials import TREND_SERIES, TrendPartial, WeeklySummaryStore
+from .trend_engine import legacy_labels
+
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+FIRST_DAY = date(2023, 1, 1)
+
+def synthetic_rollups(days: int, seed: int = 5) -> List[Dict]:
+    """Daily rollup rows with drifting nutrients, missed days and a two-week break"""
+    rng = random.Random(seed)
+    rows = []
+    for offset in range(days):
+        if rng.random() < 0.1 or 200 <= offset < 214:
+            continue
+        drift = offset / days
+        for meal_type in MEAL_TYPES:
+            meals = rng.randint(0, 2)
+            scored = rng.randint(0, meals)
+            rows.append({
+                "user_id": 1,
+                "day": FIRST_DAY + timedelta(days=offset),
+                "meal_type": meal_type,
+                "meal_count": meals,
+                "skipped_count": 2 - meals,
+                "outside_count": 0,
+                "protein": meals * rng.uniform(10, 30 + 20 * drift),
+                "carbs": meals * rng.uniform(30, 90),
+                "fats": meals * rng.uniform(5, 25 - 10 * drift),
+                "fiber": meals * rng.uniform(0, 8),
+                "calories": meals * rng.uniform(200, 700),
+                "compliance_sum": sum(rng.uniform(0.4 + 0.4 * drift, 1.0) for _ in range(scored)),
+                "compliance_samples": scored,
+                "pass_count": 0,
+                "fail_count": 0
+            })
+    return rows
+
+class CountingStore(WeeklySummaryStore):
+    """A summary store that counts the rollup days it reads"""
+
+    days_read = 0
+
+    async def _summarize(self, user_id, weeks, start_day, end_day):
+        summary = await super()._summarize(user_id, weeks, start_day, end_day)
+        self.days_read += int(summary['days'].sum())
+        return summary
+
+def legacy_consistency(series: pd.Series) -> float:
+    """The analyzer's consistency score before partials: one minus the coefficient of variation"""
+    if len(series) < 2:
+        return 0.0
+    normalized_std = series.std() / series.mean()
+    return max(0, 1 - normalized_std)
+
+async def batch_trends(db: AsyncSession, analyzer: HistoricalAnalyzer, start: date, end: date) -> Dict:
+    """Trends the way the analyzer computed them before partials: read every day, then fit"""
+    columns = ['day', *ADDITIVE_COLUMNS]
+    result = await db.execute(
+        select(*[getattr(DailyNutritionRollup, column) for column in columns]).where(
+            DailyNutritionRollup.user_id == 1,
+            DailyNutritionRollup.day.between(start, end)
+        )
+    )
+    daily = pd.DataFrame(result.all(), columns=columns)
+    daily['day'] = pd.to_datetime(daily['day'])
+
+    weekly = daily.groupby(pd.Grouper(key='day', freq='W'))[list(ADDITIVE_COLUMNS)].sum()
+    values = {"compliance": weekly['compliance_sum'] / weekly['compliance_samples'].replace(0, np.nan)}
+    for nutrient in TREND_SERIES[1:]:
+        values[nutrient] = weekly[nutrient] / weekly['meal_count'].replace(0, np.nan)
+
+    totals = daily.groupby('day')[['protein', 'carbs', 'fats']].sum()
+    calories = totals['protein'] * 4 + totals['carbs'] * 4 + totals['fats'] * 9
+    return {
+        "days_read": daily['day'].nunique(),
+        "trends": {series: legacy_labels(values[series].to_numpy()[None])[0] for series in TREND_SERIES},
+        "consistency": {series: legacy_consistency(values[series]) for series in TREND_SERIES},
+        "protein_share": (totals['protein'] * 4 / calories).mean()
+    }
+
+async def partial_trends(store: WeeklySummaryStore, start: date, end: date) -> Dict:
+    """The same trends from cached weekly summaries and their partials"""
+    weeks = await store.get_summaries(1, start, end)
+    trends = TrendPartial.of_summary(weeks)
+    totals = weeks.sum()
+    return {
+        "trends": trends.trends(),
+        "consistency": dict(zip(TREND_SERIES, trends.consistency())),
+        "protein_share": totals['protein_ratio'] / totals['ratio_days']
+    }
+
+def check_equal(batch: Dict, partial: Dict) -> None:
+    assert batch["trends"] == partial["trends"], (batch["trends"], partial["trends"])
+    for series in TREND_SERIES:
+        assert math.isclose(batch["consistency"][series], partial["consistency"][series], rel_tol=1e-9, abs_tol=1e-12)
+    assert math.isclose(batch["protein_share"], partial["protein_share"], rel_tol=1e-12)
+
+async def run_async(history_days: int = 730, window_weeks: int = 26, shifts: int = 60) -> Dict:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=[
+            Base.metadata.tables["users"], DailyNutritionRollup.__table__
+        ]))
+        await conn.execute(insert(Base.metadata.tables["users"]), [
+            {"id": 1, "email": "user@example.com", "hashed_password": "x"}
+        ])
+        await conn.execute(insert(DailyNutritionRollup.__table__), synthetic_rollups(history_days))
+
+    analyzer = HistoricalAnalyzer(None, None, None, None)
+    async with AsyncSession(engine) as db:
+        store = CountingStore(db, MemoryCache())
+        # Windows sliding one day at a time, as a daily dashboard refresh does
+        windows = [
+            (FIRST_DAY + timedelta(days=180 + shift), FIRST_DAY + timedelta(days=180 + shift + 7 * window_weeks))
+            for shift in range(shifts)
+        ]
+
+        for start, end in windows:
+            check_equal(await batch_trends(db, analyzer, start, end), await partial_trends(store, start, end))
+
+        # A meal logged in the middle of the last window changes one week
+        changed = windows[-1][0] + timedelta(days=40)
+        await db.execute(insert(DailyNutritionRollup.__table__), [{
+            **dict.fromkeys(ADDITIVE_COLUMNS, 0),
+            "user_id": 1, "day": changed, "meal_type": "late_snack",
+            "meal_count": 1, "protein": 400.0, "calories": 2000.0,
+            "compliance_sum": 0.05, "compliance_samples": 1
+        }])
+        await store.invalidate(1, [changed])
+        check_equal(
+            await batch_trends(db, analyzer, *windows[-1]),
+            await partial_trends(store, *windows[-1])
+        )
+
+        batch_days = 0
+        started = time.perf_counter()
+        for start, end in windows:
+            batch_days += (await batch_trends(db, analyzer, start, end))["days_read"]
+        batch_ms = (time.perf_counter() - started) / len(windows) * 1000
+
+        store.days_read = 0
+        started = time.perf_counter()
+        for start, end in windows:
+            await partial_trends(store, start, end)
+        partial_ms = (time.perf_counter() - started) / len(windows) * 1000
+
+    await engine.dispose()
+    return {
+        "windows": len(windows),
+        "window_weeks": window_weeks,
+        "batch_ms": batch_ms,
+        "partial_ms": partial_ms,
+        "batch_days": batch_days / len(windows),
+        "partial_days": store.days_read / len(windows)
+    }
+
+def main() -> None:
+    row = asyncio.run(run_async())
+    print(
+        f"{row['windows']} sliding {row['window_weeks']}-week windows: "
+        f"full recompute {row['batch_ms']:.2f} ms, weekly partials {row['partial_ms']:.2f} ms per window, "
+        f"{row['batch_ms'] / row['partial_ms']:.1f}x"
+    )
+    print(f"rollup days read per window: {row['batch_days']:.1f} vs {row['partial_days']:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,37 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_ECHO_SQL: bool = False
     
     # Redis settings
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_DB: int = 0
+    REDIS_TIMEOUT: int = 5
     
+    # Cache settings
+    CACHE_BACKEND: str = "redis"  # redis, or memory for tests and single-node deployments
+    CACHE_L1_ENABLED: bool = False
+    CACHE_L1_MAX_ENTRIES: int = 1024
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_L1_MAX_STALENESS: int = 30  # seconds a local entry may outlive a remote write
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    CACHE_CODEC: str = "auto"  # auto, json, orjson or msgpack
+    CACHE_COMPRESSION: Optional[str] = None  # zstd, lz4 or zlib
+    CACHE_COMPRESSION_THRESHOLD: int = 1024  # bytes
+    CACHE_STALE_TTL: int = 300  # seconds an expired computed value may still be served
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # 0 disables probabilistic early refresh
+    CACHE_LOCK_TIMEOUT: float = 30.0  # seconds
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05  # seconds
+    
+    # Auth settings
+    SECRET_KEY: str  # signs access tokens
+
     # AI Service settings
     OPENAI_API_KEY: str
     VISION_API_KEY: str
@@ -20,6 +45,29 @@ class Settings(BaseSettings):
     MAX_DAILY_NOTIFICATIONS: int = 10
     MEAL_TRACKING_WINDOW: int = 30
     MEAL_SIMILARITY_THRESHOLD: float = 0.8
+    MEAL_WINDOW_MINUTES: int = 120  # either side of a user's preferred meal time
+    MEAL_SCHEDULE_CACHE_SIZE: int = 4096  # compiled meal schedules kept in memory
+    DEFAULT_TIMEZONE: str = "UTC"  # for users without app_settings["timezone"]
+    MEAL_BULK_MAX_SIZE: int = 500  # meals per bulk upload
+    TREND_WEEK_CACHE_EXPIRE: int = 7 * 24 * 3600  # seconds a whole week's trend summary is cached
+    TREND_METHOD: str = "least_squares"  # or "theil_sen", robust to outlier weeks
+    TREND_ENGINE_USER_BATCH: int = 2000  # users fitted together by TrendEngine
+    MEAL_STREAM_MIN_DAYS: int = 366  # longer analyses stream meals; per-meal ones see this many recent days
+    MEAL_STREAM_CHUNK_SIZE: int = 5000  # meals per keyset page when streaming
+    INGREDIENT_CACHE_SIZE: int = 65536  # raw ingredient names memoized by IngredientIndex
+    USER_STATS_FLUSH_INTERVAL: int = 60  # seconds between counter flushes to users.meal_stats
+    USER_STATS_FLUSH_BATCH: int = 500  # users per flush transaction
+    USER_STATS_FLUSH_LOCK_TIMEOUT: int = 300  # seconds one worker may hold the flush lock
+    DEBUG_ENDPOINTS_ENABLED: bool = False
+    
+    # Watch data settings
+    WATCH_DATA_COLLECTION_INTERVAL: int = 15  # minutes
+    WATCH_DATA_PARTITIONS_AHEAD: int = 3  # monthly partitions created in advance
+    WATCH_DATA_HOT_MONTHS: int = 3  # months that keep raw device payloads
+    WATCH_DATA_RAW_COMPRESSION: str = "zstd"  # zstd, lz4 or zlib
+    WATCH_DATA_RETENTION_MONTHS: int = 24
+    WATCH_DATA_DROP_EXPIRED: bool = True  # False only detaches expired partitions
+    WATCH_DATA_MAINTENANCE_INTERVAL: int = 3600  # seconds
     
     class Config:
         env_file = ".env"
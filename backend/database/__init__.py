@@ -3,7 +3,8 @@ Database Package
 Contains database models, connection management and caching
 """
 
-from .connection import Base, engine, SessionLocal
-from .cache import RedisCache
+from .connection import Base, engine, SessionLocal, get_db
+from .cache import RedisCache, create_cache, get_cache
+from .memory_cache import MemoryCache
 
-__all__ = ['Base', 'engine', 'SessionLocal', 'RedisCache'] 
\ No newline at end of file
+__all__ = ['Base', 'engine', 'SessionLocal', 'get_db', 'RedisCache', 'MemoryCache', 'create_cache', 'get_cache'] 
\ No newline at end of file
@@ -1,91 +1,343 @@
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+import asyncio
 import logging
-import json
+import math
+import random
+import time
+import uuid
 import redis.asyncio as redis
 from ..config import settings
+from .local_cache import LocalCache
+from .codecs import ValueSerializer
+from .cache_metrics import CacheMetrics
 
 logger = logging.getLogger(__name__)
 
+# Deletes every key recorded under a tag plus the tag set itself, returning the keys
+POP_TAG_SCRIPT = """
+local keys = redis.call('SMEMBERS', KEYS[1])
+for i = 1, #keys, 1000 do
+    redis.call('DEL', unpack(keys, i, math.min(i + 999, #keys)))
+end
+redis.call('DEL', KEYS[1])
+return keys
+"""
+
+# Deletes a lock only if it is still held by the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Records a key under a tag. The tag set lives as long as its longest-lived
+# member (ARGV[2] seconds, 0 for none), so once a member without expiry joins
+# it the set stays persistent
+ADD_TAG_MEMBER_SCRIPT = """
+local ttl = redis.call('PTTL', KEYS[1])
+redis.call('SADD', KEYS[1], ARGV[1])
+local expire = tonumber(ARGV[2]) * 1000
+if expire == 0 then
+    redis.call('PERSIST', KEYS[1])
+elseif ttl == -2 or (ttl >= 0 and ttl < expire) then
+    redis.call('PEXPIRE', KEYS[1], expire)
+end
+return 1
+"""
+
+# Marks values written by get_or_compute, which carry their own expiry metadata
+COMPUTED_MARKER = "__computed__"
+
 class RedisCache:
     def __init__(self):
-        self.redis = redis.Redis(
+        self.redis = self._create_client()
+        self.serializer = ValueSerializer(
+            codec=settings.CACHE_CODEC,
+            compression=settings.CACHE_COMPRESSION,
+            compression_threshold=settings.CACHE_COMPRESSION_THRESHOLD
+        )
+
+        # Optional in-process tier in front of Redis
+        self.local = None
+        if settings.CACHE_L1_ENABLED:
+            self.local = LocalCache(
+                max_entries=settings.CACHE_L1_MAX_ENTRIES,
+                max_bytes=settings.CACHE_L1_MAX_BYTES,
+                max_ttl=settings.CACHE_L1_MAX_STALENESS
+            )
+        self.invalidation_channel = settings.CACHE_INVALIDATION_CHANNEL
+        self.instance_id = uuid.uuid4().hex
+        self.metrics = CacheMetrics()
+        self._listener: Optional[asyncio.Task] = None
+        self._add_tag_member_script = self.redis.register_script(ADD_TAG_MEMBER_SCRIPT)
+        self._pop_tag_script = self.redis.register_script(POP_TAG_SCRIPT)
+        self._release_lock_script = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        self._inflight: Dict[Tuple[str, bool], asyncio.Future] = {}
+        self._refreshes: Set[asyncio.Task] = set()
+
+    def _create_client(self):
+        """Create the Redis client used for all cache operations"""
+        return redis.Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             db=settings.REDIS_DB,
             password=settings.REDIS_PASSWORD,
-            decode_responses=True,
+            decode_responses=False,
             socket_timeout=settings.REDIS_TIMEOUT,
             retry_on_timeout=True
         )
-        
+
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         try:
-            value = await self.redis.get(key)
-            if value:
-                return json.loads(value)
-            return None
-            
+            if self.local is not None:
+                found, value = self.local.get(key)
+                if found:
+                    self.metrics.hit(key, "l1")
+                    return value
+                self.metrics.miss(key, "l1")
+
+                # Fetch the TTL in the same round-trip so the local copy never outlives Redis
+                started = time.perf_counter()
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    value, ttl_ms = await pipe.get(key).pttl(key).execute()
+                latency = time.perf_counter() - started
+            else:
+                started = time.perf_counter()
+                value = await self.redis.get(key)
+                latency = time.perf_counter() - started
+                ttl_ms = None
+
+            self.metrics.latency([key], latency)
+            return self._decode_remote(key, value, ttl_ms, latency)
+
         except Exception as e:
             logger.error(f"Error getting from cache: {str(e)}")
+            self.metrics.error(key)
             return None
-            
-    async def set(self, 
-                  key: str, 
-                  value: Any, 
-                  expire: Optional[int] = None) -> bool:
-        """Set value in cache with optional expiration"""
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values in one round-trip, omitting missing keys"""
+        results = {}
+        pending = []
         try:
-            serialized = json.dumps(value)
-            if expire:
-                await self.redis.setex(key, expire, serialized)
-            else:
-                await self.redis.set(key, serialized)
-            return True
-            
+            for key in keys:
+                if self.local is not None:
+                    found, value = self.local.get(key)
+                    if found:
+                        self.metrics.hit(key, "l1")
+                        results[key] = value
+                        continue
+                    self.metrics.miss(key, "l1")
+                pending.append(key)
+
+            if not pending:
+                return results
+
+            started = time.perf_counter()
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.mget(pending)
+                if self.local is not None:
+                    for key in pending:
+                        pipe.pttl(key)
+                values, *ttls = await pipe.execute()
+            latency = time.perf_counter() - started
+            self.metrics.latency(pending, latency)
+
+            for index, (key, value) in enumerate(zip(pending, values)):
+                decoded = self._decode_remote(key, value, ttls[index] if ttls else None, latency)
+                if decoded is not None:
+                    results[key] = decoded
+
+            return results
+
         except Exception as e:
-            logger.error(f"Error setting cache: {str(e)}")
-            return False
-            
+            logger.error(f"Error getting many from cache: {str(e)}")
+            for key in pending:
+                if key not in results:
+                    self.metrics.error(key)
+            return results
+
+    async def set(self,
+                  key: str,
+                  value: Any,
+                  expire: Optional[int] = None,
+                  tags: Optional[List[str]] = None) -> bool:
+        """Set value in cache with optional expiration and invalidation tags"""
+        pipe = self.pipeline()
+        pipe.set(key, value, expire, tags)
+        return await pipe.execute() is not None
+
+    async def set_many(self,
+                       items: Dict[str, Any],
+                       expire: Optional[int] = None,
+                       ttls: Optional[Dict[str, int]] = None,
+                       tags: Optional[List[str]] = None) -> bool:
+        """Set several values in one round-trip; ttls overrides expire per key"""
+        ttls = ttls or {}
+        pipe = self.pipeline()
+        for key, value in items.items():
+            pipe.set(key, value, ttls.get(key, expire), tags)
+        return await pipe.execute() is not None
+
     async def delete(self, key: str) -> bool:
         """Delete value from cache"""
-        try:
-            await self.redis.delete(key)
+        return await self.delete_many([key])
+
+    async def delete_many(self, keys: List[str]) -> bool:
+        """Delete several values in one round-trip"""
+        if not keys:
             return True
-            
-        except Exception as e:
-            logger.error(f"Error deleting from cache: {str(e)}")
-            return False
-            
+        pipe = self.pipeline()
+        pipe.delete(*keys)
+        return await pipe.execute() is not None
+
+    def pipeline(self) -> "CachePipeline":
+        """Group writes into a single round-trip.
+
+        Use as ``async with cache.pipeline() as pipe:``; queued commands
+        run when the block exits without an exception.
+        """
+        return CachePipeline(self)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int,
+        tags: Optional[List[str]] = None,
+        stale_ttl: Optional[int] = None,
+        early_refresh_beta: Optional[float] = None
+    ) -> Any:
+        """Get a value, computing it at most once across workers on a miss.
+
+        Concurrent misses in this process share one computation; other
+        workers wait on a short Redis lock instead of recomputing. Expired
+        entries are served for up to stale_ttl seconds while a single worker
+        refreshes them in the background, and refreshes may start early with
+        a probability that rises as expiry approaches (XFetch). Keys written
+        here should only be read through get_or_compute.
+        """
+        stale_ttl = settings.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        beta = settings.CACHE_EARLY_REFRESH_BETA if early_refresh_beta is None else early_refresh_beta
+
+        entry = await self.get(key)
+        if isinstance(entry, dict) and entry.get(COMPUTED_MARKER):
+            now = time.time()
+            expires_at = entry["expires_at"]
+            # -log(u) is exponentially distributed, so slow computations refresh earlier
+            early_by = entry["compute_time"] * beta * -math.log(1.0 - random.random())
+            if now + early_by >= expires_at:
+                self._refresh_in_background(key, compute, expire, tags, stale_ttl)
+            return entry["value"]
+
+        return await self._single_flight(key, compute, expire, tags, stale_ttl, wait=True)
+
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
         try:
             return await self.redis.exists(key)
-            
+
         except Exception as e:
             logger.error(f"Error checking cache existence: {str(e)}")
+            self.metrics.error(key)
             return False
-            
+
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """Increment value in cache"""
+        pipe = self.pipeline()
+        pipe.increment(key, amount)
+        result = await pipe.execute()
+        return result[0] if result else None
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """Set expiration on key"""
+        pipe = self.pipeline()
+        pipe.expire(key, seconds)
+        result = await pipe.execute()
+        return bool(result and result[0])
+
+    async def get_fields(self, key: str) -> Dict[str, str]:
+        """Get every field of a hash, e.g. one written with increment_field"""
+        try:
+            fields = await self.redis.hgetall(key)
+            return {field.decode(): value.decode() for field, value in fields.items()}
+
+        except Exception as e:
+            logger.error(f"Error reading cache hash {key}: {str(e)}")
+            self.metrics.error(key)
+            return {}
+
+    async def set_field_default(self, key: str, field: str, value: str) -> Optional[str]:
+        """Set a hash field unless it is already set, returning the field's value"""
         try:
-            return await self.redis.incrby(key, amount)
-            
+            await self.redis.hsetnx(key, field, value)
+            current = await self.redis.hget(key, field)
+            return current.decode() if current is not None else None
+
         except Exception as e:
-            logger.error(f"Error incrementing cache: {str(e)}")
+            logger.error(f"Error setting cache hash field {key}: {str(e)}")
+            self.metrics.error(key)
             return None
-            
-    async def expire(self, key: str, seconds: int) -> bool:
-        """Set expiration on key"""
+
+    async def pop_members(self, key: str, count: int) -> List[str]:
+        """Remove and return up to count members of a set"""
+        try:
+            return [member.decode() for member in await self.redis.spop(key, count) or []]
+
+        except Exception as e:
+            logger.error(f"Error popping cache set {key}: {str(e)}")
+            self.metrics.error(key)
+            return []
+
+    async def claim(self, key: str, new_key: str) -> bool:
+        """Atomically move key to new_key unless new_key already exists.
+
+        Writers that keep using key start from scratch, so the caller owns
+        everything that was under key at the time of the move. Returns
+        False if key does not exist or new_key does.
+        """
+        try:
+            return bool(await self.redis.renamenx(key, new_key))
+
+        except redis.ResponseError:
+            return False  # no such key
+
+        except Exception as e:
+            logger.error(f"Error claiming cache key {key}: {str(e)}")
+            self.metrics.error(key)
+            return False
+
+    async def invalidate_tag(self, tag: str) -> bool:
+        """Delete every key written with the given tag.
+
+        Runs as one server-side script, so the cost is proportional to the
+        number of tagged keys rather than to the size of the keyspace.
+        """
         try:
-            return await self.redis.expire(key, seconds)
-            
+            keys = [key.decode() for key in await self._pop_tag_members(self.tag_key(tag))]
+            if keys and self.local is not None:
+                # Keys are already gone from Redis; this only clears local tiers
+                pipe = self.pipeline()
+                pipe.forget(*keys)
+                return await pipe.execute() is not None
+            return True
+
         except Exception as e:
-            logger.error(f"Error setting cache expiration: {str(e)}")
+            logger.error(f"Error invalidating cache tag {tag}: {str(e)}")
             return False
-            
+
+    def tag_key(self, tag: str) -> str:
+        """Get the Redis key of the set holding a tag's members"""
+        return f"tag:{tag}"
+
     async def clear_pattern(self, pattern: str) -> bool:
-        """Clear all keys matching pattern"""
+        """Clear all keys matching pattern.
+
+        Walks the whole keyspace; prefer tags and invalidate_tag for
+        anything on a request path.
+        """
         try:
             cursor = 0
             while True:
@@ -93,21 +345,362 @@ class RedisCache:
                     cursor=cursor,
                     match=pattern
                 )
-                if keys:
-                    await self.redis.delete(*keys)
+                keys = [key.decode() for key in keys]
+                if keys and not await self.delete_many(keys):
+                    return False
                 if cursor == 0:
                     break
             return True
-            
+
         except Exception as e:
             logger.error(f"Error clearing cache pattern: {str(e)}")
             return False
-            
+
     async def health_check(self) -> bool:
         """Check if Redis connection is healthy"""
         try:
             return await self.redis.ping()
-            
+
         except Exception as e:
             logger.error(f"Redis health check failed: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss/error counters per cache tier and per key namespace"""
+        stats = self.metrics.tier_totals()
+        if self.local is not None:
+            stats["l1"]["entries"] = len(self.local)
+            stats["l1"]["bytes"] = self.local.nbytes
+        stats["namespaces"] = self.metrics.summary()
+        return stats
+
+    async def start_invalidation_listener(self) -> None:
+        """Subscribe to invalidations published by other workers"""
+        if self.local is None or self._listener is not None:
+            return
+        self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def close(self) -> None:
+        """Stop the invalidation listener and close the Redis connection"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.redis.aclose()
+
+    async def _single_flight(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int,
+        tags: Optional[List[str]],
+        stale_ttl: int,
+        wait: bool
+    ) -> Any:
+        """Share one in-flight computation per key and wait mode within this process.
+
+        A background refresh (wait=False) returns None when another worker
+        holds the lock, so callers that need the value never share its future.
+        """
+        flight = (key, wait)
+        future = self._inflight.get(flight)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._compute_and_store(key, compute, expire, tags, stale_ttl, wait)
+            )
+            self._inflight[flight] = future
+            future.add_done_callback(
+                lambda done: self._inflight.pop(flight, None) if self._inflight.get(flight) is done else None
+            )
+        return await asyncio.shield(future)
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int,
+        tags: Optional[List[str]],
+        stale_ttl: int,
+        wait: bool
+    ) -> Any:
+        """Compute under a cross-worker lock and store the result with its metadata"""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+
+        if not await self.acquire_lock(lock_key, token):
+            if not wait:
+                return None  # Another worker is already refreshing this key
+
+            # Another worker is computing; poll for its result until the lock would expire
+            deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+                entry = await self.get(key)
+                if isinstance(entry, dict) and entry.get(COMPUTED_MARKER):
+                    return entry["value"]
+            logger.warning(f"Timed out waiting for {key}, computing locally")
+
+        try:
+            started = time.monotonic()
+            value = await compute()
+            compute_time = time.monotonic() - started
+
+            await self.set(
+                key,
+                {
+                    COMPUTED_MARKER: True,
+                    "value": value,
+                    "expires_at": time.time() + expire,
+                    "compute_time": compute_time
+                },
+                expire=expire + stale_ttl,
+                tags=tags
+            )
+            return value
+
+        finally:
+            await self.release_lock(lock_key, token)
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int,
+        tags: Optional[List[str]],
+        stale_ttl: int
+    ) -> None:
+        """Recompute a stale or soon-to-expire entry without blocking the caller"""
+        if (key, False) in self._inflight or (key, True) in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._single_flight(key, compute, expire, tags, stale_ttl, wait=False)
+            except Exception as e:
+                logger.error(f"Error refreshing cache entry {key}: {str(e)}")
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def acquire_lock(self, lock_key: str, token: str, timeout: Optional[float] = None) -> bool:
+        """Try to take a lock for timeout seconds, CACHE_LOCK_TIMEOUT by default.
+
+        If Redis is unavailable, proceeds unlocked.
+        """
+        timeout = settings.CACHE_LOCK_TIMEOUT if timeout is None else timeout
+        try:
+            return bool(await self.redis.set(
+                lock_key,
+                token,
+                nx=True,
+                px=int(timeout * 1000)
+            ))
+        except Exception as e:
+            logger.error(f"Error acquiring cache lock: {str(e)}")
+            return True
+
+    async def release_lock(self, lock_key: str, token: str) -> None:
+        """Release a lock if it is still held with token"""
+        try:
+            await self._release_lock_script(keys=[lock_key], args=[token])
+        except Exception as e:
+            logger.error(f"Error releasing cache lock: {str(e)}")
+
+    async def _pop_tag_members(self, tag_key: str) -> List[bytes]:
+        """Atomically delete a tag's keys and return them"""
+        return await self._pop_tag_script(keys=[tag_key])
+
+    def _decode_remote(
+        self,
+        key: str,
+        value: Optional[bytes],
+        ttl_ms: Optional[int] = None,
+        latency: Optional[float] = None
+    ) -> Optional[Any]:
+        """Decode a value read from Redis and copy it into the local tier"""
+        if not value:
+            self.metrics.miss(key, "l2", latency)
+            return None
+
+        decoded = self.serializer.loads(value)
+        self.metrics.hit(key, "l2", len(value), latency)
+        if self.local is not None:
+            ttl = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None
+            self.local.set(key, decoded, len(value), ttl)
+        return decoded
+
+    async def _listen_for_invalidations(self) -> None:
+        """Drop local entries whenever another worker writes the same key"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                # Messages may have been missed while we were not subscribed
+                self.local.clear()
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    sender, _, key = message["data"].decode().partition(":")
+                    if sender != self.instance_id:
+                        self.local.invalidate(key)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed: {str(e)}")
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+class CachePipeline:
+    """Queues cache writes and sends them to Redis in one round-trip"""
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        self._pipe = cache.redis.pipeline(transaction=False)
+        self._writes: List[Tuple[str, Any, int, Optional[int]]] = []
+        self._invalidated: List[str] = []
+        self._counted: List[str] = []
+        self._failed = False
+
+    async def __aenter__(self) -> "CachePipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.execute()
+        else:
+            await self._pipe.reset()
+
+    def set(self,
+            key: str,
+            value: Any,
+            expire: Optional[int] = None,
+            tags: Optional[List[str]] = None) -> "CachePipeline":
+        """Queue a value write with optional expiration and invalidation tags"""
+        try:
+            serialized = self.cache.serializer.dumps(value)
+        except (TypeError, ValueError, OverflowError) as e:
+            logger.error(f"Error serializing cache value for {key}: {str(e)}")
+            self.cache.metrics.error(key)
+            self._failed = True
+            return self
+
+        self._pipe.set(key, serialized, ex=expire or None)
+        script = self.cache._add_tag_member_script
+        for tag in tags or []:
+            tag_key = self.cache.tag_key(tag)
+            # Reads the tag's TTL and updates it in one step, so concurrent writers cannot race.
+            # Queued by SHA the way Script does on a pipeline; execute loads it if missing.
+            self._pipe.scripts.add(script)
+            self._pipe.evalsha(script.sha, 1, tag_key, key, expire or 0)
+        self._writes.append((key, value, len(serialized), expire or None))
+        self._invalidated.append(key)
+        return self
+
+    def delete(self, *keys: str) -> "CachePipeline":
+        """Queue deletion of one or more keys"""
+        self._pipe.delete(*keys)
+        self._invalidated.extend(keys)
+        return self
+
+    def forget(self, *keys: str) -> "CachePipeline":
+        """Queue local-tier invalidation only, for keys already removed remotely"""
+        self._invalidated.extend(keys)
+        return self
+
+    def increment(self, key: str, amount: int = 1) -> "CachePipeline":
+        """Queue an increment"""
+        self._pipe.incrby(key, amount)
+        self._invalidated.append(key)
+        return self
+
+    def expire(self, key: str, seconds: int) -> "CachePipeline":
+        """Queue an expiration change"""
+        self._pipe.expire(key, seconds)
+        self._invalidated.append(key)
+        return self
+
+    def increment_field(self, key: str, field: str, amount: Union[int, float] = 1) -> "CachePipeline":
+        """Queue an increment of one hash field, by a float if amount is one.
+
+        Hashes are never held in the local tier, so nothing is invalidated.
+        """
+        if isinstance(amount, float):
+            self._pipe.hincrbyfloat(key, field, amount)
+        else:
+            self._pipe.hincrby(key, field, amount)
+        self._counted.append(key)
+        return self
+
+    def add_members(self, key: str, *members: Any) -> "CachePipeline":
+        """Queue adding members to a set"""
+        self._pipe.sadd(key, *members)
+        self._counted.append(key)
+        return self
+
+    async def execute(self) -> Optional[List]:
+        """Send queued commands, returning their results or None on failure"""
+        local = self.cache.local
+        metrics = self.cache.metrics
+        try:
+            if self._failed:
+                await self._pipe.reset()
+                return None
+
+            command_count = len(self._pipe)
+            if local is not None:
+                for key in self._invalidated:
+                    local.invalidate(key)
+                    self._pipe.publish(
+                        self.cache.invalidation_channel,
+                        f"{self.cache.instance_id}:{key}"
+                    )
+
+            started = time.perf_counter()
+            results = await self._pipe.execute()
+            metrics.latency(self._invalidated + self._counted, time.perf_counter() - started)
+
+            for key, value, size, expire in self._writes:
+                metrics.write(key, size)
+                if local is not None:
+                    local.set(key, value, size, expire)
+            return results[:command_count]
+
+        except Exception as e:
+            logger.error(f"Error executing cache pipeline: {str(e)}")
+            for key in dict.fromkeys(self._invalidated + self._counted):
+                metrics.error(key)
+            return None
+
+        finally:
+            self._writes = []
+            self._invalidated = []
+            self._counted = []
+            self._failed = False
+
+
+_cache: Optional[RedisCache] = None
+
+def create_cache() -> RedisCache:
+    """Create the cache backend selected by CACHE_BACKEND"""
+    if settings.CACHE_BACKEND == "memory":
+        from .memory_cache import MemoryCache
+        return MemoryCache()
+    if settings.CACHE_BACKEND != "redis":
+        raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+    return RedisCache()
+
+def get_cache() -> RedisCache:
+    """Get the process-wide cache instance"""
+    global _cache
+    if _cache is None:
+        _cache = create_cache()
+    return _cache
@@ -0,0 +1,45 @@
+from typing import Any
+import hashlib
+import json
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Bump to orphan every key built by this module after a format change
+CACHE_KEY_VERSION = 1
+
+def _new_hasher():
+    """Get a fast 128-bit hasher that is stable across processes"""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+def _canonical(part: Any) -> bytes:
+    """Encode a key part deterministically, independent of dict order"""
+    if isinstance(part, bytes):
+        return part
+    return json.dumps(part, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+def build_key(namespace: str, *parts: Any) -> str:
+    """Build a versioned, content-addressed cache key.
+
+    Unlike hash(), the digest is identical in every worker and across
+    restarts, so equal requests hit the same entry.
+    """
+    hasher = _new_hasher()
+    for part in parts:
+        encoded = _canonical(part)
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        hasher.update(len(encoded).to_bytes(8, "little"))
+        hasher.update(encoded)
+    return f"{namespace}:v{CACHE_KEY_VERSION}:{hasher.hexdigest()}"
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Get the content digest of a file, e.g. an uploaded meal photo"""
+    hasher = _new_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
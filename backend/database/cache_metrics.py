@@ -0,0 +1,169 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from bisect import bisect_left
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+COUNTERS = {"hit": "hits", "miss": "misses", "error": "errors"}
+
+class CacheEvent(NamedTuple):
+    """A single cache operation as reported to metrics hooks"""
+    kind: str  # hit, miss, write or error
+    tier: str  # l1 or l2
+    namespace: str
+    key: str
+    nbytes: int = 0
+    latency: Optional[float] = None  # seconds
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Get the upper bound of the bucket holding the q-th percentile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(self.buckets, self.counts)},
+                "le_inf": self.counts[-1]
+            }
+        }
+
+class NamespaceStats:
+    """Counters for one key family, e.g. llm_response or trends"""
+
+    def __init__(self):
+        self.tiers = {
+            tier: {"hits": 0, "misses": 0, "errors": 0}
+            for tier in ("l1", "l2")
+        }
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.latency = LatencyHistogram()
+
+    def summary(self) -> Dict:
+        l2 = self.tiers["l2"]
+        lookups = l2["hits"] + l2["misses"] + self.tiers["l1"]["hits"]
+        hits = l2["hits"] + self.tiers["l1"]["hits"]
+        return {
+            **{tier: dict(counters) for tier, counters in self.tiers.items()},
+            "hit_ratio": hits / lookups if lookups else None,
+            "writes": self.writes,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "avg_value_bytes": self.bytes_written / self.writes if self.writes else None,
+            "latency": self.latency.summary()
+        }
+
+class CacheMetrics:
+    """Per-namespace cache counters, byte totals and latency histograms.
+
+    The namespace of a key is everything before its first colon, so
+    "llm_response:v1:ab12" and "trends:42:2024-01-01" are tracked as
+    llm_response and trends. Hooks registered with add_hook receive every
+    CacheEvent, e.g. to forward them to Prometheus or StatsD.
+    """
+
+    def __init__(self):
+        self.namespaces: Dict[str, NamespaceStats] = {}
+        self._hooks: List[Callable[[CacheEvent], None]] = []
+
+    @staticmethod
+    def namespace(key: str) -> str:
+        return key.split(":", 1)[0]
+
+    def add_hook(self, hook: Callable[[CacheEvent], None]) -> None:
+        """Call hook with every recorded event"""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[CacheEvent], None]) -> None:
+        self._hooks.remove(hook)
+
+    def hit(self, key: str, tier: str, nbytes: int = 0, latency: Optional[float] = None) -> None:
+        self.record(CacheEvent("hit", tier, self.namespace(key), key, nbytes, latency))
+
+    def miss(self, key: str, tier: str, latency: Optional[float] = None) -> None:
+        self.record(CacheEvent("miss", tier, self.namespace(key), key, latency=latency))
+
+    def write(self, key: str, nbytes: int) -> None:
+        self.record(CacheEvent("write", "l2", self.namespace(key), key, nbytes))
+
+    def error(self, key: str, tier: str = "l2") -> None:
+        self.record(CacheEvent("error", tier, self.namespace(key), key))
+
+    def latency(self, keys: List[str], seconds: float) -> None:
+        """Record one round-trip against every namespace it touched"""
+        for namespace in {self.namespace(key) for key in keys}:
+            self._stats(namespace).latency.observe(seconds)
+
+    def record(self, event: CacheEvent) -> None:
+        stats = self._stats(event.namespace)
+        if event.kind == "write":
+            stats.writes += 1
+            stats.bytes_written += event.nbytes
+        else:
+            stats.tiers[event.tier][COUNTERS[event.kind]] += 1
+            if event.kind == "hit":
+                stats.bytes_read += event.nbytes
+
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                logger.error(f"Cache metrics hook failed: {str(e)}")
+
+    def tier_totals(self) -> Dict[str, Dict[str, int]]:
+        """Get hit, miss and error counters summed over all namespaces"""
+        totals = {tier: {"hits": 0, "misses": 0, "errors": 0} for tier in ("l1", "l2")}
+        for stats in self.namespaces.values():
+            for tier, counters in stats.tiers.items():
+                for name, count in counters.items():
+                    totals[tier][name] += count
+        return totals
+
+    def summary(self) -> Dict[str, Dict]:
+        """Get a per-namespace summary, busiest namespaces first"""
+        ranked = sorted(
+            self.namespaces.items(),
+            key=lambda item: -(item[1].tiers["l2"]["hits"] + item[1].tiers["l2"]["misses"] + item[1].writes)
+        )
+        return {namespace: stats.summary() for namespace, stats in ranked}
+
+    def reset(self) -> None:
+        self.namespaces.clear()
+
+    def _stats(self, namespace: str) -> NamespaceStats:
+        stats = self.namespaces.get(namespace)
+        if stats is None:
+            stats = self.namespaces[namespace] = NamespaceStats()
+        return stats
@@ -0,0 +1,255 @@
+from typing import Any, Dict, List, Optional
+import json
+import struct
+import zlib
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Tagged values start with a byte that can never begin UTF-8 JSON text,
+# so untagged entries written before codecs existed are still readable.
+FORMAT_MARKER = b"\xfc"
+HEADER_SIZE = 3
+
+class Codec:
+    """Encodes cache values to bytes and back"""
+    name = ""
+    tag = b""
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+class JsonCodec(Codec):
+    name = "json"
+    tag = b"j"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+    tag = b"o"
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(
+            value,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+class MsgpackCodec(Codec):
+    """MessagePack with homogeneous numeric lists stored as raw numpy buffers.
+
+    Float lists are stored as float32 when that round-trips exactly
+    (CLIP embeddings are float32 to begin with) and as float64 otherwise,
+    so decoding always returns the original Python values.
+    """
+    name = "msgpack"
+    tag = b"m"
+
+    ARRAY_EXT = 1
+    MIN_ARRAY_SIZE = 8
+    DTYPES = {0: "<f4", 1: "<f8", 2: "<i4", 3: "<i8"}
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(self._pack(value), use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(
+            data,
+            raw=False,
+            strict_map_key=False,
+            ext_hook=self._unpack_array
+        )
+
+    def _pack(self, value: Any) -> Any:
+        """Replace numeric lists with array extensions, mirroring JSON key rules"""
+        if isinstance(value, dict):
+            return {
+                key if isinstance(key, str) else json.dumps(key): self._pack(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            array = self._as_array(value)
+            if array is not None:
+                return self._pack_array(array)
+            return [self._pack(item) for item in value]
+        if isinstance(value, np.ndarray):
+            return self._pack(value.tolist())
+        return value
+
+    def _as_array(self, items) -> Optional[np.ndarray]:
+        """Convert a 1-D or rectangular 2-D list of same-typed numbers"""
+        if not items:
+            return None
+
+        rows = items if isinstance(items[0], (list, tuple)) else [items]
+        leaf_types = set()
+        for row in rows:
+            if not isinstance(row, (list, tuple)) or not row:
+                return None
+            leaf_types.update(map(type, row))
+            if len(leaf_types) > 1:
+                return None
+
+        try:
+            if leaf_types == {float}:
+                array = np.array(items, dtype=np.float64)
+                narrowed = array.astype(np.float32)
+                if np.array_equal(narrowed.astype(np.float64), array, equal_nan=True):
+                    array = narrowed
+            elif leaf_types == {int}:
+                array = np.array(items, dtype=np.int64)
+                if array.min() >= np.iinfo(np.int32).min and array.max() <= np.iinfo(np.int32).max:
+                    array = array.astype(np.int32)
+            else:
+                return None
+        except (ValueError, OverflowError):
+            return None  # ragged rows or integers beyond int64
+
+        if array.ndim != (2 if rows is items else 1) or array.size < self.MIN_ARRAY_SIZE:
+            return None
+        return array
+
+    def _pack_array(self, array: np.ndarray) -> "msgpack.ExtType":
+        dtype_code = next(
+            code for code, dtype in self.DTYPES.items() if np.dtype(dtype) == array.dtype
+        )
+        header = struct.pack(f"<BB{array.ndim}I", dtype_code, array.ndim, *array.shape)
+        return msgpack.ExtType(
+            self.ARRAY_EXT,
+            header + array.astype(self.DTYPES[dtype_code], copy=False).tobytes()
+        )
+
+    def _unpack_array(self, code: int, data: bytes) -> Any:
+        if code != self.ARRAY_EXT:
+            return msgpack.ExtType(code, data)
+
+        dtype_code, ndim = struct.unpack_from("<BB", data)
+        shape = struct.unpack_from(f"<{ndim}I", data, 2)
+        offset = 2 + 4 * ndim
+        return np.frombuffer(data, dtype=self.DTYPES[dtype_code], offset=offset).reshape(shape).tolist()
+
+class Compressor:
+    """Optional compression applied to encoded payloads"""
+
+    TAGS = {"none": b"0", "zstd": b"z", "lz4": b"l", "zlib": b"g"}
+
+    def __init__(self, name: Optional[str] = None, level: int = 3):
+        self.name = name or "none"
+        if self.name not in self.TAGS:
+            raise ValueError(f"Unknown cache compression: {self.name}")
+        if self.name == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        if self.name == "lz4" and lz4_frame is None:
+            raise ValueError("lz4 compression requires the lz4 package")
+
+        self.tag = self.TAGS[self.name]
+        self.level = level
+        self._zstd_compressor = None
+        self._zstd_decompressor = None
+
+    def compress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            if self._zstd_compressor is None:
+                self._zstd_compressor = zstandard.ZstdCompressor(level=self.level)
+            return self._zstd_compressor.compress(data)
+        if self.name == "lz4":
+            return lz4_frame.compress(data)
+        if self.name == "zlib":
+            return zlib.compress(data)
+        return data
+
+    def decompress(self, tag: bytes, data: bytes) -> bytes:
+        if tag == self.TAGS["zstd"]:
+            if zstandard is None:
+                raise ValueError("zstd-compressed cache value but zstandard is not installed")
+            if self._zstd_decompressor is None:
+                self._zstd_decompressor = zstandard.ZstdDecompressor()
+            return self._zstd_decompressor.decompress(data)
+        if tag == self.TAGS["lz4"]:
+            if lz4_frame is None:
+                raise ValueError("lz4-compressed cache value but lz4 is not installed")
+            return lz4_frame.decompress(data)
+        if tag == self.TAGS["zlib"]:
+            return zlib.decompress(data)
+        if tag == self.TAGS["none"]:
+            return data
+        raise ValueError(f"Unknown cache compression tag: {tag!r}")
+
+def available_codecs() -> Dict[str, Codec]:
+    """Get the codecs whose dependencies are installed, keyed by name"""
+    codecs: List[Codec] = [JsonCodec()]
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    if msgpack is not None:
+        codecs.append(MsgpackCodec())
+    return {codec.name: codec for codec in codecs}
+
+class ValueSerializer:
+    """Encodes cache values as a format tag, a compression tag and a payload"""
+
+    def __init__(
+        self,
+        codec: str = "auto",
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024
+    ):
+        self.codecs = available_codecs()
+        self.codecs_by_tag = {c.tag: c for c in self.codecs.values()}
+        if codec == "auto":
+            codec = next(name for name in ("msgpack", "orjson", "json") if name in self.codecs)
+        if codec not in self.codecs:
+            raise ValueError(f"Cache codec '{codec}' is unknown or not installed")
+
+        self.codec = self.codecs[codec]
+        self.compressor = Compressor(compression)
+        self.compression_threshold = compression_threshold
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value for storage"""
+        payload = self.codec.encode(value)
+        compression_tag = Compressor.TAGS["none"]
+        if self.compressor.name != "none" and len(payload) >= self.compression_threshold:
+            compressed = self.compressor.compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                compression_tag = self.compressor.tag
+        return FORMAT_MARKER + self.codec.tag + compression_tag + payload
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a stored value, including untagged legacy JSON"""
+        if not data.startswith(FORMAT_MARKER):
+            return json.loads(data)
+
+        codec = self.codecs_by_tag.get(data[1:2])
+        if codec is None:
+            raise ValueError(f"Cache value uses unavailable codec tag {data[1:2]!r}")
+        payload = self.compressor.decompress(data[2:3], data[HEADER_SIZE:])
+        return codec.decode(payload)
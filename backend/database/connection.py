@@ -1,32 +1,49 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator, Dict
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from ..config import settings
 
-# Create SQLAlchemy engine with configured database URL
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_timeout=settings.DB_POOL_TIMEOUT,
-    pool_recycle=settings.DB_POOL_RECYCLE,
-    echo=settings.DB_ECHO_SQL
-)
+# Async drivers for URLs that name only the database dialect
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+def _async_url(url: str):
+    """Use the async driver for plain URLs such as postgresql://..."""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    return url.set(drivername=f"{url.drivername}+{driver}") if driver else url
+
+def _engine_options(url) -> Dict:
+    options = {"echo": settings.DB_ECHO_SQL}
+    # SQLite uses a static/single-connection pool that takes no sizing arguments
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+    return options
+
+# Create SQLAlchemy async engine with configured database URL
+database_url = _async_url(settings.DATABASE_URL)
+engine = create_async_engine(database_url, **_engine_options(database_url))
 
-# Create session factory
-SessionLocal = sessionmaker(
-    autocommit=False,
+# Create session factory; objects stay usable after commit without a refresh round-trip
+SessionLocal = async_sessionmaker(
+    bind=engine,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False
 )
 
 # Create base class for declarative models
 Base = declarative_base()
 
 # Dependency to get database session
-async def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
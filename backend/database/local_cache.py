@@ -0,0 +1,68 @@
+from typing import Any, Optional, Tuple
+from collections import OrderedDict
+import time
+
+class LocalCache:
+    """Bounded in-process LRU cache with per-entry TTL and a byte budget.
+
+    Values are kept decoded, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, max_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Total encoded size of the cached entries"""
+        return self._bytes
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for key, dropping it if it has expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None) -> None:
+        """Store value, capping its lifetime at the configured staleness bound"""
+        self._remove(key)
+
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        self._entries[key] = (value, size, time.monotonic() + ttl)
+        self._bytes += size
+
+        # Evict least recently used entries until both budgets are met
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def invalidate(self, key: str) -> None:
+        """Drop a single key"""
+        self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
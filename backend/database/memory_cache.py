@@ -0,0 +1,304 @@
+from typing import Any, Dict, List, Optional, Tuple
+import fnmatch
+import hashlib
+import time
+from redis import ResponseError
+from .cache import ADD_TAG_MEMBER_SCRIPT, POP_TAG_SCRIPT, RELEASE_LOCK_SCRIPT, RedisCache
+
+class MemoryRedis:
+    """In-process stand-in for the subset of redis.asyncio that RedisCache uses.
+
+    Every command completes without yielding to the event loop, so each
+    one is atomic just as it is on a Redis server. That holds for the
+    Lua scripts RedisCache registers too, which run as Python methods.
+    """
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._writes = 0
+        self._scripts = {
+            script_sha(ADD_TAG_MEMBER_SCRIPT): self._add_tag_member,
+            script_sha(POP_TAG_SCRIPT): self._pop_tag,
+            script_sha(RELEASE_LOCK_SCRIPT): self._release_lock
+        }
+
+    # Keys and expiry
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+    async def renamenx(self, key: str, new_key: str) -> bool:
+        if not self._alive(key):
+            raise ResponseError("no such key")
+        if self._alive(new_key):
+            return False
+        self._data[new_key] = self._data.pop(key)
+        if key in self._expires:
+            self._expires[new_key] = self._expires.pop(key)
+        return True
+
+    async def persist(self, key: str) -> bool:
+        return self._alive(key) and self._expires.pop(key, None) is not None
+
+    async def pttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        if key not in self._expires:
+            return -1
+        return int((self._expires[key] - time.monotonic()) * 1000)
+
+    async def scan(self, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None) -> Tuple[int, List[bytes]]:
+        self._sweep()
+        keys = [
+            key.encode() for key in list(self._data)
+            if match is None or fnmatch.fnmatchcase(key, match)
+        ]
+        return 0, keys
+
+    # Strings
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._data.get(key) if self._alive(key) else None
+
+    async def mget(self, keys: List[str], *args: str) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in list(keys) + list(args)]
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ex: Optional[int] = None,
+        px: Optional[int] = None,
+        nx: bool = False
+    ) -> Optional[bool]:
+        if nx and self._alive(key):
+            return None
+        self._write(key, self._encode(value))
+        if ex:
+            self._expires[key] = time.monotonic() + ex
+        elif px:
+            self._expires[key] = time.monotonic() + px / 1000
+        return True
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(await self.get(key) or 0) + amount
+        self._data[key] = self._encode(value)
+        return value
+
+    # Hashes
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        fields = self._hash(key)
+        value = int(fields.get(self._encode(field), 0)) + amount
+        fields[self._encode(field)] = self._encode(value)
+        return value
+
+    async def hincrbyfloat(self, key: str, field: str, amount: float = 1.0) -> float:
+        fields = self._hash(key)
+        value = float(fields.get(self._encode(field), 0)) + amount
+        fields[self._encode(field)] = self._encode(repr(value))
+        return value
+
+    async def hsetnx(self, key: str, field: str, value: Any) -> bool:
+        fields = self._hash(key)
+        if self._encode(field) in fields:
+            return False
+        fields[self._encode(field)] = self._encode(value)
+        return True
+
+    async def hget(self, key: str, field: str) -> Optional[bytes]:
+        return self._data.get(key, {}).get(self._encode(field)) if self._alive(key) else None
+
+    async def hgetall(self, key: str) -> Dict[bytes, bytes]:
+        return dict(self._data.get(key, {})) if self._alive(key) else {}
+
+    # Sets
+
+    async def sadd(self, key: str, *members: Any) -> int:
+        members = {self._encode(member) for member in members}
+        current = self._data.get(key) if self._alive(key) else None
+        if current is None:
+            current = set()
+            self._write(key, current)
+        added = len(members - current)
+        current.update(members)
+        return added
+
+    async def smembers(self, key: str) -> set:
+        return set(self._data.get(key, ())) if self._alive(key) else set()
+
+    async def spop(self, key: str, count: Optional[int] = None) -> Any:
+        members = self._data.get(key) if self._alive(key) else None
+        if not members:
+            return [] if count is not None else None
+        popped = [members.pop() for _ in range(min(count or 1, len(members)))]
+        if not members:
+            await self.delete(key)
+        return popped if count is not None else popped[0]
+
+    # Connection
+
+    async def publish(self, channel: str, message: Any) -> int:
+        return 0  # No other processes share this cache
+
+    async def ping(self) -> bool:
+        return True
+
+    async def aclose(self) -> None:
+        pass
+
+    def pipeline(self, transaction: bool = False) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+    # Scripts
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        return await self.evalsha(script_sha(script), numkeys, *keys_and_args)
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: Any) -> Any:
+        run = self._scripts.get(sha)
+        if run is None:
+            raise ResponseError("script not available in the memory backend")
+        return await run(list(keys_and_args[:numkeys]), list(keys_and_args[numkeys:]))
+
+    def register_script(self, script: str) -> "MemoryScript":
+        return MemoryScript(self, script)
+
+    async def _add_tag_member(self, keys: List[str], args: List[Any]) -> int:
+        ttl = await self.pttl(keys[0])
+        await self.sadd(keys[0], args[0])
+        expire = int(args[1]) * 1000
+        if expire == 0:
+            await self.persist(keys[0])
+        elif ttl == -2 or 0 <= ttl < expire:
+            self._expires[keys[0]] = time.monotonic() + expire / 1000
+        return 1
+
+    async def _pop_tag(self, keys: List[str], args: List[Any]) -> List[bytes]:
+        members = list(await self.smembers(keys[0]))
+        await self.delete(*(member.decode() for member in members), keys[0])
+        return members
+
+    async def _release_lock(self, keys: List[str], args: List[Any]) -> int:
+        if await self.get(keys[0]) == self._encode(args[0]):
+            return await self.delete(keys[0])
+        return 0
+
+    def _hash(self, key: str) -> Dict[bytes, bytes]:
+        current = self._data.get(key) if self._alive(key) else None
+        if current is None:
+            current = {}
+            self._write(key, current)
+        return current
+
+    def _alive(self, key: str) -> bool:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return False
+        return key in self._data
+
+    def _write(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._expires.pop(key, None)
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self._sweep()
+
+    def _sweep(self) -> None:
+        """Drop expired keys that were never read again"""
+        now = time.monotonic()
+        for key in [key for key, deadline in self._expires.items() if deadline <= now]:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+def script_sha(script: str) -> str:
+    return hashlib.sha1(script.encode()).hexdigest()
+
+class MemoryScript:
+    """A registered script, called like redis-py's Script"""
+
+    def __init__(self, client: MemoryRedis, script: str):
+        self.registered_client = client
+        self.script = script
+        self.sha = script_sha(script)
+
+    async def __call__(self, keys: Optional[List[str]] = None, args: Optional[List[Any]] = None, client=None) -> Any:
+        keys, args = keys or [], args or []
+        return await (client or self.registered_client).evalsha(self.sha, len(keys), *keys, *args)
+
+class MemoryPipeline:
+    """Queues MemoryRedis commands and runs them in order on execute"""
+
+    def __init__(self, client: MemoryRedis):
+        self._client = client
+        self._commands = []
+        # Scripts to load before execute, as on a redis-py pipeline; the
+        # memory backend knows every script already
+        self.scripts = set()
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def __getattr__(self, name: str):
+        command = getattr(self._client, name)
+
+        def queue(*args, **kwargs) -> "MemoryPipeline":
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    async def __aenter__(self) -> "MemoryPipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.reset()
+
+    async def execute(self) -> List:
+        commands, self._commands = self._commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+    async def reset(self) -> None:
+        self._commands = []
+        self.scripts = set()
+
+class MemoryCache(RedisCache):
+    """RedisCache backed by process memory instead of a Redis server.
+
+    Supports the full RedisCache interface, including TTLs, tags,
+    pipelines and single-flight computation, for tests, benchmarks and
+    single-node deployments. The local tier is disabled since every
+    read is already in-process.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.local = None
+
+    def _create_client(self) -> MemoryRedis:
+        return MemoryRedis()
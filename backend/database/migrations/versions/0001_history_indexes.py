@@ -0,0 +1,46 @@
+"""Add composite indexes for per-user history queries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("menus", sa.Column("created_at", sa.DateTime(), nullable=True))
+
+    # Build without blocking writes on large PostgreSQL tables; CONCURRENTLY
+    # cannot run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_meal_records_user_id_consumed_at",
+            "meal_records",
+            ["user_id", sa.text("consumed_at DESC")],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_watch_data_user_id_timestamp",
+            "watch_data",
+            ["user_id", "timestamp"],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_menus_user_id_created_at",
+            "menus",
+            ["user_id", "created_at"],
+            postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_menus_user_id_created_at", table_name="menus", postgresql_concurrently=True)
+        op.drop_index("ix_watch_data_user_id_timestamp", table_name="watch_data", postgresql_concurrently=True)
+        op.drop_index("ix_meal_records_user_id_consumed_at", table_name="meal_records", postgresql_concurrently=True)
+    op.drop_column("menus", "created_at")
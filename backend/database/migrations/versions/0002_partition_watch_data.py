@@ -0,0 +1,80 @@
+"""Partition watch_data by month on timestamp
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+PostgreSQL only; other databases keep the plain table. Existing rows are
+copied into the new partitions, so run this in a maintenance window.
+"""
+
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+from backend.config import settings
+from backend.database.partitions import (
+    create_default_partition_sql,
+    create_partition_sql,
+    month_range,
+    month_start
+)
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE watch_data RENAME TO watch_data_unpartitioned")
+    op.execute("ALTER INDEX ix_watch_data_user_id_timestamp RENAME TO ix_watch_data_unpartitioned_user_id_timestamp")
+    op.execute("ALTER INDEX ix_watch_data_id RENAME TO ix_watch_data_unpartitioned_id")
+
+    # The partition key must be part of every unique constraint, so the
+    # primary key becomes (id, timestamp); ids still come from one sequence
+    op.execute(
+        "CREATE TABLE watch_data "
+        "(LIKE watch_data_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (timestamp)"
+    )
+    op.execute("ALTER TABLE watch_data ADD PRIMARY KEY (id, timestamp)")
+    op.execute("ALTER TABLE watch_data ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER SEQUENCE watch_data_id_seq OWNED BY watch_data.id")
+    op.create_index("ix_watch_data_id", "watch_data", ["id"])
+    op.create_index("ix_watch_data_user_id_timestamp", "watch_data", ["user_id", "timestamp"])
+
+    today = datetime.utcnow().date()
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM watch_data_unpartitioned")).scalar()
+    # Expired months get partitions too, so retention can drop them later
+    first = oldest.date() if oldest else today
+    for month in month_range(first, month_start(today, settings.WATCH_DATA_PARTITIONS_AHEAD)):
+        op.execute(create_partition_sql("watch_data", month))
+    op.execute(create_default_partition_sql("watch_data"))
+
+    op.execute("INSERT INTO watch_data SELECT * FROM watch_data_unpartitioned")
+    op.execute("DROP TABLE watch_data_unpartitioned")
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE watch_data RENAME TO watch_data_partitioned")
+    op.execute("ALTER INDEX ix_watch_data_user_id_timestamp RENAME TO ix_watch_data_partitioned_user_id_timestamp")
+    op.execute("ALTER INDEX ix_watch_data_id RENAME TO ix_watch_data_partitioned_id")
+
+    op.execute(
+        "CREATE TABLE watch_data "
+        "(LIKE watch_data_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("ALTER TABLE watch_data ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE watch_data ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER SEQUENCE watch_data_id_seq OWNED BY watch_data.id")
+    op.create_index("ix_watch_data_id", "watch_data", ["id"])
+    op.create_index("ix_watch_data_user_id_timestamp", "watch_data", ["user_id", "timestamp"])
+
+    op.execute("INSERT INTO watch_data SELECT * FROM watch_data_partitioned")
+    op.execute("DROP TABLE watch_data_partitioned")
@@ -0,0 +1,101 @@
+"""Move raw watch payloads to compressed, content-addressed watch_data_raw
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+from backend.database.raw_payloads import decode_payload, encode_payload, payload_compressor
+from backend.database.upsert import insert_for
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+raw_table = sa.table(
+    "watch_data_raw",
+    sa.column("digest", sa.String),
+    sa.column("payload", sa.LargeBinary),
+    sa.column("created_at", sa.DateTime)
+)
+
+watch_data = sa.table(
+    "watch_data",
+    sa.column("id", sa.Integer),
+    sa.column("timestamp", sa.DateTime),
+    sa.column("raw_data", sa.JSON),
+    sa.column("raw_data_ref", sa.String)
+)
+
+def upgrade() -> None:
+    op.create_table(
+        "watch_data_raw",
+        sa.Column("digest", sa.String(32), primary_key=True),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False)
+    )
+    op.create_index("ix_watch_data_raw_created_at", "watch_data_raw", ["created_at"])
+    op.add_column("watch_data", sa.Column("raw_data_ref", sa.String(32), nullable=True))
+
+    bind = op.get_bind()
+    compressor = payload_compressor()
+    insert = insert_for(bind.dialect.name, raw_table)
+    upsert = insert.on_conflict_do_nothing(index_elements=["digest"])
+    now = datetime.utcnow()
+
+    # Walk rows by id so each batch is an index range scan
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(watch_data.c.id, watch_data.c.timestamp, watch_data.c.raw_data).where(
+                watch_data.c.id > last_id,
+                watch_data.c.raw_data.is_not(None)
+            ).order_by(watch_data.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        refs, blobs = [], {}
+        for row_id, timestamp, raw_data in rows:
+            if raw_data is None:
+                continue  # JSON null rather than SQL NULL
+            digest, blob = encode_payload(raw_data, compressor)
+            blobs[digest] = blob
+            refs.append({"row_id": row_id, "row_timestamp": timestamp, "ref": digest})
+
+        bind.execute(upsert, [
+            {"digest": digest, "payload": blob, "created_at": now}
+            for digest, blob in blobs.items()
+        ])
+        bind.execute(sa.text(
+            "UPDATE watch_data SET raw_data_ref = :ref "
+            "WHERE id = :row_id AND timestamp = :row_timestamp"
+        ), refs)
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table("watch_data") as batch:
+        batch.drop_column("raw_data")
+
+def downgrade() -> None:
+    with op.batch_alter_table("watch_data") as batch:
+        batch.add_column(sa.Column("raw_data", sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    compressor = payload_compressor()
+    for digest, blob in bind.execute(sa.select(raw_table.c.digest, raw_table.c.payload)):
+        bind.execute(
+            watch_data.update().where(
+                watch_data.c.raw_data_ref == digest
+            ).values(raw_data=decode_payload(blob, compressor))
+        )
+
+    with op.batch_alter_table("watch_data") as batch:
+        batch.drop_column("raw_data_ref")
+    op.drop_index("ix_watch_data_raw_created_at", table_name="watch_data_raw")
+    op.drop_table("watch_data_raw")
@@ -0,0 +1,43 @@
+"""Add hourly and daily watch metric rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+Existing data can be backfilled per user with WatchRollupService.rebuild.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "watch_metric_rollups",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("granularity", sa.String(8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("steps", sa.Integer(), nullable=False),
+        sa.Column("calories_burned", sa.Float(), nullable=False),
+        sa.Column("distance", sa.Float(), nullable=False),
+        sa.Column("heart_rate_sum", sa.Float(), nullable=False),
+        sa.Column("heart_rate_samples", sa.Integer(), nullable=False),
+        sa.Column("heart_rate_min", sa.Float()),
+        sa.Column("heart_rate_max", sa.Float()),
+        sa.Column("heart_rate_resting", sa.Float()),
+        sa.Column("sedentary_minutes", sa.Integer(), nullable=False),
+        sa.Column("lightly_active_minutes", sa.Integer(), nullable=False),
+        sa.Column("fairly_active_minutes", sa.Integer(), nullable=False),
+        sa.Column("very_active_minutes", sa.Integer(), nullable=False),
+        sa.Column("sleep_duration", sa.Integer(), nullable=False),
+        sa.Column("sleep_efficiency_sum", sa.Float(), nullable=False),
+        sa.Column("sleep_samples", sa.Integer(), nullable=False)
+    )
+
+def downgrade() -> None:
+    op.drop_table("watch_metric_rollups")
@@ -0,0 +1,39 @@
+"""Add daily nutrition and compliance rollups
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+Existing meals can be backfilled per user with NutritionRollupService.rebuild.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_nutrition_rollups",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("meal_type", sa.String(16), primary_key=True),
+        sa.Column("meal_count", sa.Integer(), nullable=False),
+        sa.Column("skipped_count", sa.Integer(), nullable=False),
+        sa.Column("outside_count", sa.Integer(), nullable=False),
+        sa.Column("protein", sa.Float(), nullable=False),
+        sa.Column("carbs", sa.Float(), nullable=False),
+        sa.Column("fats", sa.Float(), nullable=False),
+        sa.Column("fiber", sa.Float(), nullable=False),
+        sa.Column("calories", sa.Float(), nullable=False),
+        sa.Column("compliance_sum", sa.Float(), nullable=False),
+        sa.Column("compliance_samples", sa.Integer(), nullable=False),
+        sa.Column("pass_count", sa.Integer(), nullable=False),
+        sa.Column("fail_count", sa.Integer(), nullable=False)
+    )
+
+def downgrade() -> None:
+    op.drop_table("daily_nutrition_rollups")
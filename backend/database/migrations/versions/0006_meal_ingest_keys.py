@@ -0,0 +1,26 @@
+"""Add idempotency keys for bulk meal sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "meal_ingest_keys",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("idempotency_key", sa.String(64), primary_key=True),
+        sa.Column("meal_id", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(), nullable=False)
+    )
+
+def downgrade() -> None:
+    op.drop_table("meal_ingest_keys")
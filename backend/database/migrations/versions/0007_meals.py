@@ -0,0 +1,36 @@
+"""Add the meals table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "meals",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("meal_type", sa.Enum("BREAKFAST", "LUNCH", "DINNER", "SNACK", name="mealtype"), nullable=False),
+        sa.Column("status", sa.Enum("COMPLETED", "SKIPPED", name="mealstatus"), nullable=False),
+        sa.Column("location", sa.String(16)),
+        sa.Column("items", sa.JSON()),
+        sa.Column("nutritional_info", sa.JSON()),
+        sa.Column("image_url", sa.String()),
+        sa.Column("compliance_score", sa.Float()),
+        sa.Column("scheduled_time", sa.DateTime()),
+        sa.Column("consumed_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime(), nullable=False)
+    )
+
+def downgrade() -> None:
+    op.drop_table("meals")
+    sa.Enum(name="mealstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="mealtype").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""Index meals for per-user history in the order they took place
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # On Meal.occurred_at; id completes the analyzer's keyset order, so pages need no sort
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_meals_user_id_occurred_at",
+            "meals",
+            ["user_id", sa.text("coalesce(consumed_at, scheduled_time)"), "id"],
+            postgresql_concurrently=True
+        )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_meals_user_id_occurred_at", table_name="meals", postgresql_concurrently=True)
@@ -4,7 +4,11 @@ Database Models Package
 
 from .user import User
 from .meal_record import MealRecord
+from .meal import Meal, MealType, MealStatus
 from .menu import Menu
-from .watch_data import WatchData
+from .watch_data import WatchData, WatchDataRaw
+from .watch_metric_rollup import WatchMetricRollup
+from .daily_nutrition_rollup import DailyNutritionRollup
+from .meal_ingest_key import MealIngestKey
 
-__all__ = ['User', 'MealRecord', 'Menu', 'WatchData'] 
\ No newline at end of file
+__all__ = ['User', 'MealRecord', 'Meal', 'MealType', 'MealStatus', 'Menu', 'WatchData', 'WatchDataRaw', 'WatchMetricRollup', 'DailyNutritionRollup', 'MealIngestKey'] 
\ No newline at end of file
@@ -0,0 +1,60 @@
+from typing import Dict, Optional
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, String
+from ..connection import Base
+
+class DailyNutritionRollup(Base):
+    """Per-user, per-day, per-meal-type aggregate of logged meals.
+
+    Sums and counts are stored instead of averages so the row can be
+    updated in the transaction that logs a meal, and day or month
+    statistics never have to read the meals themselves.
+    """
+    __tablename__ = "daily_nutrition_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    meal_type = Column(String(16), primary_key=True)
+
+    meal_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    outside_count = Column(Integer, nullable=False, default=0)  # meals eaten away from home
+
+    # Nutrition sums, in grams except calories
+    protein = Column(Float, nullable=False, default=0.0)
+    carbs = Column(Float, nullable=False, default=0.0)
+    fats = Column(Float, nullable=False, default=0.0)
+    fiber = Column(Float, nullable=False, default=0.0)
+    calories = Column(Float, nullable=False, default=0.0)
+
+    # Compliance
+    compliance_sum = Column(Float, nullable=False, default=0.0)
+    compliance_samples = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+    fail_count = Column(Integer, nullable=False, default=0)
+
+    @property
+    def compliance_mean(self) -> Optional[float]:
+        return self.compliance_sum / self.compliance_samples if self.compliance_samples else None
+
+    def to_dict(self) -> Dict:
+        """Convert rollup model to dictionary"""
+        return {
+            "user_id": self.user_id,
+            "day": self.day.isoformat(),
+            "meal_type": self.meal_type,
+            "meal_count": self.meal_count,
+            "skipped_count": self.skipped_count,
+            "outside_count": self.outside_count,
+            "nutrition": {
+                "protein": self.protein,
+                "carbs": self.carbs,
+                "fats": self.fats,
+                "fiber": self.fiber,
+                "calories": self.calories
+            },
+            "compliance": {
+                "mean": self.compliance_mean,
+                "passes": self.pass_count,
+                "fails": self.fail_count
+            }
+        }
@@ -0,0 +1,74 @@
+from typing import Dict, Optional
+from datetime import datetime
+import enum
+from sqlalchemy import Column, Integer, Float, DateTime, JSON, ForeignKey, String, Enum, Index, func
+from sqlalchemy.ext.hybrid import hybrid_property
+from ..connection import Base
+
+class MealType(enum.Enum):
+    BREAKFAST = "breakfast"
+    LUNCH = "lunch"
+    DINNER = "dinner"
+    SNACK = "snack"
+
+class MealStatus(enum.Enum):
+    COMPLETED = "completed"
+    SKIPPED = "skipped"
+
+class Meal(Base):
+    """A logged or skipped meal.
+
+    scheduled_time is when the meal was planned and consumed_at when it
+    was eaten; skipped meals have no consumed_at, and meals logged
+    without a plan have no scheduled_time. occurred_at is whichever
+    applies, and is what rollups and analyses date a meal by.
+    Statistics read the daily rollups (DailyNutritionRollup) rather than
+    these rows where they can.
+    """
+    __tablename__ = "meals"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    meal_type = Column(Enum(MealType), nullable=False)
+    status = Column(Enum(MealStatus), nullable=False, default=MealStatus.COMPLETED)
+    location = Column(String(16))  # "home" or "outside"
+
+    items = Column(JSON, default=list)
+    nutritional_info = Column(JSON, default=dict)
+    image_url = Column(String)
+    compliance_score = Column(Float)
+
+    scheduled_time = Column(DateTime)
+    consumed_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Per-user history in the analyzer's (occurred_at, id) keyset order
+        Index("ix_meals_user_id_occurred_at", user_id, func.coalesce(consumed_at, scheduled_time), id),
+    )
+
+    @hybrid_property
+    def occurred_at(self) -> Optional[datetime]:
+        """When the meal was eaten, or was planned for if it was not"""
+        return self.consumed_at or self.scheduled_time
+
+    @occurred_at.inplace.expression
+    @classmethod
+    def _occurred_at_expression(cls):
+        return func.coalesce(cls.consumed_at, cls.scheduled_time)
+
+    def to_dict(self) -> Dict:
+        """Convert meal model to dictionary"""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "meal_type": self.meal_type.value if self.meal_type else None,
+            "status": self.status.value if self.status else None,
+            "location": self.location,
+            "items": self.items,
+            "nutritional_info": self.nutritional_info,
+            "image_url": self.image_url,
+            "compliance_score": self.compliance_score,
+            "scheduled_time": self.scheduled_time.isoformat() if self.scheduled_time else None,
+            "consumed_at": self.consumed_at.isoformat() if self.consumed_at else None
+        }
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from ..connection import Base
+
+class MealIngestKey(Base):
+    """Client-supplied idempotency key of a meal logged through bulk sync.
+
+    The key is claimed in the transaction that stores the meal, so a
+    retried upload finds it taken and the meal is not stored twice.
+    """
+    __tablename__ = "meal_ingest_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    idempotency_key = Column(String(64), primary_key=True)
+    meal_id = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..connection import Base
 
@@ -9,4 +9,9 @@ class MealRecord(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     meal_type = Column(String)
     consumed_at = Column(DateTime)
+
+    __table_args__ = (
+        # Per-user history, newest first
+        Index("ix_meal_records_user_id_consumed_at", user_id, consumed_at.desc()),
+    )
     # Additional fields 
\ No newline at end of file
@@ -1,8 +1,9 @@
 from typing import Dict, Optional
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, JSON, Enum
+from sqlalchemy.orm import relationship
 import enum
-from ..database import Base
+from ..connection import Base
 
 class Gender(enum.Enum):
     MALE = "male"
@@ -65,6 +66,9 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
 
+    # Relationships
+    watch_data = relationship("WatchData", back_populates="user")
+
     def to_dict(self) -> Dict:
         """Convert user model to dictionary"""
         return {
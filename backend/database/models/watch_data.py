@@ -1,9 +1,9 @@
 from typing import Dict
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, JSON, ForeignKey, String, Enum
+from sqlalchemy import Column, Integer, Float, DateTime, JSON, ForeignKey, String, Enum, Index, LargeBinary
 import enum
 from sqlalchemy.orm import relationship
-from ..database import Base
+from ..connection import Base
 
 class DeviceType(enum.Enum):
     APPLE_WATCH = "apple_watch"
@@ -12,6 +12,12 @@ class DeviceType(enum.Enum):
     SAMSUNG = "samsung"
 
 class WatchData(Base):
+    """One collection interval of device metrics.
+
+    On PostgreSQL the table is range-partitioned by month on timestamp
+    (see migration 0002 and database.partitions), with (id, timestamp)
+    as its primary key; queries should always bound timestamp.
+    """
     __tablename__ = "watch_data"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -41,11 +47,16 @@ class WatchData(Base):
     sleep_efficiency = Column(Float)  # percentage
     sleep_stages = Column(JSON)  # {"deep": minutes, "light": minutes, "rem": minutes, "awake": minutes}
     
-    # Raw Data
-    raw_data = Column(JSON)  # Store original device data
+    # Raw Data; digest of the original device payload in watch_data_raw
+    raw_data_ref = Column(String(32), nullable=True)
     
     # Relationship
     user = relationship("User", back_populates="watch_data")
+
+    __table_args__ = (
+        # Per-user time-range scans; also serves descending order
+        Index("ix_watch_data_user_id_timestamp", user_id, timestamp),
+    )
     
     def to_dict(self) -> Dict:
         """Convert watch data model to dictionary"""
@@ -76,5 +87,13 @@ class WatchData(Base):
                 "efficiency": self.sleep_efficiency,
                 "stages": self.sleep_stages
             },
-            "raw_data": self.raw_data
-        } 
\ No newline at end of file
+            "raw_data_ref": self.raw_data_ref
+        }
+
+class WatchDataRaw(Base):
+    """Compressed original device payload, shared by every row with the same content"""
+    __tablename__ = "watch_data_raw"
+
+    digest = Column(String(32), primary_key=True)
+    payload = Column(LargeBinary, nullable=False)  # compression tag byte + compressed JSON
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True) 
\ No newline at end of file
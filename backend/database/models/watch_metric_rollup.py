@@ -0,0 +1,79 @@
+from typing import Dict, Optional
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String
+from ..connection import Base
+
+class WatchMetricRollup(Base):
+    """Hourly or daily aggregate of a user's watch metrics.
+
+    Sums and sample counts are stored instead of averages, so a bucket
+    can be updated incrementally as samples arrive and buckets can be
+    combined without reading the underlying watch_data rows.
+    """
+    __tablename__ = "watch_metric_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    granularity = Column(String(8), primary_key=True)  # hour or day
+    bucket_start = Column(DateTime, primary_key=True)
+
+    sample_count = Column(Integer, nullable=False, default=0)
+
+    # Activity Data
+    steps = Column(Integer, nullable=False, default=0)
+    calories_burned = Column(Float, nullable=False, default=0.0)
+    distance = Column(Float, nullable=False, default=0.0)  # in meters
+
+    # Heart Rate Data
+    heart_rate_sum = Column(Float, nullable=False, default=0.0)
+    heart_rate_samples = Column(Integer, nullable=False, default=0)
+    heart_rate_min = Column(Float)
+    heart_rate_max = Column(Float)
+    heart_rate_resting = Column(Float)  # lowest resting rate in the bucket
+
+    # Activity Minutes
+    sedentary_minutes = Column(Integer, nullable=False, default=0)
+    lightly_active_minutes = Column(Integer, nullable=False, default=0)
+    fairly_active_minutes = Column(Integer, nullable=False, default=0)
+    very_active_minutes = Column(Integer, nullable=False, default=0)
+
+    # Sleep Data
+    sleep_duration = Column(Integer, nullable=False, default=0)  # in minutes
+    sleep_efficiency_sum = Column(Float, nullable=False, default=0.0)
+    sleep_samples = Column(Integer, nullable=False, default=0)
+
+    @property
+    def heart_rate_avg(self) -> Optional[float]:
+        return self.heart_rate_sum / self.heart_rate_samples if self.heart_rate_samples else None
+
+    @property
+    def sleep_efficiency(self) -> Optional[float]:
+        return self.sleep_efficiency_sum / self.sleep_samples if self.sleep_samples else None
+
+    def to_dict(self) -> Dict:
+        """Convert rollup model to dictionary"""
+        return {
+            "user_id": self.user_id,
+            "granularity": self.granularity,
+            "bucket_start": self.bucket_start.isoformat(),
+            "sample_count": self.sample_count,
+            "activity": {
+                "steps": self.steps,
+                "calories_burned": self.calories_burned,
+                "distance": self.distance,
+                "active_minutes": {
+                    "sedentary": self.sedentary_minutes,
+                    "lightly_active": self.lightly_active_minutes,
+                    "fairly_active": self.fairly_active_minutes,
+                    "very_active": self.very_active_minutes
+                }
+            },
+            "heart_rate": {
+                "average": self.heart_rate_avg,
+                "max": self.heart_rate_max,
+                "min": self.heart_rate_min,
+                "resting": self.heart_rate_resting
+            },
+            "sleep": {
+                "duration": self.sleep_duration,
+                "efficiency": self.sleep_efficiency
+            }
+        }
@@ -0,0 +1,210 @@
+from typing import List, Optional, Tuple
+from datetime import date, datetime
+import asyncio
+import logging
+import re
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from ..config import settings
+from .raw_payloads import expire_raw_payloads
+
+logger = logging.getLogger(__name__)
+
+# Partitioned tables and the column they are ranged on
+PARTITIONED_TABLES = {"watch_data": "timestamp"}
+
+# Serializes maintenance across workers; arbitrary but fixed
+MAINTENANCE_LOCK_ID = 0x66697466
+
+COMPACTED_COMMENT = "compacted"
+
+def month_start(value: date, offset: int = 0) -> date:
+    """Get the first day of the month `offset` months after value's month"""
+    month_index = value.year * 12 + value.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+def parse_partition_name(table: str, name: str) -> Optional[date]:
+    """Get the month a partition covers from its name, or None for others"""
+    match = re.fullmatch(rf"{re.escape(table)}_y(\d{{4}})m(\d{{2}})", name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+def create_partition_sql(table: str, month: date) -> str:
+    """DDL for the partition holding [month, next month)"""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+    )
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+def create_default_partition_sql(table: str) -> str:
+    """DDL for the partition catching rows outside every monthly range"""
+    return f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT"
+
+def month_filter_sql(table: str, month: date) -> str:
+    """WHERE clause matching the rows of [month, next month)"""
+    column = PARTITIONED_TABLES[table]
+    return f"{column} >= '{month.isoformat()}' AND {column} < '{month_start(month, 1).isoformat()}'"
+
+def month_range(first: date, last: date) -> List[date]:
+    """Get the first day of every month from first's month through last's month"""
+    months = []
+    month = month_start(first)
+    while month <= last:
+        months.append(month)
+        month = month_start(month, 1)
+    return months
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[Tuple[str, date]]:
+    """Get the attached monthly partitions of a table, oldest first"""
+    result = await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+        "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+        "WHERE parent.relname = :table"
+    ), {"table": table})
+    partitions = []
+    for (name,) in result:
+        month = parse_partition_name(table, name)
+        if month is not None:
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    table: str,
+    months_ahead: int,
+    today: Optional[date] = None
+) -> List[str]:
+    """Create the current month's partition and the next months_ahead ones.
+
+    Postgres refuses to create a partition while the default partition
+    holds rows in its range, e.g. rows written after maintenance fell
+    behind. The default partition is then detached for the duration,
+    and those rows are moved into the new partitions before it is
+    attached again.
+    """
+    today = today or datetime.utcnow().date()
+    existing = {name for name, _ in await list_partitions(conn, table)}
+    missing = [
+        month for month in month_range(today, month_start(today, months_ahead))
+        if partition_name(table, month) not in existing
+    ]
+    default = default_partition_name(table)
+    stranded = []
+    if missing and await conn.scalar(text("SELECT to_regclass(:name)"), {"name": default}) is not None:
+        stranded = [month for month in missing if await conn.scalar(text(
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {month_filter_sql(table, month)})"
+        ))]
+
+    if stranded:
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    created = []
+    for month in missing:
+        await conn.execute(text(create_partition_sql(table, month)))
+        created.append(partition_name(table, month))
+    if stranded:
+        for month in stranded:
+            moved = await conn.execute(text(
+                f"WITH moved AS (DELETE FROM {default} WHERE {month_filter_sql(table, month)} RETURNING *) "
+                f"INSERT INTO {table} SELECT * FROM moved"
+            ))
+            logger.warning(f"Moved {moved.rowcount} {table} rows for {month:%Y-%m} out of {default}")
+        await conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    return created
+
+async def apply_retention(
+    conn: AsyncConnection,
+    table: str,
+    hot_months: int,
+    retention_months: int,
+    drop: bool = True,
+    today: Optional[date] = None
+) -> Tuple[List[str], List[str]]:
+    """Compact partitions past the hot window and detach those past retention.
+
+    Compaction drops references to raw device payloads, keeping the typed
+    metric columns; the payloads themselves expire from watch_data_raw.
+    Expired partitions are detached and, if drop is set, dropped, which
+    costs the same no matter how many rows they hold.
+    """
+    today = today or datetime.utcnow().date()
+    hot_cutoff = month_start(today, -hot_months)
+    retention_cutoff = month_start(today, -retention_months)
+
+    compacted, expired = [], []
+    for name, month in await list_partitions(conn, table):
+        if month < retention_cutoff:
+            await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if drop:
+                await conn.execute(text(f"DROP TABLE {name}"))
+            expired.append(name)
+        elif month < hot_cutoff and not await _is_compacted(conn, name):
+            await conn.execute(text(f"UPDATE {name} SET raw_data_ref = NULL WHERE raw_data_ref IS NOT NULL"))
+            await conn.execute(text(f"COMMENT ON TABLE {name} IS '{COMPACTED_COMMENT}'"))
+            compacted.append(name)
+    return compacted, expired
+
+async def run_partition_maintenance(engine: AsyncEngine, today: Optional[date] = None) -> bool:
+    """Create upcoming partitions and apply retention for every partitioned table.
+
+    Returns False without doing anything when another worker holds the
+    maintenance lock or the database does not support partitioning.
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+
+    today = today or datetime.utcnow().date()
+    async with engine.begin() as conn:
+        locked = await conn.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+            {"lock_id": MAINTENANCE_LOCK_ID}
+        )
+        if not locked:
+            return False
+
+        for table in PARTITIONED_TABLES:
+            created = await ensure_partitions(
+                conn, table, settings.WATCH_DATA_PARTITIONS_AHEAD, today
+            )
+            compacted, expired = await apply_retention(
+                conn,
+                table,
+                hot_months=settings.WATCH_DATA_HOT_MONTHS,
+                retention_months=settings.WATCH_DATA_RETENTION_MONTHS,
+                drop=settings.WATCH_DATA_DROP_EXPIRED,
+                today=today
+            )
+            if created or compacted or expired:
+                logger.info(
+                    f"Partition maintenance for {table}: created {created}, "
+                    f"compacted {compacted}, expired {expired}"
+                )
+
+        # Payloads still referenced by hot rows were refreshed when those rows were written
+        hot_cutoff = month_start(today, -settings.WATCH_DATA_HOT_MONTHS)
+        await expire_raw_payloads(conn, datetime.combine(hot_cutoff, datetime.min.time()))
+    return True
+
+async def partition_maintenance_loop(engine: AsyncEngine, interval: float) -> None:
+    """Run partition maintenance now and then every interval seconds"""
+    while True:
+        try:
+            await run_partition_maintenance(engine)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+async def _is_compacted(conn: AsyncConnection, name: str) -> bool:
+    comment = await conn.scalar(
+        text("SELECT obj_description(CAST(:name AS regclass), 'pg_class')"),
+        {"name": name}
+    )
+    return comment == COMPACTED_COMMENT
@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import datetime
+import hashlib
+import json
+import logging
+from sqlalchemy import delete, select
+from ..config import settings
+from .codecs import Compressor
+from .models.watch_data import WatchDataRaw
+from .upsert import insert_for
+
+logger = logging.getLogger(__name__)
+
+def payload_compressor() -> Compressor:
+    """Get the configured compressor, falling back to zlib if zstd is missing"""
+    try:
+        return Compressor(settings.WATCH_DATA_RAW_COMPRESSION)
+    except ValueError as e:
+        logger.warning(f"{str(e)}; compressing raw watch data with zlib")
+        return Compressor("zlib")
+
+def encode_payload(payload: Dict, compressor: Compressor) -> Tuple[str, bytes]:
+    """Get the content digest and compressed blob of a raw device payload"""
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return digest, compressor.tag + compressor.compress(data)
+
+def decode_payload(blob: bytes, compressor: Compressor) -> Dict:
+    return json.loads(compressor.decompress(blob[:1], blob[1:]))
+
+class RawPayloadStore:
+    """Compressed, content-addressed storage for raw device payloads.
+
+    WatchData rows keep only the digest in raw_data_ref, so scans over the
+    typed metric columns never touch the payloads. Identical payloads are
+    stored once.
+    """
+
+    def __init__(self, db_session):
+        self.db = db_session
+        self.compressor = payload_compressor()
+
+    async def put(self, payload: Dict) -> str:
+        """Store a payload in the current transaction and return its digest"""
+        digest, blob = encode_payload(payload, self.compressor)
+        insert = insert_for(self.db.get_bind().dialect.name, WatchDataRaw.__table__)
+        # Refresh created_at so payloads still referenced by new rows outlive retention
+        await self.db.execute(
+            insert.values(
+                digest=digest,
+                payload=blob,
+                created_at=datetime.utcnow()
+            ).on_conflict_do_update(
+                index_elements=["digest"],
+                set_={"created_at": insert.excluded.created_at}
+            )
+        )
+        return digest
+
+    async def get(self, digest: str) -> Optional[Dict]:
+        """Load one payload, or None if it was never stored or has expired"""
+        return (await self.get_many([digest])).get(digest)
+
+    async def get_many(self, digests: Iterable[str]) -> Dict[str, Dict]:
+        """Load several payloads in one query, keyed by digest"""
+        digests = {digest for digest in digests if digest}
+        if not digests:
+            return {}
+        result = await self.db.execute(
+            select(WatchDataRaw.digest, WatchDataRaw.payload).where(
+                WatchDataRaw.digest.in_(digests)
+            )
+        )
+        return {
+            digest: decode_payload(blob, self.compressor)
+            for digest, blob in result
+        }
+
+async def expire_raw_payloads(conn, before: datetime) -> int:
+    """Delete payloads last referenced before a cutoff"""
+    result = await conn.execute(
+        delete(WatchDataRaw).where(WatchDataRaw.created_at < before)
+    )
+    return result.rowcount
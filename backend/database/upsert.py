@@ -0,0 +1,48 @@
+from typing import Dict, Iterable, List
+from sqlalchemy import Table, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+
+# Dialects whose INSERT supports ON CONFLICT
+INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def insert_for(dialect: str, table: Table) -> Insert:
+    """Get an INSERT for the named dialect that supports on_conflict_do_*"""
+    if dialect not in INSERTS:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return INSERTS[dialect](table)
+
+def accumulate(
+    dialect: str,
+    table: Table,
+    rows: List[Dict],
+    key_columns: Iterable[str],
+    additive_columns: Iterable[str],
+    min_columns: Iterable[str] = (),
+    max_columns: Iterable[str] = ()
+) -> Insert:
+    """Build an upsert that folds rows into existing ones instead of replacing them.
+
+    Additive columns are summed and min/max columns keep the extreme
+    non-NULL value, all inside the UPDATE, so concurrent writers never
+    lose each other's contributions.
+    """
+    insert = insert_for(dialect, table)
+    # NULL-ignoring LEAST/GREATEST; SQLite spells them as multi-argument min/max
+    least, greatest = (func.least, func.greatest) if dialect == "postgresql" else (func.min, func.max)
+
+    set_ = {column: table.c[column] + insert.excluded[column] for column in additive_columns}
+    for columns, pick in ((min_columns, least), (max_columns, greatest)):
+        for column in columns:
+            set_[column] = pick(
+                func.coalesce(table.c[column], insert.excluded[column]),
+                func.coalesce(insert.excluded[column], table.c[column])
+            )
+
+    return insert.values(rows).on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_=set_
+    )
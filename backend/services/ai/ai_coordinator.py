@@ -5,6 +5,7 @@ from .vision_manager import VisionManager
 from .meal_analysis_service import MealAnalysisService
 from ...database.cache import RedisCache
 from ...database.models.user import User
+from ..ingredients import get_ingredient_index
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ class AICoordinator:
         self.vision = vision_manager
         self.meal_analyzer = meal_analysis_service
         self.cache = cache
+        self.ingredients = get_ingredient_index()
         self.confidence_threshold = 0.8
 
     async def analyze_meal_compliance(
@@ -156,9 +158,10 @@ Format response as structured JSON."""
     ) -> Dict:
         """Validate combined results for consistency"""
         try:
-            # Check for major discrepancies between vision and LLM analysis
-            vision_items = set(vision_result.get("detected_items", []))
-            llm_items = set(llm_result.get("identified_items", []))
+            # Check for major discrepancies between vision and LLM analysis,
+            # comparing canonical ingredients rather than the models' wording
+            vision_items = self.ingredients.ids(vision_result.get("detected_items", []))
+            llm_items = self.ingredients.ids(llm_result.get("identified_items", []))
             
             item_agreement = len(vision_items.intersection(llm_items)) / len(vision_items.union(llm_items))
             
@@ -5,6 +5,7 @@ import anthropic
 from datetime import datetime
 from ...config import settings
 from ...database.cache import RedisCache
+from ...database.cache_keys import build_key
 
 logger = logging.getLogger(__name__)
 
@@ -49,21 +50,34 @@ class LLMManager:
         max_retries: int = None
     ) -> Dict:
         """Process request with fallback and retry logic"""
+        # Try cache first; concurrent identical requests share one model call
+        cache_key = build_key(
+            "llm_response",
+            model_key or self.default_model,
+            prompt,
+            context
+        )
+        return await self.cache.get_or_compute(
+            cache_key,
+            lambda: self._request_with_fallback(prompt, model_key, context, max_retries),
+            expire=3600  # Cache for 1 hour
+        )
+
+    async def _request_with_fallback(
+        self,
+        prompt: str,
+        model_key: str = None,
+        context: Dict = None,
+        max_retries: int = None
+    ) -> Dict:
+        """Call the primary model, then each fallback model until one succeeds"""
         retries = max_retries or self.retry_attempts
         errors = []
-        
-        # Try cache first
-        cache_key = f"llm_response:{hash(prompt)}"
-        cached_response = await self.cache.get(cache_key)
-        if cached_response:
-            return cached_response
 
         # Try primary model
         model_key = model_key or self.default_model
         try:
-            response = await self._make_request(model_key, prompt, context)
-            await self.cache.set(cache_key, response, expire=3600)  # Cache for 1 hour
-            return response
+            return await self._make_request(model_key, prompt, context)
         except Exception as e:
             errors.append(f"{model_key}: {str(e)}")
             logger.warning(f"Primary model {model_key} failed: {str(e)}")
@@ -74,9 +88,7 @@ class LLMManager:
                 continue
                 
             try:
-                response = await self._make_request(fallback_model, prompt, context)
-                await self.cache.set(cache_key, response, expire=3600)
-                return response
+                return await self._make_request(fallback_model, prompt, context)
             except Exception as e:
                 errors.append(f"{fallback_model}: {str(e)}")
                 logger.warning(f"Fallback model {fallback_model} failed: {str(e)}")
@@ -1,19 +1,23 @@
 from typing import Dict, List, Optional
 import logging
+from sqlalchemy import select
 from .llm_manager import LLMManager
 from .vision_manager import VisionManager
 from ...database.cache import RedisCache
 from ...database.models.user import User
+from ...database.models import Meal
 
 logger = logging.getLogger(__name__)
 
 class MealAnalysisService:
     def __init__(
         self,
+        db_session,
         llm_manager: LLMManager,
         vision_manager: VisionManager,
         cache: RedisCache
     ):
+        self.db = db_session
         self.llm = llm_manager
         self.vision = vision_manager
         self.cache = cache
@@ -106,14 +110,14 @@ class MealAnalysisService:
     async def _get_meal_history(self, user: User) -> List[Dict]:
         """Get recent meal history for context"""
         try:
-            async with self.db.session() as session:
-                meals = await session.query(Meal).filter(
+            result = await self.db.execute(
+                select(Meal).where(
                     Meal.user_id == user.id
                 ).order_by(
                     Meal.created_at.desc()
-                ).limit(5).all()
-                
-                return [meal.to_dict() for meal in meals]
+                ).limit(5)
+            )
+            return [meal.to_dict() for meal in result.scalars()]
         except Exception as e:
             logger.error(f"Error getting meal history: {str(e)}")
             return [] 
\ No newline at end of file
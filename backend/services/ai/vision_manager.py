@@ -1,4 +1,5 @@
 from typing import Dict, List, Optional
+import asyncio
 import logging
 import torch
 import numpy as np
@@ -10,6 +11,7 @@ from transformers import Fuyu8BConfig, Fuyu8BForCausalLM
 from nomic import embed
 from ...config import settings
 from ...database.cache import RedisCache
+from ...database.cache_keys import build_key, file_digest
 
 logger = logging.getLogger(__name__)
 
@@ -54,8 +56,14 @@ class VisionManager:
         retries = max_retries or self.retry_attempts
         errors = []
         
-        # Try cache first
-        cache_key = f"vision_analysis:{hash(image_path)}"
+        # Try cache first, keyed on the image contents rather than its path
+        image_digest = await asyncio.to_thread(file_digest, image_path)
+        cache_key = build_key(
+            "vision_analysis",
+            model_key or self.default_model,
+            context,
+            image_digest
+        )
         cached_result = await self.cache.get(cache_key)
         if cached_result:
             return cached_result
@@ -26,6 +26,17 @@ class AuthService:
         to_encode.update({"exp": expire})
         return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
 
+    async def get_user_from_token(self, token: str) -> Optional[User]:
+        """Get the user an access token was issued to, or None if it is invalid or expired"""
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except JWTError:
+            return None
+        user_id = payload.get("sub")
+        if user_id is None:
+            return None
+        return await self.db.get(User, int(user_id))
+
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         return pwd_context.verify(plain_password, hashed_password)
 
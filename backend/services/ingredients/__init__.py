@@ -0,0 +1,8 @@
+"""
+Ingredients Services Package
+Canonicalizes ingredient names into shared integer ids
+"""
+
+from .index import IngredientIndex, get_ingredient_index
+
+__all__ = ['IngredientIndex', 'get_ingredient_index']
@@ -0,0 +1,135 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from functools import lru_cache
+import re
+from ...config import settings
+from .vocabulary import (
+    CANONICAL_PHRASES,
+    INVARIANT_WORDS,
+    IRREGULAR_PLURALS,
+    MODIFIERS,
+    SYNONYMS
+)
+
+# Marks the end of a phrase in the token trie
+TERMINAL = ""
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+def singularize(word: str) -> str:
+    """Rule-based singular form of an English ingredient word"""
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if word in INVARIANT_WORDS or len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def tokenize(raw: str) -> List[str]:
+    """Lowercase, split on anything but letters and singularize"""
+    return [singularize(token) for token in TOKEN_PATTERN.findall(raw.lower())]
+
+class IngredientIndex:
+    """Maps raw ingredient names to canonical names and stable integer ids.
+
+    Names are lowercased and singularized, then matched against the
+    longest known phrase in a token trie, so "Cherry Tomatoes", "tomato"
+    and "diced roma tomatoes" all become "tomato". Unknown names fall
+    back to their tokens without preparation modifiers. Lookups of raw
+    strings are memoized, so repeated names cost one dict hit.
+    """
+
+    def __init__(
+        self,
+        synonyms: Optional[Dict[str, str]] = None,
+        phrases: Iterable[str] = CANONICAL_PHRASES,
+        cache_size: Optional[int] = None
+    ):
+        self._trie: Dict = {}
+        for phrase, canonical in (synonyms if synonyms is not None else SYNONYMS).items():
+            self._add_phrase(phrase, canonical)
+        for phrase in phrases:
+            self._add_phrase(phrase, phrase)
+
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lookup = lru_cache(maxsize=cache_size or settings.INGREDIENT_CACHE_SIZE)(self._resolve)
+
+    @property
+    def size(self) -> int:
+        """Number of canonical ingredients seen so far; ids are below this"""
+        return len(self._names)
+
+    def canonicalize(self, raw: str) -> str:
+        """Get the canonical name of a raw ingredient name"""
+        return self._names[self._lookup(raw)]
+
+    def ingredient_id(self, raw: str) -> int:
+        """Get the id of a raw ingredient name, assigning one if it is new"""
+        return self._lookup(raw)
+
+    def ids(self, items: Iterable[str]) -> FrozenSet[int]:
+        """Get the distinct ids of a list of raw ingredient names"""
+        lookup = self._lookup
+        return frozenset(lookup(item) for item in items)
+
+    def name(self, ingredient_id: int) -> str:
+        return self._names[ingredient_id]
+
+    def similarity(self, actual_items: Iterable[str], expected_items: Iterable[str]) -> float:
+        """Jaccard similarity of two ingredient lists after canonicalization"""
+        actual, expected = self.ids(actual_items), self.ids(expected_items)
+        union = len(actual | expected)
+        return len(actual & expected) / union if union > 0 else 0.0
+
+    def _resolve(self, raw: str) -> int:
+        canonical = self._canonical_name(raw)
+        ingredient_id = self._ids.get(canonical)
+        if ingredient_id is None:
+            ingredient_id = self._ids[canonical] = len(self._names)
+            self._names.append(canonical)
+        return ingredient_id
+
+    def _canonical_name(self, raw: str) -> str:
+        tokens = tokenize(raw)
+        # Modifiers can be part of a known phrase ("minced beef"), so look first
+        match = self._longest_phrase(tokens)
+        if match is None:
+            # Keep the name as is if it is nothing but modifiers ("cloves")
+            tokens = [token for token in tokens if token not in MODIFIERS] or tokens
+            match = self._longest_phrase(tokens)
+        if match is not None:
+            return match
+        return " ".join(tokens) or raw.strip().lower()
+
+    def _longest_phrase(self, tokens: List[str]) -> Optional[str]:
+        """Canonical name of the longest known phrase in tokens, rightmost on ties"""
+        best: Tuple[int, int, Optional[str]] = (0, 0, None)
+        for start in range(len(tokens)):
+            node = self._trie
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if TERMINAL in node and (end - start + 1, start) >= best[:2]:
+                    best = (end - start + 1, start, node[TERMINAL])
+        return best[2]
+
+    def _add_phrase(self, phrase: str, canonical: str) -> None:
+        node = self._trie
+        for token in tokenize(phrase):
+            node = node.setdefault(token, {})
+        node[TERMINAL] = canonical
+
+_index: Optional[IngredientIndex] = None
+
+def get_ingredient_index() -> IngredientIndex:
+    """Get the process-wide ingredient index, built on first use"""
+    global _index
+    if _index is None:
+        _index = IngredientIndex()
+    return _index
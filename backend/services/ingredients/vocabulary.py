@@ -0,0 +1,126 @@
+"""
+Ingredient vocabulary used by IngredientIndex.
+
+Phrases are written in normalized form, lowercase and singular, so they
+match the tokens IngredientIndex produces from raw names.
+"""
+
+# Variant phrase -> canonical name
+SYNONYMS = {
+    "cherry tomato": "tomato",
+    "grape tomato": "tomato",
+    "plum tomato": "tomato",
+    "roma tomato": "tomato",
+    "vine tomato": "tomato",
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "garbanzo": "chickpea",
+    "garbanzo bean": "chickpea",
+    "chick pea": "chickpea",
+    "cilantro": "coriander",
+    "coriander leaf": "coriander",
+    "aubergine": "eggplant",
+    "courgette": "zucchini",
+    "capsicum": "bell pepper",
+    "sweet pepper": "bell pepper",
+    "rocket": "arugula",
+    "prawn": "shrimp",
+    "king prawn": "shrimp",
+    "mince": "ground beef",
+    "beef mince": "ground beef",
+    "minced beef": "ground beef",
+    "yoghurt": "yogurt",
+    "greek yoghurt": "greek yogurt",
+    "porridge oat": "oat",
+    "rolled oat": "oat",
+    "oatmeal": "oat",
+    "wholemeal bread": "whole wheat bread",
+    "whole grain bread": "whole wheat bread",
+    "wholegrain bread": "whole wheat bread",
+    "evoo": "olive oil",
+    "caster sugar": "sugar",
+    "granulated sugar": "sugar",
+    "icing sugar": "powdered sugar",
+    "confectioner sugar": "powdered sugar",
+    "swede": "rutabaga",
+    "beetroot": "beet",
+    "corn on the cob": "corn",
+    "sweetcorn": "corn",
+    "maize": "corn",
+    "bicarbonate of soda": "baking soda",
+    "soya sauce": "soy sauce",
+    "soya milk": "soy milk",
+    "chicken fillet": "chicken breast",
+    "chicken breast fillet": "chicken breast",
+    "salmon fillet": "salmon",
+    "cod fillet": "cod",
+    "tuna steak": "tuna",
+    "hen egg": "egg",
+}
+
+# Multi-word names that must not be split into their parts
+CANONICAL_PHRASES = (
+    "sweet potato",
+    "bell pepper",
+    "green onion",
+    "red onion",
+    "olive oil",
+    "coconut oil",
+    "coconut milk",
+    "almond milk",
+    "soy milk",
+    "soy sauce",
+    "tomato sauce",
+    "tomato paste",
+    "peanut butter",
+    "chicken breast",
+    "chicken thigh",
+    "ground beef",
+    "ground turkey",
+    "brown rice",
+    "white rice",
+    "whole wheat bread",
+    "greek yogurt",
+    "cottage cheese",
+    "cream cheese",
+    "black bean",
+    "kidney bean",
+    "green bean",
+    "baking soda",
+    "baking powder",
+    "powdered sugar",
+    "brown sugar",
+    "egg white",
+    "egg yolk",
+    "bay leaf",
+)
+
+# Preparation, size, quality and portion words that do not change the ingredient
+MODIFIERS = frozenset({
+    "baby", "boneless", "skinless", "fresh", "frozen", "organic", "raw",
+    "cooked", "chopped", "diced", "sliced", "minced", "grated", "shredded",
+    "crushed", "halved", "quartered", "peeled", "trimmed", "rinsed",
+    "drained", "steamed", "boiled", "grilled", "roasted", "baked", "fried",
+    "toasted", "large", "medium", "small", "ripe", "extra", "virgin",
+    "lean", "plain", "unsalted", "salted", "free", "range", "wild",
+    "leaf", "sprig", "clove", "piece", "slice", "cube", "pinch", "handful",
+    "of", "and", "a", "the",
+})
+
+# Plurals the suffix rules get wrong
+IRREGULAR_PLURALS = {
+    "leaves": "leaf",
+    "halves": "half",
+    "loaves": "loaf",
+    "knives": "knife",
+    "geese": "goose",
+    "teeth": "tooth",
+    "mice": "mouse",
+}
+
+# Words ending in s that are already singular
+INVARIANT_WORDS = frozenset({
+    "asparagus", "couscous", "hummus", "molasses", "swiss", "brussels",
+    "citrus", "hibiscus", "octopus", "lemongrass", "grass", "bass",
+    "watercress", "cress", "floss", "quinoa", "series", "species",
+})
@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime, timedelta
+from sqlalchemy import select
 from ...database.models import User, Meal, ComplianceRecord
 from ...config import settings
 from ..ai.llm_manager import LLMManager
@@ -71,7 +72,7 @@ class ComplianceManager:
     async def _get_user(self, user_id: int) -> User:
         """Get user data"""
         try:
-            user = await self.db.query(User).filter(User.id == user_id).first()
+            user = await self.db.get(User, user_id)
             if not user:
                 raise ValueError(f"User not found: {user_id}")
             return user
@@ -87,13 +88,15 @@ class ComplianceManager:
         """Get meal history for specified time window"""
         try:
             start_date = datetime.now() - timedelta(days=days)
-            meals = await self.db.query(Meal).filter(
-                Meal.user_id == user_id,
-                Meal.consumed_at >= start_date
-            ).order_by(
-                Meal.consumed_at.desc()
-            ).all()
-            return meals
+            result = await self.db.execute(
+                select(Meal).where(
+                    Meal.user_id == user_id,
+                    Meal.consumed_at >= start_date
+                ).order_by(
+                    Meal.consumed_at.desc()
+                )
+            )
+            return list(result.scalars().all())
         except Exception as e:
             logger.error(f"Error getting meal history: {str(e)}")
             raise
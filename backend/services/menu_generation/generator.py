@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime, timedelta
+from sqlalchemy import select
 from ...database.models import User, Meal, MealPreference
 from ...config import settings
 from ..ai.llm_manager import LLMManager
@@ -59,7 +60,7 @@ class MenuGenerator:
     async def _get_user_data(self, user_id: int) -> User:
         """Get user data including preferences and restrictions"""
         try:
-            user = await self.db.query(User).filter(User.id == user_id).first()
+            user = await self.db.get(User, user_id)
             if not user:
                 raise ValueError(f"User not found: {user_id}")
             return user
@@ -70,11 +71,14 @@ class MenuGenerator:
     async def _get_meal_history(self, user_id: int) -> List[Dict]:
         """Get recent meal history for context"""
         try:
-            meals = await self.db.query(Meal).filter(
-                Meal.user_id == user_id
-            ).order_by(
-                Meal.consumed_at.desc()
-            ).limit(30).all()
+            result = await self.db.execute(
+                select(Meal).where(
+                    Meal.user_id == user_id
+                ).order_by(
+                    Meal.consumed_at.desc()
+                ).limit(30)
+            )
+            meals = result.scalars().all()
             
             return [meal.to_dict() for meal in meals]
         except Exception as e:
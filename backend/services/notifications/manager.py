@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 import logging
-omeVirewfrom datetime import datetime, timedelta
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
 from ...database.models import User, Notification, NotificationType
 from ...config import settings
 from ..ai.llm_manager import LLMManager
@@ -49,18 +50,18 @@ class NotificationManager:
             send_result = await self._send_notification(notification)
 
             if send_result["success"]:
-            return {
-                "success": True,
-                "notification_id": notification.id,
+                return {
+                    "success": True,
+                    "notification_id": notification.id,
                     "sent_at": notification.created_at.isoformat()
-            }
+                }
             else:
                 raise ValueError(send_result["error"])
 
         except Exception as e:
             logger.error(f"Error creating notification: {str(e)}")
-                return {
-                    "success": False,
+            return {
+                "success": False,
                 "error": str(e)
             }
 
@@ -68,24 +69,28 @@ class NotificationManager:
         """Check if notification can be sent based on limits"""
         try:
             # Check cooldown
-            latest_notification = await self.db.query(Notification).filter(
-                Notification.user_id == user_id
-            ).order_by(
-                Notification.created_at.desc()
-            ).first()
+            latest_notification = await self.db.scalar(
+                select(Notification).where(
+                    Notification.user_id == user_id
+                ).order_by(
+                    Notification.created_at.desc()
+                ).limit(1)
+            )
 
             if latest_notification:
                 cooldown_time = latest_notification.created_at + timedelta(
                     minutes=self.notification_cooldown
                 )
                 if datetime.now() < cooldown_time:
-                return False
+                    return False
 
             # Check daily limit
-            today_count = await self.db.query(Notification).filter(
-                Notification.user_id == user_id,
-                Notification.created_at >= datetime.now().date()
-            ).count()
+            today_count = await self.db.scalar(
+                select(func.count()).select_from(Notification).where(
+                    Notification.user_id == user_id,
+                    Notification.created_at >= datetime.now().date()
+                )
+            )
 
             return today_count < self.max_daily_notifications
 
@@ -169,9 +174,7 @@ class NotificationManager:
     async def _send_notification(self, notification: Notification) -> Dict:
         """Send notification through appropriate channel"""
         try:
-            user = await self.db.query(User).filter(
-                User.id == notification.user_id
-            ).first()
+            user = await self.db.get(User, notification.user_id)
 
             if not user:
                 raise ValueError(f"User not found: {notification.user_id}")
@@ -2,14 +2,17 @@ from typing import Dict, List, Optional
 import logging
 import aiohttp
 from datetime import datetime, timedelta
+from sqlalchemy import select
 from ...database.models import Product, PriceHistory
+from ...database.cache import RedisCache
 from ...config import settings
 
 logger = logging.getLogger(__name__)
 
 class SupermarketService:
-    def __init__(self, db_session):
+    def __init__(self, db_session, cache: Optional[RedisCache] = None):
         self.db = db_session
+        self.cache = cache
         self.api_keys = settings.SUPERMARKET_API_KEYS
         self.cache_duration = settings.PRICE_CACHE_DURATION
         self.supported_chains = {
@@ -81,12 +84,28 @@ class SupermarketService:
     ) -> Optional[Dict]:
         """Get cached prices if available and not expired"""
         try:
+            # All requested products in one round-trip before touching the database
+            if self.cache:
+                cached = await self.cache.get_many(
+                    [self._price_cache_key(name) for name in product_names]
+                )
+                if len(cached) == len(set(product_names)):
+                    results = {}
+                    for product_name in product_names:
+                        chains = cached[self._price_cache_key(product_name)]
+                        for chain, details in chains.items():
+                            results.setdefault(chain, {})[product_name] = details
+                    return results
+
             cache_threshold = datetime.now() - timedelta(hours=self.cache_duration)
             
-            prices = await self.db.query(PriceHistory).filter(
-                PriceHistory.product_name.in_(product_names),
-                PriceHistory.updated_at >= cache_threshold
-            ).all()
+            result = await self.db.execute(
+                select(PriceHistory).where(
+                    PriceHistory.product_name.in_(product_names),
+                    PriceHistory.updated_at >= cache_threshold
+                )
+            )
+            prices = result.scalars().all()
 
             if not prices:
                 return None
@@ -123,10 +142,34 @@ class SupermarketService:
             
             await self.db.commit()
 
+            if self.cache:
+                await self._cache_prices_in_redis(prices)
+
         except Exception as e:
             logger.error(f"Error caching prices: {str(e)}")
             await self.db.rollback()
 
+    async def _cache_prices_in_redis(self, prices: Dict) -> None:
+        """Write per-product prices to Redis in a single pipeline"""
+        updated_at = datetime.now().isoformat()
+        by_product = {}
+        for chain, products in prices.items():
+            for product_name, details in products.items():
+                by_product.setdefault(self._price_cache_key(product_name), {})[chain] = {
+                    "price": details["price"],
+                    "unit": details["unit"],
+                    "updated_at": updated_at
+                }
+
+        await self.cache.set_many(
+            by_product,
+            expire=int(timedelta(hours=self.cache_duration).total_seconds())
+        )
+
+    def _price_cache_key(self, product_name: str) -> str:
+        """Get Redis key for a product's prices across chains"""
+        return f"prices:{product_name}"
+
     async def _fetch_walmart_prices(self, product_names: List[str]) -> Dict:
         """Fetch prices from Walmart API"""
         try:
@@ -4,5 +4,12 @@ Statistics Services Package
 
 from .meal_tracker import MealTracker
 from .historical_analyzer import HistoricalAnalyzer
+from .nutrition_rollups import NutritionRollupService
+from .compliance_scoring import ComplianceScorer
+from .user_stats import UserStatsCounters
+from .meal_schedule import MealSchedule, get_meal_schedule
+from .trend_partials import TrendPartial, WeeklySummaryStore
+from .trend_engine import TrendEngine
+from .meal_stream import MealAggregates
 
-__all__ = ['MealTracker', 'HistoricalAnalyzer'] 
\ No newline at end of file
+__all__ = ['MealTracker', 'HistoricalAnalyzer', 'NutritionRollupService', 'UserStatsCounters', 'ComplianceScorer', 'MealSchedule', 'get_meal_schedule', 'TrendPartial', 'WeeklySummaryStore', 'TrendEngine', 'MealAggregates'] 
\ No newline at end of file
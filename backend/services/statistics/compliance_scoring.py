@@ -0,0 +1,181 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from ...config import settings
+from ..ingredients import IngredientIndex, get_ingredient_index
+
+INGREDIENT_WEIGHT = 0.6
+NUTRITION_WEIGHT = 0.4
+
+class EncodedMeals(NamedTuple):
+    """Meals encoded against a ComplianceScorer's vocabularies"""
+    ingredients: np.ndarray  # (meals, words) uint64 bitsets of ingredient ids
+    nutrients: np.ndarray  # (meals, nutrients) values, NaN where absent
+    nutrient_order: np.ndarray  # (meals, keys) nutrient columns in dict order, -1 padded
+    present: np.ndarray  # False for meals that were None or empty
+
+class ComplianceScorer:
+    """Scores whole batches of (actual, expected) meals at once.
+
+    Produces exactly the values of MealTracker's per-meal scoring.
+    Ingredients are mapped to IngredientIndex ids and packed into
+    bitsets, so a pair's intersection and union are popcounts. Nutrients are compared in each
+    expected meal's own key order, so deviations are summed in the same
+    order as the scalar loop and round identically.
+
+    Encoding is separate from scoring, so history encoded once can be
+    rescored against any number of menus.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: Optional[float] = None,
+        ingredients: Optional[IngredientIndex] = None,
+        chunk_size: int = 65536
+    ):
+        self.similarity_threshold = (
+            settings.MEAL_SIMILARITY_THRESHOLD if similarity_threshold is None else similarity_threshold
+        )
+        self.ingredients = ingredients or get_ingredient_index()
+        self.chunk_size = chunk_size
+        self.nutrient_ids: Dict[str, int] = {}
+
+    def score(
+        self,
+        actual_meals: Sequence[Dict],
+        expected_meals: Sequence[Optional[Dict]]
+    ) -> Dict[str, np.ndarray]:
+        """Score meals against their expected meals, which may be None"""
+        return self.score_encoded(self.encode(actual_meals), self.encode(expected_meals))
+
+    def encode(self, meals: Sequence[Optional[Dict]]) -> EncodedMeals:
+        """Encode meals' items and nutritional_info"""
+        n = len(meals)
+        meals = [meal or {} for meal in meals]
+
+        # Setting a bit twice is a no-op, so repeated ingredients count once
+        # as in the scalar set-based Jaccard
+        item_lists = [meal.get("items") or [] for meal in meals]
+        ingredient_id = self.ingredients.ingredient_id
+        ids = np.array([ingredient_id(item) for items in item_lists for item in items], dtype=np.int64)
+        rows = np.repeat(np.arange(n), [len(items) for items in item_lists])
+        ingredients = np.zeros((n, self._words()), dtype=np.uint64)
+        np.bitwise_or.at(
+            ingredients,
+            (rows, ids >> 6),
+            np.left_shift(np.uint64(1), (ids & 63).astype(np.uint64))
+        )
+
+        nutrition = [meal.get("nutritional_info") or {} for meal in meals]
+        columns = self._intern(self.nutrient_ids, nutrition)
+        lengths = np.array([len(info) for info in nutrition], dtype=np.int64)
+        rows = np.repeat(np.arange(n), lengths)
+        # Position of each nutrient within its own dict
+        positions = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        nutrients = np.full((n, len(self.nutrient_ids)), np.nan)
+        nutrients[rows, columns] = np.array(
+            [value for info in nutrition for value in info.values()], dtype=np.float64
+        )
+        nutrient_order = np.full((n, int(lengths.max(initial=0))), -1, dtype=np.int64)
+        nutrient_order[rows, positions] = columns
+
+        present = np.array([bool(meal) for meal in meals], dtype=bool)
+        return EncodedMeals(ingredients, nutrients, nutrient_order, present)
+
+    def score_encoded(
+        self,
+        actual: EncodedMeals,
+        expected: EncodedMeals,
+        expected_index: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """Score encoded meals against encoded expected meals.
+
+        Pair i compares actual meal i with expected meal expected_index[i],
+        by default expected meal i. Returns arrays of score,
+        ingredient_score, nutrition_score and is_compliant.
+        """
+        n = len(actual.present)
+        if expected_index is None:
+            expected_index = np.arange(n)
+
+        ingredient_score = np.empty(n)
+        nutrition_score = np.empty(n)
+        for start in range(0, n, self.chunk_size):
+            pairs = slice(start, start + self.chunk_size)
+            index = expected_index[pairs]
+            ingredient_score[pairs] = self._ingredient_similarity(
+                actual.ingredients[pairs], expected.ingredients[index]
+            )
+            nutrition_score[pairs] = self._nutritional_similarity(
+                actual.nutrients[pairs], expected.nutrients[index], expected.nutrient_order[index]
+            )
+
+        score = ingredient_score * INGREDIENT_WEIGHT + nutrition_score * NUTRITION_WEIGHT
+        score[~expected.present[expected_index]] = 1.0
+        return {
+            "score": score,
+            "ingredient_score": ingredient_score,
+            "nutrition_score": nutrition_score,
+            "is_compliant": score >= self.similarity_threshold
+        }
+
+    def _ingredient_similarity(self, actual: np.ndarray, expected: np.ndarray) -> np.ndarray:
+        """Jaccard similarity of each pair of bitsets; 1.0 if none are expected"""
+        actual, expected = self._pad(actual, expected)
+        intersection = np.bitwise_count(actual & expected).sum(axis=1, dtype=np.int64)
+        union = np.bitwise_count(actual | expected).sum(axis=1, dtype=np.int64)
+        expected_size = np.bitwise_count(expected).sum(axis=1, dtype=np.int64)
+
+        similarity = np.zeros(len(actual))
+        np.divide(intersection, union, out=similarity, where=union > 0)
+        similarity[expected_size == 0] = 1.0
+        return similarity
+
+    def _nutritional_similarity(
+        self,
+        actual: np.ndarray,
+        expected: np.ndarray,
+        order: np.ndarray
+    ) -> np.ndarray:
+        """One minus the mean capped relative deviation over the expected nutrients"""
+        n = len(order)
+        width = max(actual.shape[1], expected.shape[1])
+        actual = np.pad(actual, ((0, 0), (0, width - actual.shape[1])), constant_values=np.nan)
+        expected = np.pad(expected, ((0, 0), (0, width - expected.shape[1])), constant_values=np.nan)
+
+        total = np.zeros(n)
+        count = np.zeros(n, dtype=np.int64)
+        rows = np.arange(n)
+        # Column j is each pair's j-th expected nutrient, matching the scalar loop's order
+        for j in range(order.shape[1]):
+            column = order[:, j]
+            actual_value = actual[rows, column]
+            expected_value = expected[rows, column]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                counted = (column >= 0) & ~np.isnan(actual_value) & (expected_value > 0)
+                deviation = np.minimum(np.abs(actual_value - expected_value) / expected_value, 1.0)
+            total += np.where(counted, deviation, 0.0)
+            count += counted
+
+        similarity = np.ones(n)
+        np.subtract(1.0, total / np.maximum(count, 1), out=similarity, where=count > 0)
+        return similarity
+
+    @staticmethod
+    def _intern(vocabulary: Dict[str, int], groups: List) -> np.ndarray:
+        """Get the flattened ids of every key in groups, adding new keys"""
+        for key in set().union(*groups) - vocabulary.keys():
+            vocabulary[key] = len(vocabulary)
+        return np.array([vocabulary[key] for group in groups for key in group], dtype=np.int64)
+
+    def _words(self) -> int:
+        return max(1, (self.ingredients.size + 63) // 64)
+
+    @staticmethod
+    def _pad(actual: np.ndarray, expected: np.ndarray):
+        """Widen bitsets encoded before the vocabulary grew"""
+        width = max(actual.shape[1], expected.shape[1])
+        return (
+            np.pad(actual, ((0, 0), (0, width - actual.shape[1]))),
+            np.pad(expected, ((0, 0), (0, width - expected.shape[1])))
+        )
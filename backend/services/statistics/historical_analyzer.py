@@ -1,26 +1,94 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import calendar
 import logging
+from sqlalchemy import and_, or_, select
 from ...database.models.user import User
 from ...database.models.meal import Meal, MealStatus
-from ..notifications.manager import NotificationManager
 from ..watch_data.collector import WatchDataCollector
-from ..database.cache import RedisCache
+from ...database.cache import RedisCache
+from ...config import settings
+from .meal_stream import STREAM_COLUMNS, MealAggregates, meal_buffers, weekday_confidence
+from .nutrition_rollups import ADDITIVE_COLUMNS
+from .trend_partials import (
+    MACROS,
+    TREND_SERIES,
+    TrendPartial,
+    WeeklySummaryStore,
+    series_values,
+    summarize_days,
+    week_numbers
+)
+from .trend_engine import trend_labels, trend_slopes
 import pandas as pd
 import numpy as np
 
+if TYPE_CHECKING:
+    # Only held for callers; importing it pulls in the LLM client
+    from ..notifications.manager import NotificationManager
+
 logger = logging.getLogger(__name__)
 
+# Meal columns the analyses read, selected without loading ORM objects
+MEAL_COLUMNS = ("scheduled_time", "meal_type", "status", "location", "compliance_score")
+
+def meal_column(name: str):
+    """Get the Meal column behind a frame column.
+
+    The frames' scheduled_time is when the meal took place, Meal.occurred_at,
+    so meals logged without a plan are dated like their rollups.
+    """
+    return Meal.occurred_at if name == "scheduled_time" else getattr(Meal, name)
+
+def meal_frame(rows: Iterable[Tuple]) -> pd.DataFrame:
+    """Build the meal frame shared by every analysis, oldest first.
+
+    Calendar columns are derived once here: date is the day at midnight,
+    weekday is Monday=0 and week is the Sunday ending the meal's week,
+    the label pd.Grouper(freq='W') would give it.
+    """
+    rows = list(rows)
+    columns = dict(zip(MEAL_COLUMNS, zip(*rows))) if rows else dict.fromkeys(MEAL_COLUMNS, ())
+
+    times = pd.DatetimeIndex(columns['scheduled_time'])
+    dates = times.normalize()
+    weekday = times.dayofweek
+    df = pd.DataFrame({
+        'scheduled_time': times,
+        'meal_type': _enum_values(columns['meal_type']),
+        'status': _enum_values(columns['status']),
+        'location': _enum_values(columns['location']),
+        'compliance_score': np.array(columns['compliance_score'], dtype=np.float64),
+        'date': dates,
+        'hour': times.hour,
+        'weekday': weekday,
+        'is_weekend': weekday >= 5,
+        'week': dates + pd.to_timedelta(6 - weekday, unit='D')
+    })
+    if not df['scheduled_time'].is_monotonic_increasing:
+        df = df.sort_values('scheduled_time', ignore_index=True, kind='stable')
+    return df
+
+def _enum_values(values: Tuple) -> np.ndarray:
+    """Replace enums by their values, converting each distinct value once"""
+    codes, uniques = pd.factorize(np.array(values, dtype=object))
+    # Code -1 marks a missing value and picks the trailing None
+    return np.array([getattr(value, 'value', value) for value in uniques] + [None], dtype=object)[codes]
+
 class HistoricalAnalyzer:
     def __init__(
         self,
-        notification_manager: NotificationManager,
+        db_session,
+        notification_manager: "NotificationManager",
         watch_collector: WatchDataCollector,
         cache: RedisCache
     ):
+        self.db = db_session
         self.notification_manager = notification_manager
         self.watch_collector = watch_collector
         self.cache = cache
+        self.weekly_summaries = WeeklySummaryStore(db_session, cache)
         self.cache_duration = timedelta(hours=24)
 
     async def analyze_trends(
@@ -32,26 +100,13 @@ class HistoricalAnalyzer:
         """Analyze historical meal trends and patterns"""
         try:
             cache_key = f"trends:{user.id}:{start_date.date()}:{end_date.date()}"
-            cached_result = await self.cache.get(cache_key)
-            if cached_result:
-                return cached_result
-
-            # Gather all required data
-            meals = await self._get_meal_history(user, start_date, end_date)
-            health_data = await self._get_health_data(user, start_date, end_date)
-            
-            # Perform analysis
-            analysis = {
-                "compliance_trends": await self._analyze_compliance_trends(meals),
-                "nutritional_trends": await self._analyze_nutritional_trends(meals),
-                "timing_patterns": await self._analyze_timing_patterns(meals),
-                "health_correlations": await self._analyze_health_correlations(meals, health_data),
-                "recommendations": await self._generate_recommendations(meals, health_data)
-            }
-
-            # Cache results
-            await self.cache.set(cache_key, analysis, expire=int(self.cache_duration.total_seconds()))
-            return analysis
+            # Tagged so a newly logged meal can drop the result
+            return await self.cache.get_or_compute(
+                cache_key,
+                lambda: self._compute_trends(user, start_date, end_date),
+                expire=int(self.cache_duration.total_seconds()),
+                tags=[f"user:{user.id}"]
+            )
 
         except Exception as e:
             logger.error(f"Error analyzing trends: {str(e)}")
@@ -60,75 +115,133 @@ class HistoricalAnalyzer:
                 "details": str(e)
             }
 
-    async def _analyze_compliance_trends(self, meals: List[Dict]) -> Dict:
+    async def _compute_trends(
+        self,
+        user: User,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict:
+        """Run the full trend analysis without caching.
+
+        Ranges longer than MEAL_STREAM_MIN_DAYS are streamed into running
+        aggregates instead of one meal frame; the analyses that need the
+        meals themselves then cover the most recent MEAL_STREAM_MIN_DAYS.
+        """
+        recent = timedelta(days=settings.MEAL_STREAM_MIN_DAYS)
+        aggregates = None
+        # Gather all required data; the queries share one session, so in turn
+        if end_date - start_date > recent:
+            aggregates = await self._aggregate_meals(user, start_date, end_date)
+            meals = await self._get_meal_frame(user, end_date - recent, end_date)
+            health_data = await self._get_health_data(user, end_date - recent, end_date)
+        else:
+            meals = await self._get_meal_frame(user, start_date, end_date)
+            health_data = await self._get_health_data(user, start_date, end_date)
+        weeks = await self._get_weekly_summaries(user, start_date, end_date)
+
+        # Shared by the compliance and timing analyses
+        weekdays = aggregates.weekday_stats() if aggregates else self._weekday_stats(meals)
+        # Shared by the compliance and nutritional analyses
+        trends = TrendPartial.of_summary(weeks)
+
+        # The analyses only read the frames, so they run side by side
+        compliance, nutrition, timing, health = await asyncio.gather(
+            asyncio.to_thread(self._analyze_compliance_trends, meals, weekdays, weeks, trends, aggregates),
+            asyncio.to_thread(self._analyze_nutritional_trends, weeks, trends),
+            asyncio.to_thread(self._analyze_timing_patterns, meals, weekdays, aggregates),
+            asyncio.to_thread(self._analyze_health_correlations, meals, health_data)
+        )
+        return {
+            "compliance_trends": compliance,
+            "nutritional_trends": nutrition,
+            "timing_patterns": timing,
+            "health_correlations": health,
+            "recommendations": await self._generate_recommendations(meals, health_data)
+        }
+
+    def _analyze_compliance_trends(
+        self,
+        meals: pd.DataFrame,
+        weekdays: pd.DataFrame,
+        weeks: pd.DataFrame,
+        trends: TrendPartial,
+        aggregates: Optional[MealAggregates] = None
+    ) -> Dict:
         """Analyze meal compliance trends over time"""
-        df = pd.DataFrame(meals)
-        
-        weekly_compliance = df.groupby(pd.Grouper(key='scheduled_time', freq='W'))[
-            'compliance_score'
-        ].mean()
+        weekly_compliance = self._weekly_series(series_values(weeks)['compliance'])
 
         return {
             "weekly_scores": weekly_compliance.to_dict(),
-            "overall_trend": self._calculate_trend(weekly_compliance),
-            "best_days": self._find_best_compliance_days(df),
-            "challenging_meals": self._identify_challenging_meals(df)
+            "overall_trend": self._trend_labels(weeks, trends)['compliance'],
+            "best_days": self._find_best_compliance_days(weekdays),
+            "challenging_meals": (
+                aggregates.challenging_meals() if aggregates else self._identify_challenging_meals(meals)
+            )
         }
 
-    async def _analyze_nutritional_trends(self, meals: List[Dict]) -> Dict:
-        """Analyze nutritional patterns and deviations"""
-        df = pd.DataFrame(meals)
-        
-        nutrient_cols = ['protein', 'carbs', 'fats', 'calories']
+    def _weekly_series(self, series: pd.Series) -> pd.Series:
+        """Fill the weeks without meals between the first and last with NaN"""
+        if len(series):
+            series = series.reindex(pd.date_range(series.index[0], series.index[-1], freq='W'))
+        return series
+
+    def _analyze_nutritional_trends(self, weeks: pd.DataFrame, trends: TrendPartial) -> Dict:
+        """Analyze nutritional patterns and deviations from weekly summaries"""
+        values = series_values(weeks)
+        labels = self._trend_labels(weeks, trends)
+        consistency = dict(zip(TREND_SERIES, trends.consistency()))
         nutrient_trends = {}
 
-        for nutrient in nutrient_cols:
-            weekly_avg = df.groupby(pd.Grouper(key='scheduled_time', freq='W'))[
-                f'nutrition.{nutrient}'
-            ].mean()
-            
+        for nutrient in ['protein', 'carbs', 'fats', 'calories']:
+            # Per-meal average, as if averaged over the week's meals
             nutrient_trends[nutrient] = {
-                "weekly_averages": weekly_avg.to_dict(),
-                "trend": self._calculate_trend(weekly_avg),
-                "consistency_score": self._calculate_consistency(weekly_avg)
+                "weekly_averages": self._weekly_series(values[nutrient]).to_dict(),
+                "trend": labels[nutrient],
+                "consistency_score": float(consistency[nutrient])
             }
 
         return {
             "nutrient_trends": nutrient_trends,
-            "balance_score": self._calculate_nutrient_balance(df),
-            "areas_for_improvement": self._identify_nutritional_gaps(df)
+            "balance_score": self._calculate_nutrient_balance(weeks),
+            "areas_for_improvement": self._identify_nutritional_gaps(weeks)
         }
 
-    async def _analyze_timing_patterns(self, meals: List[Dict]) -> Dict:
+    def _analyze_timing_patterns(
+        self,
+        meals: pd.DataFrame,
+        weekdays: pd.DataFrame,
+        aggregates: Optional[MealAggregates] = None
+    ) -> Dict:
         """Analyze meal timing patterns and consistency"""
-        df = pd.DataFrame(meals)
-        df['hour'] = df['scheduled_time'].dt.hour
-        df['day_of_week'] = df['scheduled_time'].dt.day_name()
-
         timing_analysis = {
-            "meal_time_consistency": self._analyze_time_consistency(df),
-            "preferred_times": self._identify_preferred_times(df),
-            "skipped_meal_patterns": self._analyze_skip_patterns(df),
-            "weekend_vs_weekday": self._compare_weekend_weekday(df)
+            "meal_time_consistency": (
+                aggregates.time_consistency() if aggregates else self._analyze_time_consistency(meals)
+            ),
+            "preferred_times": (
+                aggregates.preferred_times() if aggregates else self._identify_preferred_times(meals)
+            ),
+            "skipped_meal_patterns": self._analyze_skip_patterns(meals),
+            "weekend_vs_weekday": self._compare_weekend_weekday(weekdays)
         }
 
         return timing_analysis
 
-    async def _analyze_health_correlations(
+    def _analyze_health_correlations(
         self,
-        meals: List[Dict],
+        meals: pd.DataFrame,
         health_data: List[Dict]
     ) -> Dict:
         """Analyze correlations between meals and health metrics"""
-        meal_df = pd.DataFrame(meals)
         health_df = pd.DataFrame(health_data)
 
-        # Merge meal and health data on date
+        # Attach each meal to the daily health rollup of the day it was eaten;
+        # the meal frame is already sorted by time
         merged_df = pd.merge_asof(
-            meal_df,
+            meals,
             health_df,
             on='scheduled_time',
-            direction='nearest'
+            direction='backward',
+            tolerance=pd.Timedelta(days=1)
         )
 
         correlations = {
@@ -140,73 +253,68 @@ class HistoricalAnalyzer:
 
         return correlations
 
-    def _calculate_trend(self, series: pd.Series) -> str:
-        """Calculate trend direction and magnitude"""
-        if len(series) < 2:
-            return "insufficient_data"
-            
-        slope = np.polyfit(range(len(series)), series.values, 1)[0]
-        
-        if abs(slope) < 0.01:
-            return "stable"
-        elif slope > 0:
-            return "improving" if slope > 0.05 else "slightly_improving"
+    def _trend_labels(self, weeks: pd.DataFrame, trends: TrendPartial) -> Dict[str, str]:
+        """Trend label of each weekly series by the configured method"""
+        if settings.TREND_METHOD == "least_squares":
+            # The partials already hold the least-squares sums
+            slopes = trends.slopes()
         else:
-            return "declining" if slope < -0.05 else "slightly_declining"
-
-    def _calculate_consistency(self, series: pd.Series) -> float:
-        """Calculate consistency score based on variance"""
-        if len(series) < 2:
-            return 0.0
-            
-        normalized_std = series.std() / series.mean()
-        return max(0, 1 - normalized_std)
+            # Robust fits need the weekly values themselves, not their sums
+            values = series_values(weeks)[list(TREND_SERIES)].to_numpy().T
+            slopes = trend_slopes(values, settings.TREND_METHOD, week_numbers(weeks.index))
+        return dict(zip(TREND_SERIES, trend_labels(slopes).tolist()))
 
     def _identify_challenging_meals(self, df: pd.DataFrame) -> List[Dict]:
         """Identify meals with consistently low compliance"""
-        problem_meals = df[df['compliance_score'] < 0.7].groupby('meal_type').agg({
-            'compliance_score': ['count', 'mean']
-        }).reset_index()
-        
+        problem_meals = df[df['compliance_score'] < 0.7].groupby('meal_type').agg(
+            frequency=('compliance_score', 'count'),
+            avg_score=('compliance_score', 'mean')
+        )
+
         return [
             {
-                "meal_type": row['meal_type'],
-                "frequency": row['compliance_score']['count'],
-                "avg_score": row['compliance_score']['mean']
+                "meal_type": meal_type,
+                "frequency": int(frequency),
+                "avg_score": float(avg_score)
             }
-            for _, row in problem_meals.iterrows()
+            for meal_type, frequency, avg_score in zip(
+                problem_meals.index, problem_meals['frequency'], problem_meals['avg_score']
+            )
         ]
 
     def _analyze_time_consistency(self, df: pd.DataFrame) -> Dict:
         """Analyze meal timing consistency"""
         time_variance = df.groupby('meal_type')['hour'].agg(['std', 'mean'])
-        
+        # A meal type eaten once has no spread and scores 0
+        consistency = (1 - time_variance['std'] / 24).clip(lower=0).fillna(0)
+        typical_hour = time_variance['mean'].astype(int)
+
         return {
             meal_type: {
-                "consistency_score": max(0, 1 - std/24),
-                "typical_time": f"{int(mean):02d}:00"
+                "consistency_score": float(score),
+                "typical_time": f"{hour:02d}:00"
             }
-            for meal_type, (std, mean) in time_variance.iterrows()
+            for meal_type, score, hour in zip(time_variance.index, consistency, typical_hour)
         }
 
     def _correlate_with_energy(self, df: pd.DataFrame) -> Dict:
         """Analyze correlation between meals and energy levels"""
+        # One stable sort groups each meal type's rows, keeping their order;
+        # meals without a type (code -1) sort first and are dropped
+        codes, meal_types = pd.factorize(df['meal_type'])
+        order = np.argsort(codes, kind='stable')[int((codes < 0).sum()):]
+        splits = np.cumsum(np.bincount(codes[codes >= 0], minlength=len(meal_types)))[:-1]
+        scores = np.split(df['compliance_score'].to_numpy(dtype=float)[order], splits)
+        energy = np.split(df['energy_level'].to_numpy(dtype=float)[order], splits)
+
         energy_impact = {}
-        
-        for meal_type in df['meal_type'].unique():
-            meal_data = df[df['meal_type'] == meal_type]
-            
-            if len(meal_data) > 0:
-                correlation = np.corrcoef(
-                    meal_data['compliance_score'],
-                    meal_data['energy_level']
-                )[0, 1]
-                
-                energy_impact[meal_type] = {
-                    "correlation": float(correlation),
-                    "impact_level": self._categorize_correlation(correlation)
-                }
-        
+        for meal_type, meal_scores, meal_energy in zip(meal_types, scores, energy):
+            correlation = np.corrcoef(meal_scores, meal_energy)[0, 1]
+            energy_impact[meal_type] = {
+                "correlation": float(correlation),
+                "impact_level": self._categorize_correlation(correlation)
+            }
+
         return energy_impact
 
     def _categorize_correlation(self, correlation: float) -> str:
@@ -218,23 +326,72 @@ class HistoricalAnalyzer:
         else:
             return "strong" 
 
-    async def _get_meal_history(
+    async def _get_meal_frame(
         self,
         user: User,
         start_date: datetime,
         end_date: datetime
-    ) -> List[Dict]:
-        """Retrieve meal history from database"""
+    ) -> pd.DataFrame:
+        """Retrieve meal history from database as a meal frame"""
         try:
-            async with self.db.session() as session:
-                meals = await session.query(Meal).filter(
+            result = await self.db.execute(
+                select(*[meal_column(column) for column in MEAL_COLUMNS]).where(
                     Meal.user_id == user.id,
-                    Meal.scheduled_time.between(start_date, end_date)
-                ).order_by(Meal.scheduled_time.desc()).all()
-                return [meal.to_dict() for meal in meals]
+                    Meal.occurred_at.between(start_date, end_date)
+                ).order_by(Meal.occurred_at)
+            )
+            return meal_frame(result.all())
         except Exception as e:
             logger.error(f"Error retrieving meal history: {str(e)}")
-            return []
+            return meal_frame([])
+
+    async def _aggregate_meals(
+        self,
+        user: User,
+        start_date: datetime,
+        end_date: datetime
+    ) -> MealAggregates:
+        """Fold the meal history into running aggregates, one keyset page at a time.
+
+        Pages are read as plain column tuples ordered by (occurred_at, id)
+        and converted to arrays, so at most one page is held at once
+        however long the range.
+        """
+        aggregates = MealAggregates()
+        page_size = settings.MEAL_STREAM_CHUNK_SIZE
+        query = select(Meal.id, *[meal_column(column) for column in STREAM_COLUMNS]).where(
+            Meal.user_id == user.id,
+            Meal.occurred_at.between(start_date, end_date)
+        ).order_by(Meal.occurred_at, Meal.id).limit(page_size)
+
+        after = None
+        try:
+            while True:
+                page = query if after is None else query.where(or_(
+                    Meal.occurred_at > after[0],
+                    and_(Meal.occurred_at == after[0], Meal.id > after[1])
+                ))
+                rows = (await self.db.execute(page)).all()
+                aggregates.fold(meal_buffers(row[1:] for row in rows))
+                if len(rows) < page_size:
+                    break
+                after = rows[-1][1], rows[-1][0]
+        except Exception as e:
+            logger.error(f"Error streaming meal history: {str(e)}")
+        return aggregates
+
+    async def _get_weekly_summaries(
+        self,
+        user: User,
+        start_date: datetime,
+        end_date: datetime
+    ) -> pd.DataFrame:
+        """Retrieve per-week nutrition and compliance sums, one row per week"""
+        try:
+            return await self.weekly_summaries.get_summaries(user.id, start_date.date(), end_date.date())
+        except Exception as e:
+            logger.error(f"Error retrieving weekly summaries: {str(e)}")
+            return summarize_days(pd.DataFrame(columns=['day', *ADDITIVE_COLUMNS]))
 
     async def _get_health_data(
         self,
@@ -242,70 +399,141 @@ class HistoricalAnalyzer:
         start_date: datetime,
         end_date: datetime
     ) -> List[Dict]:
-        """Retrieve health data from watch collector"""
+        """Retrieve daily health aggregates from watch collector"""
         try:
-            return await self.watch_collector.collect_health_data(
+            rollups = await self.watch_collector.get_rollups(
                 user,
+                "day",
                 start_time=start_date,
                 end_time=end_date
             )
+            return [
+                {
+                    "scheduled_time": datetime.fromisoformat(rollup["bucket_start"]),
+                    "steps": rollup["activity"]["steps"],
+                    "calories_burned": rollup["activity"]["calories_burned"],
+                    "active_minutes": (
+                        rollup["activity"]["active_minutes"]["fairly_active"] +
+                        rollup["activity"]["active_minutes"]["very_active"]
+                    ),
+                    "heart_rate_avg": rollup["heart_rate"]["average"],
+                    "heart_rate_resting": rollup["heart_rate"]["resting"],
+                    "sleep_duration": rollup["sleep"]["duration"],
+                    "sleep_efficiency": rollup["sleep"]["efficiency"]
+                }
+                for rollup in rollups
+            ]
         except Exception as e:
             logger.error(f"Error retrieving health data: {str(e)}")
             return []
 
-    def _find_best_compliance_days(self, df: pd.DataFrame) -> List[Dict]:
+    def _weekday_stats(self, meals: pd.DataFrame) -> pd.DataFrame:
+        """Compliance statistics per weekday, Monday=0, in one grouped pass.
+
+        mean, std and count cover scored meals; meals counts every meal
+        and days the distinct dates. score_sum and score_sumsq let
+        weekdays be combined, e.g. into weekends.
+        """
+        scores = meals['compliance_score']
+        stats = pd.DataFrame({
+            'score': scores,
+            'score_sq': scores * scores,
+            'date': meals['date']
+        }).groupby(meals['weekday']).agg(
+            mean=('score', 'mean'),
+            # Series.std per weekday rounds exactly as the per-day statistics
+            # always have; the grouped kernel can differ in the last bit
+            std=('score', pd.Series.std),
+            count=('score', 'count'),
+            meals=('score', 'size'),
+            days=('date', 'nunique'),
+            score_sum=('score', 'sum'),
+            score_sumsq=('score_sq', 'sum')
+        )
+
+        stats['confidence'] = weekday_confidence(stats['std'], stats['meals'])
+        return stats
+
+    def _find_best_compliance_days(self, weekdays: pd.DataFrame) -> List[Dict]:
         """Find days with highest compliance scores"""
-        best_days = df.groupby(df['scheduled_time'].dt.strftime('%A'))[
-            'compliance_score'
-        ].mean().sort_values(ascending=False)
+        # Ties keep alphabetical order, as when grouping by day name
+        by_name = weekdays.set_axis(pd.Index(list(calendar.day_name))[weekdays.index]).sort_index()
+        best_days = by_name.loc[by_name['mean'].sort_values(ascending=False).index]
 
         return [
             {
                 "day": day,
                 "average_score": float(score),
-                "confidence": self._calculate_confidence(df, day)
+                "confidence": float(confidence)
             }
-            for day, score in best_days.items()
+            for day, score, confidence in zip(best_days.index, best_days['mean'], best_days['confidence'])
         ]
 
-    def _calculate_confidence(self, df: pd.DataFrame, day: str) -> float:
-        """Calculate confidence level for day-based statistics"""
-        day_data = df[df['scheduled_time'].dt.strftime('%A') == day]
-        if len(day_data) < 3:  # Minimum sample size
-            return 0.5
-        
-        std_dev = day_data['compliance_score'].std()
-        sample_size = len(day_data)
-        
-        # Higher confidence with more samples and lower standard deviation
-        confidence = (1 - std_dev) * (1 - 1/sample_size)
-        return max(0.1, min(1.0, confidence))
-
-    def _calculate_nutrient_balance(self, df: pd.DataFrame) -> float:
+    def _compare_weekend_weekday(self, weekdays: pd.DataFrame) -> Dict:
+        """Compare compliance and meal frequency on weekends and weekdays"""
+        periods = weekdays.groupby(np.where(weekdays.index >= 5, 'weekend', 'weekday'))[
+            ['count', 'meals', 'days', 'score_sum', 'score_sumsq']
+        ].sum()
+
+        comparison = {}
+        for period in ('weekday', 'weekend'):
+            comparison[period] = {"average_score": None, "score_std": None, "meals_per_day": None}
+            if period not in periods.index:
+                continue
+            count, meals, days, score_sum, score_sumsq = periods.loc[period]
+            comparison[period]["meals_per_day"] = float(meals / days)
+            if count > 0:
+                mean = score_sum / count
+                comparison[period]["average_score"] = float(mean)
+            if count > 1:
+                variance = (score_sumsq - score_sum * mean) / (count - 1)
+                comparison[period]["score_std"] = float(np.sqrt(max(variance, 0.0)))
+
+        weekday_score = comparison['weekday']['average_score']
+        weekend_score = comparison['weekend']['average_score']
+        comparison["score_difference"] = (
+            weekend_score - weekday_score
+            if weekday_score is not None and weekend_score is not None else None
+        )
+        return comparison
+
+    def _identify_preferred_times(self, meals: pd.DataFrame) -> Dict:
+        """Find the most common hour of each meal type, overall and on weekdays and weekends"""
+        counts = meals.groupby(['meal_type', 'is_weekend', 'hour']).size().rename('meals').reset_index()
+        overall = counts.groupby(['meal_type', 'hour'], as_index=False)['meals'].sum()
+        totals = overall.groupby('meal_type')['meals'].sum()
+
+        preferred: Dict = {}
+        for label, hours in (
+            ('time', overall),
+            ('weekday_time', counts[~counts['is_weekend']]),
+            ('weekend_time', counts[counts['is_weekend']])
+        ):
+            # Rows are in hour order, so the earliest hour wins ties
+            modal = hours.sort_values('meals', ascending=False, kind='stable').drop_duplicates('meal_type')
+            for meal_type, hour, count in zip(modal['meal_type'], modal['hour'], modal['meals']):
+                entry = preferred.setdefault(meal_type, {
+                    "time": None, "share": None, "weekday_time": None, "weekend_time": None
+                })
+                entry[label] = f"{int(hour):02d}:00"
+                if label == 'time':
+                    entry["share"] = float(count / totals[meal_type])
+        return preferred
+
+    def _calculate_nutrient_balance(self, weeks: pd.DataFrame) -> float:
         """Calculate overall nutrient balance score"""
         try:
-            # Calculate average daily nutrient ratios
-            daily_nutrients = df.groupby(df['scheduled_time'].dt.date).agg({
-                'nutrition.protein': 'sum',
-                'nutrition.carbs': 'sum',
-                'nutrition.fats': 'sum'
-            })
-
-            # Calculate macronutrient ratios
-            total_calories = (
-                daily_nutrients['nutrition.protein'] * 4 +
-                daily_nutrients['nutrition.carbs'] * 4 +
-                daily_nutrients['nutrition.fats'] * 9
+            # Average daily macronutrient calorie shares over days with calories
+            totals = weeks.sum()
+            ratio_days = totals['ratio_days'] or np.nan
+            protein_ratio, carbs_ratio, fats_ratio = (
+                totals[f"{macro}_ratio"] / ratio_days for macro in MACROS
             )
 
-            protein_ratio = daily_nutrients['nutrition.protein'] * 4 / total_calories
-            carbs_ratio = daily_nutrients['nutrition.carbs'] * 4 / total_calories
-            fats_ratio = daily_nutrients['nutrition.fats'] * 9 / total_calories
-
             # Score based on ideal macronutrient ratios
-            protein_score = 1 - abs(protein_ratio.mean() - 0.25)  # Ideal: 25%
-            carbs_score = 1 - abs(carbs_ratio.mean() - 0.50)     # Ideal: 50%
-            fats_score = 1 - abs(fats_ratio.mean() - 0.25)       # Ideal: 25%
+            protein_score = 1 - abs(protein_ratio - 0.25)  # Ideal: 25%
+            carbs_score = 1 - abs(carbs_ratio - 0.50)     # Ideal: 50%
+            fats_score = 1 - abs(fats_ratio - 0.25)       # Ideal: 25%
 
             return (protein_score + carbs_score + fats_score) / 3
 
@@ -313,15 +541,10 @@ class HistoricalAnalyzer:
             logger.error(f"Error calculating nutrient balance: {str(e)}")
             return 0.0
 
-    def _identify_nutritional_gaps(self, df: pd.DataFrame) -> List[Dict]:
+    def _identify_nutritional_gaps(self, weeks: pd.DataFrame) -> List[Dict]:
         """Identify areas for nutritional improvement"""
         try:
-            daily_nutrients = df.groupby(df['scheduled_time'].dt.date).agg({
-                'nutrition.protein': 'sum',
-                'nutrition.carbs': 'sum',
-                'nutrition.fats': 'sum',
-                'nutrition.fiber': 'sum'
-            })
+            totals = weeks.sum()
 
             gaps = []
             targets = {
@@ -332,7 +555,8 @@ class HistoricalAnalyzer:
             }
 
             for nutrient, target in targets.items():
-                avg_value = daily_nutrients[f'nutrition.{nutrient}'].mean()
+                # Mean daily total over days with rollups
+                avg_value = totals[nutrient] / (totals['days'] or np.nan)
                 if avg_value < target['min']:
                     gaps.append({
                         'nutrient': nutrient,
@@ -359,29 +583,32 @@ class HistoricalAnalyzer:
             return [] 
 
     def _calculate_monthly_stats(self, df: pd.DataFrame) -> Dict:
-        """Calculate monthly statistics for display"""
+        """Calculate monthly statistics for display from daily rollups"""
         try:
             # 1. Home vs Outside days
-            location_stats = df.groupby(df['scheduled_time'].dt.date)['location'].agg(
-                lambda x: 'outside' if 'outside' in x.values else 'home'
-            ).value_counts()
-            
-            days_at_home = int(location_stats.get('home', 0))
-            days_outside = int(location_stats.get('outside', 0))
+            outside_meals = df.groupby('day')['outside_count'].sum()
+            days_outside = int((outside_meals > 0).sum())
+            days_at_home = len(outside_meals) - days_outside
+
+            by_type = df.groupby('meal_type')[[
+                'skipped_count', 'compliance_sum', 'compliance_samples', 'pass_count', 'fail_count'
+            ]].sum()
 
             # 2. Skipped meals by type
-            skipped_meals = df[df['status'] == 'SKIPPED'].groupby('meal_type').size().to_dict()
+            skipped_meals = by_type['skipped_count'][by_type['skipped_count'] > 0].to_dict()
 
             # 3. Monthly similarity percentages by meal
-            avg_similarity = df.groupby('meal_type')['compliance_score'].mean().to_dict()
+            scored = by_type[by_type['compliance_samples'] > 0]
+            avg_similarity = (scored['compliance_sum'] / scored['compliance_samples']).to_dict()
 
             # 4. Passes and fails by meal
-            meal_results = df.groupby('meal_type').apply(
-                lambda x: {
-                    'passes': int(sum(x['compliance_score'] >= 0.8)),
-                    'fails': int(sum(x['compliance_score'] < 0.8))
+            meal_results = {
+                meal_type: {
+                    'passes': int(passes),
+                    'fails': int(fails)
                 }
-            ).to_dict()
+                for meal_type, passes, fails in zip(by_type.index, by_type['pass_count'], by_type['fail_count'])
+            }
 
             return {
                 "location_summary": {
@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, time, timedelta, tzinfo
+from functools import lru_cache
+import logging
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from ...database.models import User, MealType
+from ...config import settings
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+# Windows used for meal types the user has no preferred time for
+DEFAULT_WINDOWS = {
+    "breakfast": ("06:00", "10:00"),
+    "lunch": ("12:00", "15:00"),
+    "dinner": ("18:00", "22:00")
+}
+
+def parse_minute(value: str) -> int:
+    """Get the minute of the day of an "HH:MM" string"""
+    parsed = datetime.strptime(value, "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+class MealSchedule:
+    """A user's meal-time windows, compiled for constant-time lookups.
+
+    Every minute of the day maps to a bitmask of the meal types whose
+    window covers it, so checking a timestamp is one timezone conversion
+    and one list index. Windows may wrap past midnight and may overlap.
+    Meal types without a window (snacks) are valid at any time.
+    """
+
+    def __init__(self, windows: Dict[str, Tuple[int, int]], timezone: tzinfo):
+        self.windows = dict(windows)
+        self.timezone = timezone
+        self._types: List[str] = list(self.windows)
+        self._bits = {meal_type: 1 << bit for bit, meal_type in enumerate(self._types)}
+
+        masks = [0] * MINUTES_PER_DAY
+        for meal_type, (start, end) in self.windows.items():
+            bit = self._bits[meal_type]
+            for minute in range(start, start + (end - start) % MINUTES_PER_DAY + 1):
+                masks[minute % MINUTES_PER_DAY] |= bit
+        self._masks = masks
+
+    def local_time(self, at: Optional[datetime] = None) -> datetime:
+        """Get at, by default now, in the user's timezone.
+
+        Naive datetimes are taken to already be the user's wall-clock time,
+        as sent by the app.
+        """
+        if at is None:
+            return datetime.now(self.timezone)
+        if at.tzinfo is None:
+            return at.replace(tzinfo=self.timezone)
+        return at.astimezone(self.timezone)
+
+    def is_valid(self, meal_type: MealType, at: Optional[datetime] = None) -> bool:
+        """Check if at, by default now, falls in the meal type's window"""
+        bit = self._bits.get(meal_type.value)
+        if bit is None:
+            return True  # For snacks or other meal types
+        return bool(self._masks[self._minute(at)] & bit)
+
+    def meal_types_at(self, at: Optional[datetime] = None) -> List[MealType]:
+        """Get the meal types whose window covers at, by default now"""
+        mask = self._masks[self._minute(at)]
+        return [MealType(meal_type) for meal_type in self._types if mask & self._bits[meal_type]]
+
+    def next_window_start(self, meal_type: MealType, after: Optional[datetime] = None) -> Optional[datetime]:
+        """Get when the meal type's window next opens after at, e.g. to schedule a reminder.
+
+        The result is aware, in the user's timezone; None if the meal type
+        has no window.
+        """
+        window = self.windows.get(meal_type.value)
+        if window is None:
+            return None
+        local = self.local_time(after)
+        start = local.replace(hour=window[0] // 60, minute=window[0] % 60, second=0, microsecond=0)
+        if start <= local:
+            start += timedelta(days=1)
+        return start
+
+    def _minute(self, at: Optional[datetime]) -> int:
+        local = self.local_time(at)
+        return local.hour * 60 + local.minute
+
+def compile_windows(meal_times: Dict, window_minutes: int) -> Dict[str, Tuple[int, int]]:
+    """Get each meal type's window as (start, end) minutes of the day.
+
+    A preferred time "08:00" opens a window of window_minutes either
+    side; a ["07:00", "09:30"] pair is used as is. Entries that do not
+    parse are logged and replaced by the default window.
+    """
+    windows = {meal_type: (parse_minute(start), parse_minute(end)) for meal_type, (start, end) in DEFAULT_WINDOWS.items()}
+    for meal_type, value in meal_times.items():
+        try:
+            MealType(meal_type)
+            if isinstance(value, str):
+                minute = parse_minute(value)
+                windows[meal_type] = (
+                    (minute - window_minutes) % MINUTES_PER_DAY,
+                    (minute + window_minutes) % MINUTES_PER_DAY
+                )
+            else:
+                start, end = value
+                windows[meal_type] = (parse_minute(start), parse_minute(end))
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid meal time {meal_type}={value!r}")
+    return windows
+
+def _timezone(name: Optional[str]) -> tzinfo:
+    try:
+        return ZoneInfo(name or settings.DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone {name!r}, using {settings.DEFAULT_TIMEZONE}")
+        return ZoneInfo(settings.DEFAULT_TIMEZONE)
+
+def _freeze_value(value):
+    if isinstance(value, list):
+        value = tuple(value)
+    try:
+        hash(value)
+    except TypeError:
+        # Malformed entries, e.g. dicts, only need to compile to the same
+        # fallback windows, so their repr is key enough
+        return repr(value)
+    return value
+
+def _freeze(items: Iterable) -> Tuple:
+    return tuple(sorted((str(key), _freeze_value(value)) for key, value in items))
+
+@lru_cache(maxsize=settings.MEAL_SCHEDULE_CACHE_SIZE)
+def _compile(meal_times: Tuple, timezone: Optional[str], window_minutes: int) -> MealSchedule:
+    return MealSchedule(compile_windows(dict(meal_times), window_minutes), _timezone(timezone))
+
+def get_meal_schedule(user: Optional[User]) -> MealSchedule:
+    """Get the compiled schedule for a user's meal_times and timezone.
+
+    Schedules are cached by the preferences themselves, so editing a
+    user's meal_times compiles a new one on next use and users with the
+    same preferences share one.
+    """
+    meal_times = (user.meal_times if user else None) or {}
+    timezone = ((user.app_settings if user else None) or {}).get("timezone")
+    return _compile(_freeze(meal_times.items()), timezone, settings.MEAL_WINDOW_MINUTES)
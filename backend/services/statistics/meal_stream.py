@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+import pandas as pd
+from ...database.models import MealType
+
+# Meal columns streamed for the running aggregates, after the keyset id
+STREAM_COLUMNS = ("scheduled_time", "meal_type", "compliance_score")
+
+MEAL_TYPES = tuple(meal_type.value for meal_type in MealType)
+_MEAL_TYPE_CODES = {meal_type: code for code, meal_type in enumerate(MEAL_TYPES)}
+
+# Scores below this mark a challenging meal
+CHALLENGING_SCORE = 0.7
+
+def meal_buffers(rows: Iterable[Tuple]) -> Dict[str, np.ndarray]:
+    """Convert (scheduled_time, meal_type, compliance_score) rows to typed arrays.
+
+    day numbers days since the epoch in the stored wall-clock time and
+    meal_type is an index into MEAL_TYPES; scores missing are NaN.
+    """
+    rows = list(rows)
+    times, meal_types, scores = zip(*rows) if rows else ((), (), ())
+
+    local = pd.DatetimeIndex(times)
+    if local.tz is not None:
+        local = local.tz_localize(None)
+    return {
+        "day": local.values.astype('datetime64[D]').astype(np.int64),
+        "hour": np.asarray(local.hour, dtype=np.int64),
+        "weekday": np.asarray(local.dayofweek, dtype=np.int64),
+        "meal_type": np.fromiter(
+            (_MEAL_TYPE_CODES.get(getattr(value, 'value', value), -1) for value in meal_types),
+            dtype=np.int64,
+            count=len(meal_types)
+        ),
+        "score": np.array(scores, dtype=np.float64)
+    }
+
+def weekday_confidence(std: pd.Series, meals: pd.Series) -> pd.Series:
+    """Confidence in each weekday's mean score.
+
+    Higher with more samples and lower standard deviation; fewer than 3
+    meals is below the minimum sample size.
+    """
+    confidence = ((1 - std) * (1 - 1 / meals)).clip(0.1, 1.0)
+    # A day with under two scores has no std and gets full confidence
+    return confidence.fillna(1.0).where(meals >= 3, 0.5)
+
+class MealAggregates:
+    """Running per-weekday and per-meal-type aggregates of a meal stream.
+
+    Every field has a fixed shape, so folding in chunk after chunk of a
+    multi-year history keeps memory flat. Chunks must arrive oldest
+    first: distinct days are counted as changes of day along the stream.
+    The results match the analyzer's meal-frame analyses up to rounding.
+    """
+
+    def __init__(self):
+        types = len(MEAL_TYPES)
+        # Per weekday, Monday=0
+        self.meals = np.zeros(7, dtype=np.int64)
+        self.days = np.zeros(7, dtype=np.int64)
+        self.scored = np.zeros(7, dtype=np.int64)
+        self.score_sum = np.zeros(7)
+        self.score_sumsq = np.zeros(7)
+        # Per meal type
+        self.hours = np.zeros((types, 2, 24), dtype=np.int64)  # (weekday, weekend) hour counts
+        self.challenging = np.zeros(types, dtype=np.int64)
+        self.challenging_sum = np.zeros(types)
+        self.last_day = None
+
+    def fold(self, chunk: Dict[str, np.ndarray]) -> None:
+        """Add a chunk of meal_buffers to the aggregates"""
+        if not len(chunk["day"]):
+            return
+        weekday, score, day = chunk["weekday"], chunk["score"], chunk["day"]
+        scored = ~np.isnan(score)
+
+        self.meals += np.bincount(weekday, minlength=7)
+        self.scored += np.bincount(weekday[scored], minlength=7)
+        self.score_sum += np.bincount(weekday[scored], weights=score[scored], minlength=7)
+        self.score_sumsq += np.bincount(weekday[scored], weights=score[scored] ** 2, minlength=7)
+
+        new_day = np.empty(len(day), dtype=bool)
+        new_day[0] = day[0] != self.last_day
+        new_day[1:] = day[1:] != day[:-1]
+        self.days += np.bincount(weekday[new_day], minlength=7)
+        self.last_day = day[-1]
+
+        typed = chunk["meal_type"] >= 0
+        meal_type = chunk["meal_type"][typed]
+        cells = (meal_type * 2 + (weekday[typed] >= 5)) * 24 + chunk["hour"][typed]
+        self.hours += np.bincount(cells, minlength=self.hours.size).reshape(self.hours.shape)
+
+        low = typed & scored & (np.nan_to_num(score, nan=1.0) < CHALLENGING_SCORE)
+        self.challenging += np.bincount(chunk["meal_type"][low], minlength=len(MEAL_TYPES))
+        self.challenging_sum += np.bincount(
+            chunk["meal_type"][low], weights=score[low], minlength=len(MEAL_TYPES)
+        )
+
+    def weekday_stats(self) -> pd.DataFrame:
+        """Compliance statistics per weekday, as HistoricalAnalyzer._weekday_stats gives them"""
+        present = np.flatnonzero(self.meals)
+        count = self.scored[present]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.score_sum[present] / count
+            variance = (self.score_sumsq[present] - self.score_sum[present] * mean) / (count - 1)
+            std = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+        stats = pd.DataFrame({
+            'mean': mean,
+            'std': std,
+            'count': count,
+            'meals': self.meals[present],
+            'days': self.days[present],
+            'score_sum': self.score_sum[present],
+            'score_sumsq': self.score_sumsq[present]
+        }, index=pd.Index(present, name='weekday'))
+        stats['confidence'] = weekday_confidence(stats['std'], stats['meals'])
+        return stats
+
+    def challenging_meals(self) -> List[Dict]:
+        """Meal types with scores below CHALLENGING_SCORE, by name"""
+        return [
+            {
+                "meal_type": MEAL_TYPES[code],
+                "frequency": int(self.challenging[code]),
+                "avg_score": float(self.challenging_sum[code] / self.challenging[code])
+            }
+            for code in self._by_name(self.challenging)
+        ]
+
+    def time_consistency(self) -> Dict:
+        """Spread and typical hour of each meal type, from the hour counts"""
+        counts = self.hours.sum(axis=1)
+        hour = np.arange(24)
+        consistency = {}
+        for code in self._by_name(counts.sum(axis=1)):
+            meals = counts[code].sum()
+            mean = (counts[code] * hour).sum() / meals
+            std = np.sqrt((counts[code] * (hour - mean) ** 2).sum() / (meals - 1)) if meals > 1 else np.nan
+            consistency[MEAL_TYPES[code]] = {
+                # A meal type eaten once has no spread and scores 0
+                "consistency_score": 0.0 if np.isnan(std) else float(max(0.0, 1 - std / 24)),
+                "typical_time": f"{int(mean):02d}:00"
+            }
+        return consistency
+
+    def preferred_times(self) -> Dict:
+        """Most common hour of each meal type, overall and on weekdays and weekends"""
+        overall = self.hours.sum(axis=1)
+        preferred = {}
+        for code in self._by_name(overall.sum(axis=1)):
+            # argmax picks the earliest hour on ties
+            entry = {
+                "time": f"{int(overall[code].argmax()):02d}:00",
+                "share": float(overall[code].max() / overall[code].sum()),
+                "weekday_time": None,
+                "weekend_time": None
+            }
+            for label, hours in (('weekday_time', self.hours[code, 0]), ('weekend_time', self.hours[code, 1])):
+                if hours.any():
+                    entry[label] = f"{int(hours.argmax()):02d}:00"
+            preferred[MEAL_TYPES[code]] = entry
+        return preferred
+
+    @staticmethod
+    def _by_name(counts: np.ndarray) -> List[int]:
+        """Codes of meal types with counts, in name order as a groupby gives them"""
+        return sorted(np.flatnonzero(counts), key=lambda code: MEAL_TYPES[code])
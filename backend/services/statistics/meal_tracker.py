@@ -1,15 +1,30 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
-from ...database.models import User, Meal, MealType
+from sqlalchemy import select, update
+from ...database.models import User, Meal, MealType, MealStatus, MealIngestKey
+from ...database.cache import RedisCache
+from ...database.upsert import insert_for
 from ...config import settings
 from ...utils.exceptions import MealTrackingError
+from ..ingredients import get_ingredient_index
+from .compliance_scoring import ComplianceScorer
+from .meal_schedule import MealSchedule, get_meal_schedule
+from .nutrition_rollups import NutritionRollupService, rollup_key
+from .trend_partials import WeeklySummaryStore
+from .user_stats import UserStatsCounters, apply_deltas, compliance_deltas, sum_deltas
 
 logger = logging.getLogger(__name__)
 
 class MealTracker:
-    def __init__(self, db_session):
+    def __init__(self, db_session, cache: Optional[RedisCache] = None):
         self.db = db_session
+        self.cache = cache
+        self.rollups = NutritionRollupService(db_session)
+        self.weekly_summaries = WeeklySummaryStore(db_session, cache)
+        self.ingredients = get_ingredient_index()
+        # Without a cache, statistics are updated under a row lock instead
+        self.stats = UserStatsCounters(cache) if cache else None
         self.tracking_window = settings.MEAL_TRACKING_WINDOW
         self.similarity_threshold = settings.MEAL_SIMILARITY_THRESHOLD
 
@@ -20,10 +35,15 @@ class MealTracker:
         meal_type: MealType,
         location: str = "home"
     ) -> Dict:
-        """Track a new meal for the user"""
+        """Track a new meal for the user.
+
+        The meal and its daily rollup are written in one transaction; the
+        user's statistics are counted once it commits.
+        """
         try:
             # Validate meal timing
-            if not self._is_valid_meal_time(meal_type):
+            schedule = await self._get_schedule(user_id)
+            if not schedule.is_valid(meal_type):
                 raise MealTrackingError(f"Invalid time for {meal_type}")
 
             # Create meal record
@@ -39,9 +59,14 @@ class MealTracker:
                 meal,
                 meal_data.get("expected_meal")
             )
+            meal.compliance_score = compliance["score"]
+
+            # Update daily rollup and user statistics
+            await self.rollups.record(meal)
+            await self._commit_and_count(user_id, [compliance])
 
-            # Update user statistics
-            await self._update_user_stats(user_id, compliance)
+            # Cached trend analyses for this user are now out of date
+            await self._invalidate_analyses(user_id, [meal])
 
             return {
                 "success": True,
@@ -52,35 +77,138 @@ class MealTracker:
 
         except Exception as e:
             logger.error(f"Error tracking meal: {str(e)}")
+            await self.db.rollback()
             return {
                 "success": False,
                 "error": str(e)
             }
 
-    def _is_valid_meal_time(self, meal_type: MealType) -> bool:
-        """Check if current time is valid for meal type"""
-        current_time = datetime.now().time()
-        
-        meal_windows = {
-            MealType.BREAKFAST: (
-                datetime.strptime("06:00", "%H:%M").time(),
-                datetime.strptime("10:00", "%H:%M").time()
-            ),
-            MealType.LUNCH: (
-                datetime.strptime("12:00", "%H:%M").time(),
-                datetime.strptime("15:00", "%H:%M").time()
-            ),
-            MealType.DINNER: (
-                datetime.strptime("18:00", "%H:%M").time(),
-                datetime.strptime("22:00", "%H:%M").time()
+    async def track_meals_bulk(self, user_id: int, meals: List[Dict]) -> Dict:
+        """Track a batch of meals logged offline, e.g. queued by the mobile app.
+
+        Each meal carries an idempotency_key, meal_type and consumed_at.
+        Meals are validated and scored one by one; the accepted ones are
+        inserted, rolled up and counted in a single transaction. A meal
+        whose key the user already sent is reported as a duplicate instead
+        of being stored again, so a retried upload is safe.
+        """
+        try:
+            schedule = await self._get_schedule(user_id)
+            accepted: Dict[str, Tuple] = {}
+            repeated, rejected = [], []
+            for index, meal_data in enumerate(meals):
+                try:
+                    key, meal_type, consumed_at = self._parse_bulk_meal(meal_data, schedule)
+                except KeyError as e:
+                    rejected.append({"index": index, "error": f"Missing field {e}"})
+                    continue
+                except (ValueError, MealTrackingError) as e:
+                    rejected.append({"index": index, "error": str(e)})
+                    continue
+                if key in accepted:
+                    repeated.append((index, key))
+                else:
+                    accepted[key] = (index, meal_data, meal_type, consumed_at)
+
+            new_keys = await self._claim_idempotency_keys(user_id, list(accepted))
+
+            tracked, records, expected_meals = [], [], []
+            for key, (index, meal_data, meal_type, consumed_at) in accepted.items():
+                if key not in new_keys:
+                    repeated.append((index, key))
+                    continue
+                records.append(self._build_meal(
+                    user_id,
+                    meal_data,
+                    meal_type,
+                    meal_data.get("location", "home"),
+                    consumed_at
+                ))
+                expected_meals.append(meal_data.get("expected_meal"))
+                tracked.append({"index": index, "idempotency_key": key})
+
+            compliances = self._calculate_compliance_batch(records, expected_meals)
+            for entry, meal, compliance in zip(tracked, records, compliances):
+                meal.compliance_score = compliance["score"]
+                entry["compliance"] = compliance
+
+            if records:
+                # Batched into multi-row INSERTs; ids come back via RETURNING
+                self.db.add_all(records)
+                await self.db.flush()
+                await self.db.execute(update(MealIngestKey), [
+                    {"user_id": user_id, "idempotency_key": entry["idempotency_key"], "meal_id": meal.id}
+                    for entry, meal in zip(tracked, records)
+                ])
+                for entry, meal in zip(tracked, records):
+                    entry["meal_id"] = meal.id
+                await self.rollups.record_many(records)
+            duplicates = await self._lookup_duplicates(user_id, repeated)
+            await self._commit_and_count(user_id, compliances)
+
+            if records:
+                await self._invalidate_analyses(user_id, records)
+
+            return {
+                "success": True,
+                "tracked": tracked,
+                "duplicates": duplicates,
+                "rejected": rejected,
+                "timestamp": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Error tracking meal batch: {str(e)}")
+            await self.db.rollback()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    async def track_skipped_meal(
+        self,
+        user_id: int,
+        meal_type: MealType,
+        scheduled_time: Optional[datetime] = None
+    ) -> Dict:
+        """Record that the user skipped a scheduled meal"""
+        try:
+            meal = Meal(
+                user_id=user_id,
+                meal_type=meal_type,
+                status=MealStatus.SKIPPED,
+                scheduled_time=scheduled_time or datetime.now()
             )
-        }
+            self.db.add(meal)
+            await self.db.flush()
+
+            await self.rollups.record(meal)
+            await self.db.commit()
+
+            await self._invalidate_analyses(user_id, [meal])
+
+            return {
+                "success": True,
+                "meal_id": meal.id
+            }
 
-        if meal_type not in meal_windows:
-            return True  # For snacks or other meal types
+        except Exception as e:
+            logger.error(f"Error tracking skipped meal: {str(e)}")
+            await self.db.rollback()
+            return {
+                "success": False,
+                "error": str(e)
+            }
 
-        start_time, end_time = meal_windows[meal_type]
-        return start_time <= current_time <= end_time
+    async def _invalidate_analyses(self, user_id: int, meals: List[Meal]) -> None:
+        """Drop cached trend analyses and the weekly summaries of the meals' weeks"""
+        if self.cache:
+            await self.cache.invalidate_tag(f"user:{user_id}")
+            await self.weekly_summaries.invalidate(user_id, [rollup_key(meal)["day"] for meal in meals])
+
+    async def _get_schedule(self, user_id: int) -> MealSchedule:
+        """Get the user's compiled meal-time windows"""
+        return get_meal_schedule(await self.db.get(User, user_id))
 
     async def _create_meal_record(
         self,
@@ -89,29 +217,97 @@ class MealTracker:
         meal_type: MealType,
         location: str
     ) -> Meal:
-        """Create a new meal record in database"""
+        """Add a new meal record to the session without committing"""
         try:
-            meal = Meal(
-                user_id=user_id,
-                meal_type=meal_type,
-                location=location,
-                items=meal_data.get("items", []),
-                nutritional_info=meal_data.get("nutritional_info", {}),
-                image_url=meal_data.get("image_url"),
-                consumed_at=datetime.now()
-            )
+            meal = self._build_meal(user_id, meal_data, meal_type, location, datetime.now())
             
             self.db.add(meal)
-            await self.db.commit()
-            await self.db.refresh(meal)
+            await self.db.flush()
             
             return meal
 
         except Exception as e:
             logger.error(f"Error creating meal record: {str(e)}")
-            await self.db.rollback()
             raise
 
+    def _build_meal(
+        self,
+        user_id: int,
+        meal_data: Dict,
+        meal_type: MealType,
+        location: str,
+        consumed_at: datetime
+    ) -> Meal:
+        return Meal(
+            user_id=user_id,
+            meal_type=meal_type,
+            location=location,
+            items=meal_data.get("items", []),
+            nutritional_info=meal_data.get("nutritional_info", {}),
+            image_url=meal_data.get("image_url"),
+            consumed_at=consumed_at
+        )
+
+    def _parse_bulk_meal(self, meal_data: Dict, schedule: MealSchedule) -> Tuple[str, MealType, datetime]:
+        """Validate one meal of a bulk upload"""
+        key = str(meal_data["idempotency_key"])
+        if not key or len(key) > 64:
+            raise ValueError("idempotency_key must be 1 to 64 characters")
+
+        meal_type = MealType(meal_data["meal_type"])
+        consumed_at = meal_data["consumed_at"]
+        if isinstance(consumed_at, str):
+            consumed_at = datetime.fromisoformat(consumed_at)
+
+        if not schedule.is_valid(meal_type, consumed_at):
+            raise MealTrackingError(f"Invalid time for {meal_type}")
+        return key, meal_type, consumed_at
+
+    async def _claim_idempotency_keys(self, user_id: int, keys: List[str]) -> set:
+        """Record keys not yet used by the user, returning the ones recorded.
+
+        A concurrent upload claiming the same key waits for this
+        transaction, then skips the key if it committed.
+        """
+        if not keys:
+            return set()
+        result = await self.db.execute(
+            insert_for(self.db.get_bind().dialect.name, MealIngestKey.__table__)
+            .values([{"user_id": user_id, "idempotency_key": key, "created_at": datetime.utcnow()} for key in keys])
+            .on_conflict_do_nothing()
+            .returning(MealIngestKey.idempotency_key)
+        )
+        return set(result.scalars())
+
+    async def _lookup_duplicates(self, user_id: int, repeated: List[Tuple[int, str]]) -> List[Dict]:
+        """Get the stored meal of every upload entry whose key was already used"""
+        if not repeated:
+            return []
+        result = await self.db.execute(
+            select(MealIngestKey.idempotency_key, MealIngestKey.meal_id).where(
+                MealIngestKey.user_id == user_id,
+                MealIngestKey.idempotency_key.in_({key for _, key in repeated})
+            )
+        )
+        meal_ids = dict(result.all())
+        return [
+            {"index": index, "idempotency_key": key, "meal_id": meal_ids.get(key)}
+            for index, key in sorted(repeated)
+        ]
+
+    async def _commit_and_count(self, user_id: int, compliances: List[Dict]) -> None:
+        """Commit the tracked meals and add them to the user's statistics at once.
+
+        With a cache the counters are incremented after the commit, so
+        meals that roll back are never counted.
+        """
+        deltas = sum_deltas(compliance_deltas(compliance) for compliance in compliances)
+        if deltas and self.stats is None:
+            await self._update_user_stats(user_id, deltas)
+        await self.db.commit()
+        if deltas and self.stats is not None and not await self.stats.record(user_id, deltas):
+            logger.warning(f"{deltas['total_meals']} meals were not counted in user {user_id}'s statistics")
+
     async def _calculate_compliance(
         self,
         meal: Meal,
@@ -122,7 +318,8 @@ class MealTracker:
             if not expected_meal:
                 return {
                     "score": 1.0,
-                    "details": "No expected meal to compare"
+                    "details": "No expected meal to compare",
+                    "is_compliant": True
                 }
 
             # Calculate ingredient similarity
@@ -151,6 +348,36 @@ class MealTracker:
             logger.error(f"Error calculating compliance: {str(e)}")
             raise
 
+    def _calculate_compliance_batch(
+        self,
+        meals: List[Meal],
+        expected_meals: List[Optional[Dict]]
+    ) -> List[Dict]:
+        """Score many meals at once; same results as _calculate_compliance"""
+        if not meals:
+            return []
+        scores = ComplianceScorer(self.similarity_threshold, self.ingredients).score(
+            [{"items": meal.items, "nutritional_info": meal.nutritional_info} for meal in meals],
+            expected_meals
+        )
+
+        compliances = []
+        for i, expected_meal in enumerate(expected_meals):
+            if not expected_meal:
+                compliances.append({
+                    "score": 1.0,
+                    "details": "No expected meal to compare",
+                    "is_compliant": True
+                })
+                continue
+            compliances.append({
+                "score": float(scores["score"][i]),
+                "ingredient_score": float(scores["ingredient_score"][i]),
+                "nutrition_score": float(scores["nutrition_score"][i]),
+                "is_compliant": bool(scores["is_compliant"][i])
+            })
+        return compliances
+
     def _calculate_ingredient_similarity(
         self,
         actual_items: List[str],
@@ -160,13 +387,8 @@ class MealTracker:
         if not expected_items:
             return 1.0
 
-        actual_set = set(actual_items)
-        expected_set = set(expected_items)
-
-        intersection = len(actual_set.intersection(expected_set))
-        union = len(actual_set.union(expected_set))
-
-        return intersection / union if union > 0 else 0.0
+        # Canonical ids, so "Tomatoes" and "cherry tomato" match
+        return self.ingredients.similarity(actual_items, expected_items)
 
     def _calculate_nutritional_similarity(
         self,
@@ -192,28 +414,19 @@ class MealTracker:
 
         return 1.0 - (total_diff / count)
 
-    async def _update_user_stats(self, user_id: int, compliance: Dict) -> None:
-        """Update user's meal compliance statistics"""
+    async def _update_user_stats(self, user_id: int, deltas: Dict) -> None:
+        """Update user's meal compliance statistics without committing.
+
+        Locks the user's row until commit so concurrent meals are not lost;
+        only used when no cache is available for atomic counters.
+        """
         try:
-            user = await self.db.query(User).filter(User.id == user_id).first()
+            user = await self.db.get(User, user_id, with_for_update=True)
             if not user:
                 raise ValueError(f"User not found: {user_id}")
 
-            # Update compliance stats
-            stats = user.meal_stats or {}
-            stats["total_meals"] = stats.get("total_meals", 0) + 1
-            stats["compliant_meals"] = stats.get("compliant_meals", 0) + (
-                1 if compliance["is_compliant"] else 0
-            )
-            stats["average_compliance"] = (
-                (stats.get("average_compliance", 0) * (stats["total_meals"] - 1) +
-                compliance["score"]) / stats["total_meals"]
-            )
-
-            user.meal_stats = stats
-            await self.db.commit()
+            user.meal_stats = apply_deltas(user.meal_stats, deltas)
 
         except Exception as e:
             logger.error(f"Error updating user stats: {str(e)}")
-            await self.db.rollback()
             raise 
\ No newline at end of file
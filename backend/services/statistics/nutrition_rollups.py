@@ -0,0 +1,139 @@
+from typing import Dict, List, Optional
+import logging
+from datetime import date
+from sqlalchemy import delete, select
+from ...database.models import DailyNutritionRollup, Meal, MealStatus
+from ...database.upsert import accumulate
+from ...config import settings
+
+logger = logging.getLogger(__name__)
+
+NUTRIENTS = ("protein", "carbs", "fats", "fiber", "calories")
+
+# Every counter column; all of them accumulate by addition
+ADDITIVE_COLUMNS = (
+    "meal_count",
+    "skipped_count",
+    "outside_count",
+    *NUTRIENTS,
+    "compliance_sum",
+    "compliance_samples",
+    "pass_count",
+    "fail_count"
+)
+
+def rollup_key(meal: Meal) -> Dict:
+    """Get the rollup row a meal belongs to"""
+    return {
+        "user_id": meal.user_id,
+        "day": meal.occurred_at.date(),
+        "meal_type": getattr(meal.meal_type, "value", meal.meal_type)
+    }
+
+def meal_values(meal: Meal, pass_score: float) -> Dict:
+    """Get one meal's contribution to its rollup row"""
+    values = dict.fromkeys(ADDITIVE_COLUMNS, 0)
+    if meal.status == MealStatus.SKIPPED:
+        values["skipped_count"] = 1
+        return values
+
+    nutrition = meal.nutritional_info or {}
+    values["meal_count"] = 1
+    values["outside_count"] = 1 if meal.location == "outside" else 0
+    for nutrient in NUTRIENTS:
+        values[nutrient] = float(nutrition.get(nutrient) or 0.0)
+
+    score = meal.compliance_score
+    if score is not None:
+        values["compliance_sum"] = score
+        values["compliance_samples"] = 1
+        values["pass_count"] = 1 if score >= pass_score else 0
+        values["fail_count"] = 1 - values["pass_count"]
+    return values
+
+class NutritionRollupService:
+    """Maintains and serves daily nutrition and compliance aggregates.
+
+    Rows are keyed by user, day and meal type and updated with one upsert
+    in the transaction that logs the meal, so statistics cost O(days)
+    instead of O(meals).
+    """
+
+    def __init__(self, db_session):
+        self.db = db_session
+        self.pass_score = settings.MEAL_SIMILARITY_THRESHOLD
+
+    async def record(self, meal: Meal) -> None:
+        """Add a logged or skipped meal to its daily row without committing"""
+        await self.record_many([meal])
+
+    async def record_many(self, meals: List[Meal]) -> None:
+        """Add a batch of meals to their daily rows in one statement"""
+        rows: Dict = {}
+        for meal in meals:
+            key = rollup_key(meal)
+            values = meal_values(meal, self.pass_score)
+            # One row per key: an upsert may not touch the same row twice
+            index = (key["user_id"], key["day"], key["meal_type"])
+            if index in rows:
+                for column in ADDITIVE_COLUMNS:
+                    rows[index][column] += values[column]
+            else:
+                rows[index] = {**key, **values}
+
+        if rows:
+            await self.db.execute(accumulate(
+                self.db.get_bind().dialect.name,
+                DailyNutritionRollup.__table__,
+                list(rows.values()),
+                key_columns=("user_id", "day", "meal_type"),
+                additive_columns=ADDITIVE_COLUMNS
+            ))
+
+    async def get_rollups(
+        self,
+        user_id: int,
+        start_day: date,
+        end_day: date
+    ) -> List[DailyNutritionRollup]:
+        """Get the rows for days in [start_day, end_day], oldest first"""
+        result = await self.db.execute(
+            select(DailyNutritionRollup).where(
+                DailyNutritionRollup.user_id == user_id,
+                DailyNutritionRollup.day.between(start_day, end_day)
+            ).order_by(DailyNutritionRollup.day, DailyNutritionRollup.meal_type)
+        )
+        return list(result.scalars())
+
+    async def rebuild(self, user_id: int, start_day: Optional[date] = None) -> int:
+        """Recompute a user's rows from their meals, e.g. after a backfill.
+
+        Returns the number of rows written; the caller commits.
+        """
+        start_day = start_day or date.min
+        await self.db.execute(
+            delete(DailyNutritionRollup).where(
+                DailyNutritionRollup.user_id == user_id,
+                DailyNutritionRollup.day >= start_day
+            )
+        )
+
+        rows: Dict = {}
+        meals = await self.db.execute(
+            select(Meal).where(Meal.user_id == user_id)
+        )
+        for meal in meals.scalars():
+            key = rollup_key(meal)
+            if key["day"] < start_day:
+                continue
+            values = meal_values(meal, self.pass_score)
+            index = (key["day"], key["meal_type"])
+            if index in rows:
+                for column in ADDITIVE_COLUMNS:
+                    rows[index][column] += values[column]
+            else:
+                rows[index] = {**key, **values}
+
+        if rows:
+            await self.db.execute(DailyNutritionRollup.__table__.insert(), list(rows.values()))
+        return len(rows)
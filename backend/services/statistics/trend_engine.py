@@ -0,0 +1,177 @@
+from typing import Dict, Iterable, List, Optional
+import logging
+from datetime import date, timedelta
+from sqlalchemy import select
+import numpy as np
+from ...database.models import DailyNutritionRollup
+from ...config import settings
+from .trend_partials import TREND_SERIES
+
+logger = logging.getLogger(__name__)
+
+TREND_METHODS = ("least_squares", "theil_sen")
+
+# Pairwise slopes held at once by theil_sen_slopes
+THEIL_SEN_CHUNK_ELEMENTS = 1 << 22
+
+def _positions(values: np.ndarray, positions: Optional[np.ndarray]) -> np.ndarray:
+    if positions is None:
+        return np.arange(values.shape[1], dtype=float)
+    return np.asarray(positions, dtype=float)
+
+def least_squares_slopes(values: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+    """Least-squares slope of every row of a (series, weeks) array.
+
+    NaN entries are left out of their row's fit, as np.polyfit over the
+    observed weeks would; rows with fewer than two observed weeks get NaN.
+    Positions default to the column numbers.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    x = _positions(values, positions)
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Centered sums, so long series do not lose precision
+        mean_x = (observed * x).sum(axis=1) / count
+        mean_y = np.where(observed, values, 0.0).sum(axis=1) / count
+        dx = np.where(observed, x - mean_x[:, None], 0.0)
+        dy = np.where(observed, values - mean_y[:, None], 0.0)
+        slopes = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+    return np.where(count >= 2, slopes, np.nan)
+
+def theil_sen_slopes(values: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+    """Theil–Sen slope of every row of a (series, weeks) array.
+
+    The median of the slopes between all pairs of observed weeks, so a
+    few outlier weeks (a holiday, a missed logging streak) do not tip the
+    trend. Rows are processed in chunks to bound the pairwise array.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    x = _positions(values, positions)
+    first, second = np.triu_indices(values.shape[1], k=1)
+    slopes = np.full(values.shape[0], np.nan)
+    if not len(first):
+        return slopes
+
+    step = max(1, THEIL_SEN_CHUNK_ELEMENTS // len(first))
+    for start in range(0, values.shape[0], step):
+        rows = values[start:start + step]
+        # Sorting puts the NaN pairs last, so the median sits at the middle of the observed
+        pairwise = np.sort((rows[:, second] - rows[:, first]) / (x[second] - x[first]), axis=1)
+        observed = (~np.isnan(pairwise)).sum(axis=1)
+        middle = np.stack([(observed - 1) // 2, observed // 2], axis=1).clip(0, len(first) - 1)
+        median = np.take_along_axis(pairwise, middle, axis=1).mean(axis=1)
+        slopes[start:start + step] = np.where(observed > 0, median, np.nan)
+    return slopes
+
+def trend_slopes(values: np.ndarray, method: str = "least_squares", positions: Optional[np.ndarray] = None) -> np.ndarray:
+    """Slope of every row of a (series, weeks) array by the given method"""
+    if method == "least_squares":
+        return least_squares_slopes(values, positions)
+    if method == "theil_sen":
+        return theil_sen_slopes(values, positions)
+    raise ValueError(f"Unknown trend method {method!r}, expected one of {TREND_METHODS}")
+
+def trend_labels(slopes: np.ndarray) -> np.ndarray:
+    """Describe every slope as trend_label does, NaN as insufficient_data"""
+    slopes = np.asarray(slopes, dtype=float)
+    return np.select(
+        [np.isnan(slopes), np.abs(slopes) < 0.01, slopes > 0.05, slopes > 0, slopes < -0.05],
+        ["insufficient_data", "stable", "improving", "slightly_improving", "declining"],
+        "slightly_declining"
+    )
+
+class TrendEngine:
+    """Computes trend labels for many users at once from daily rollups.
+
+    Each batch of users is read in one query and binned into dense
+    (users, weeks) arrays per trend series, so the slopes of every user
+    and series come from a handful of array operations instead of one
+    np.polyfit per user and series.
+    """
+
+    def __init__(self, db_session):
+        self.db = db_session
+        self.batch_size = settings.TREND_ENGINE_USER_BATCH
+
+    async def user_trends(
+        self,
+        start_day: date,
+        end_day: date,
+        user_ids: Optional[Iterable[int]] = None,
+        method: Optional[str] = None
+    ) -> Dict[int, Dict[str, str]]:
+        """Get each user's trend label per series over weeks of [start_day, end_day].
+
+        Weeks are calendar weeks ending on Sunday, as in the analyzer;
+        by default every user with rollups in the range is included.
+        """
+        method = method or settings.TREND_METHOD
+        if user_ids is None:
+            result = await self.db.execute(
+                select(DailyNutritionRollup.user_id).where(
+                    DailyNutritionRollup.day.between(start_day, end_day)
+                ).distinct()
+            )
+            user_ids = result.scalars()
+        user_ids = sorted(set(user_ids))
+
+        trends: Dict[int, Dict[str, str]] = {}
+        for start in range(0, len(user_ids), self.batch_size):
+            batch = user_ids[start:start + self.batch_size]
+            labels = await self._batch_trends(batch, start_day, end_day, method)
+            for row, user_id in enumerate(batch):
+                trends[user_id] = {series: str(labels[series][row]) for series in TREND_SERIES}
+        return trends
+
+    async def _batch_trends(
+        self,
+        user_ids: List[int],
+        start_day: date,
+        end_day: date,
+        method: str
+    ) -> Dict[str, np.ndarray]:
+        columns = ["meal_count", "compliance_sum", "compliance_samples", *TREND_SERIES[1:]]
+        result = await self.db.execute(
+            select(
+                DailyNutritionRollup.user_id,
+                DailyNutritionRollup.day,
+                *[getattr(DailyNutritionRollup, column) for column in columns]
+            ).where(
+                DailyNutritionRollup.user_id.in_(user_ids),
+                DailyNutritionRollup.day.between(start_day, end_day)
+            )
+        )
+        rows = result.all()
+
+        first_monday = start_day - timedelta(days=start_day.weekday())
+        weeks = (end_day - first_monday).days // 7 + 1
+        if rows:
+            users, days, *sums = zip(*rows)
+            user_rows = np.searchsorted(user_ids, np.asarray(users))
+            week_columns = (np.asarray(days, dtype='datetime64[D]') - np.datetime64(first_monday, 'D')).astype(int) // 7
+            cells = user_rows * weeks + week_columns
+        else:
+            sums = [()] * len(columns)
+            cells = np.zeros(0, dtype=int)
+
+        # Sums per (user, week) cell; cells without rollups stay 0 and so NaN below
+        totals = {
+            column: np.bincount(cells, weights=np.asarray(values, dtype=float), minlength=len(user_ids) * weeks)
+                .reshape(len(user_ids), weeks)
+            for column, values in zip(columns, sums)
+        }
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            meals = np.where(totals["meal_count"] > 0, totals["meal_count"], np.nan)
+            values = {"compliance": totals["compliance_sum"] / np.where(
+                totals["compliance_samples"] > 0, totals["compliance_samples"], np.nan
+            )}
+            for nutrient in TREND_SERIES[1:]:
+                values[nutrient] = totals[nutrient] / meals
+
+        # One fit over every user's every series
+        stacked = np.concatenate([values[series] for series in TREND_SERIES])
+        labels = trend_labels(trend_slopes(stacked, method)).reshape(len(TREND_SERIES), len(user_ids))
+        return dict(zip(TREND_SERIES, labels))
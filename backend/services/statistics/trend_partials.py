@@ -0,0 +1,238 @@
+from typing import Dict, Iterable, List, Optional
+import logging
+from datetime import date, timedelta
+from sqlalchemy import or_, select
+import numpy as np
+import pandas as pd
+from ...database.models import DailyNutritionRollup
+from ...database.cache import RedisCache
+from ...config import settings
+from .nutrition_rollups import ADDITIVE_COLUMNS, NUTRIENTS
+
+logger = logging.getLogger(__name__)
+
+# Weekly series whose trend and consistency are reported
+TREND_SERIES = ("compliance", "protein", "carbs", "fats", "calories")
+
+MACROS = {"protein": 4, "carbs": 4, "fats": 9}  # calories per gram
+
+# Per-week sums; every field adds across weeks
+SUMMARY_FIELDS = (
+    "days",
+    "meal_count",
+    "compliance_sum",
+    "compliance_samples",
+    *NUTRIENTS,
+    *(f"{macro}_ratio" for macro in MACROS),
+    "ratio_days"
+)
+
+# A Sunday; weeks are numbered from the week it ends
+REFERENCE_WEEK = date(2000, 1, 2)
+
+def week_end(day: date) -> date:
+    """Get the Sunday ending day's week, the label pd.Grouper(freq='W') uses"""
+    return day + timedelta(days=6 - day.weekday())
+
+def week_numbers(weeks: pd.DatetimeIndex) -> np.ndarray:
+    """Number weeks, given by their ending Sunday, consecutively"""
+    return np.asarray((weeks - pd.Timestamp(REFERENCE_WEEK)).days // 7)
+
+def trend_label(slope: float) -> str:
+    """Describe a weekly slope"""
+    if abs(slope) < 0.01:
+        return "stable"
+    elif slope > 0:
+        return "improving" if slope > 0.05 else "slightly_improving"
+    else:
+        return "declining" if slope < -0.05 else "slightly_declining"
+
+def summarize_days(daily: pd.DataFrame) -> pd.DataFrame:
+    """Sum daily rollup rows into one summary row per week, indexed by week end.
+
+    Besides the counters, a week keeps the sum of its days' macronutrient
+    calorie shares and how many days had calories, so the mean daily
+    share over any set of weeks is a ratio of sums.
+    """
+    totals = daily.groupby('day')[list(ADDITIVE_COLUMNS)].sum()
+    calories = sum(totals[macro] * factor for macro, factor in MACROS.items())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for macro, factor in MACROS.items():
+            totals[f"{macro}_ratio"] = (totals[macro] * factor / calories).fillna(0.0)
+    totals["ratio_days"] = (calories != 0).astype(int)
+    totals["days"] = 1
+
+    days = pd.to_datetime(totals.index)
+    weeks = days + pd.to_timedelta(6 - days.dayofweek, unit='D')
+    # Floats throughout, as the weeks read back from the cache are
+    summary = totals.groupby(weeks)[list(SUMMARY_FIELDS)].sum().astype(float)
+    summary.index.name = 'week'
+    return summary
+
+def series_values(summary: pd.DataFrame) -> pd.DataFrame:
+    """Get each week's value of every trend series, NaN for weeks without meals.
+
+    Compliance is the mean score of the week's scored meals; nutrients
+    are per-meal averages over the week's eaten meals.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = {"compliance": summary["compliance_sum"] / summary["compliance_samples"].replace(0, np.nan)}
+        meals = summary["meal_count"].replace(0, np.nan)
+        for nutrient in TREND_SERIES[1:]:
+            values[nutrient] = summary[nutrient] / meals
+    return pd.DataFrame(values, index=summary.index)
+
+class TrendPartial:
+    """Sufficient statistics of weekly series for least squares and spread.
+
+    Holds, per series, the number of weeks with a value and the sums of
+    x, x², y, xy and y², where x is the week number. Partials of disjoint
+    weeks add, so the slope and consistency of any window follow from
+    its weeks' partials without revisiting the weeks themselves.
+    """
+
+    __slots__ = ("count", "sum_x", "sum_xx", "sum_y", "sum_xy", "sum_yy")
+
+    def __init__(self, count, sum_x, sum_xx, sum_y, sum_xy, sum_yy):
+        self.count = count
+        self.sum_x = sum_x
+        self.sum_xx = sum_xx
+        self.sum_y = sum_y
+        self.sum_xy = sum_xy
+        self.sum_yy = sum_yy
+
+    @classmethod
+    def of_weeks(cls, weeks: Iterable[int], values: np.ndarray) -> "TrendPartial":
+        """Build the partial of weeks, given their (weeks, series) values"""
+        values = np.asarray(values, dtype=float).reshape(-1, len(TREND_SERIES))
+        x = np.asarray(list(weeks), dtype=float)[:, None]
+        observed = ~np.isnan(values)
+        y = np.where(observed, values, 0.0)
+        x = np.where(observed, x, 0.0)
+        return cls(
+            observed.sum(axis=0),
+            x.sum(axis=0),
+            (x * x).sum(axis=0),
+            y.sum(axis=0),
+            (x * y).sum(axis=0),
+            (y * y).sum(axis=0)
+        )
+
+    @classmethod
+    def of_summary(cls, summary: pd.DataFrame) -> "TrendPartial":
+        """Build the partial of weekly summaries"""
+        return cls.of_weeks(week_numbers(summary.index), series_values(summary).to_numpy())
+
+    def __add__(self, other: "TrendPartial") -> "TrendPartial":
+        return TrendPartial(*(getattr(self, field) + getattr(other, field) for field in self.__slots__))
+
+    def slopes(self) -> np.ndarray:
+        """Least-squares slope per week of each series, NaN below two weeks"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            spread = self.count * self.sum_xx - self.sum_x * self.sum_x
+            slopes = (self.count * self.sum_xy - self.sum_x * self.sum_y) / spread
+        return np.where(self.count >= 2, slopes, np.nan)
+
+    def consistency(self) -> np.ndarray:
+        """One minus the coefficient of variation of each series, at least 0"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.sum_y / self.count
+            variance = (self.sum_yy - self.sum_y * mean) / (self.count - 1)
+            score = 1 - np.sqrt(np.maximum(variance, 0.0)) / mean
+        return np.where(self.count >= 2, np.nan_to_num(np.maximum(score, 0.0)), 0.0)
+
+    def trends(self) -> Dict[str, str]:
+        """Trend label of each series"""
+        return {
+            series: "insufficient_data" if np.isnan(slope) else trend_label(slope)
+            for series, slope in zip(TREND_SERIES, self.slopes())
+        }
+
+class WeeklySummaryStore:
+    """Serves per-week summaries of daily rollups, caching each whole week once.
+
+    A window's interior weeks come from the cache and only weeks that
+    changed since they were cached, plus the window's clipped first and
+    last weeks, are read from the rollups. MealTracker drops the weeks a
+    write touches; callers of NutritionRollupService.rebuild should too.
+    """
+
+    def __init__(self, db_session, cache: Optional[RedisCache]):
+        self.db = db_session
+        self.cache = cache
+        self.expire = settings.TREND_WEEK_CACHE_EXPIRE
+
+    @staticmethod
+    def week_key(user_id: int, week: date) -> str:
+        return f"trend_week:{user_id}:{week.isoformat()}"
+
+    async def get_summaries(self, user_id: int, start_day: date, end_day: date) -> pd.DataFrame:
+        """Get the summaries of weeks with rollups for days in [start_day, end_day]"""
+        weeks = [week_end(start_day) + timedelta(weeks=i)
+                 for i in range((week_end(end_day) - week_end(start_day)).days // 7 + 1)]
+        # Weeks the window cuts are summarized over the days inside it
+        whole = [week for week in weeks if week - timedelta(days=6) >= start_day and week <= end_day]
+
+        cached: Dict[date, Optional[List]] = {}
+        if self.cache is not None and whole:
+            keys = {self.week_key(user_id, week): week for week in whole}
+            for key, row in (await self.cache.get_many(list(keys))).items():
+                cached[keys[key]] = row
+
+        missing = [week for week in weeks if week not in cached]
+        fresh = await self._summarize(user_id, missing, start_day, end_day)
+
+        if self.cache is not None:
+            # Weeks without rollups are cached as zeros, so they are not re-read
+            empty = [0] * len(SUMMARY_FIELDS)
+            stored = {
+                self.week_key(user_id, week): (
+                    fresh.loc[pd.Timestamp(week)].tolist() if pd.Timestamp(week) in fresh.index else empty
+                )
+                for week in missing if week in whole
+            }
+            if stored:
+                await self.cache.set_many(stored, expire=self.expire)
+
+        summary = pd.concat([
+            fresh,
+            pd.DataFrame(
+                list(cached.values()),
+                index=pd.DatetimeIndex([pd.Timestamp(week) for week in cached]),
+                columns=list(SUMMARY_FIELDS),
+                dtype=float
+            )
+        ]) if cached else fresh
+        summary = summary[summary['days'] > 0].sort_index()
+        summary.index.name = 'week'
+        return summary
+
+    async def invalidate(self, user_id: int, days: Iterable[date]) -> None:
+        """Drop the cached summaries of the weeks containing days"""
+        if self.cache is not None:
+            weeks = {week_end(day) for day in days}
+            await self.cache.delete_many([self.week_key(user_id, week) for week in weeks])
+
+    async def _summarize(self, user_id: int, weeks: List[date], start_day: date, end_day: date) -> pd.DataFrame:
+        """Read and summarize the rollups of weeks, clipped to [start_day, end_day]"""
+        columns = ['day', *ADDITIVE_COLUMNS]
+        # Consecutive weeks are read as one day range
+        ranges: List[List[date]] = []
+        for week in sorted(weeks):
+            first, last = max(week - timedelta(days=6), start_day), min(week, end_day)
+            if ranges and ranges[-1][1] + timedelta(days=1) == first:
+                ranges[-1][1] = last
+            else:
+                ranges.append([first, last])
+
+        if ranges:
+            result = await self.db.execute(
+                select(*[getattr(DailyNutritionRollup, column) for column in columns]).where(
+                    DailyNutritionRollup.user_id == user_id,
+                    or_(*[DailyNutritionRollup.day.between(first, last) for first, last in ranges])
+                )
+            )
+            daily = pd.DataFrame(result.all(), columns=columns)
+        else:
+            daily = pd.DataFrame(columns=columns)
+        return summarize_days(daily)
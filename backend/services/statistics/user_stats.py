@@ -0,0 +1,186 @@
+from typing import Callable, Dict, Iterable, Tuple
+import asyncio
+import logging
+import uuid
+from sqlalchemy import select
+from ...database.models import User
+from ...config import settings
+from ...database.cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Set of user ids with counters waiting to be flushed
+DIRTY_KEY = "user_stats:dirty"
+
+# Held by the one worker flushing at a time
+FLUSH_LOCK_KEY = "lock:user_stats:flush"
+
+# Hash field naming a claimed hash, and the meal_stats key recording the last one applied
+FLUSH_ID_FIELD = "flush_id"
+
+def pending_key(user_id: int) -> str:
+    return f"user_stats:{user_id}"
+
+def flushing_key(user_id: int) -> str:
+    return f"user_stats:{user_id}:flushing"
+
+def compliance_deltas(compliance: Dict) -> Dict:
+    """Get one logged meal's contribution to the user's counters"""
+    return {
+        "total_meals": 1,
+        "compliant_meals": 1 if compliance["is_compliant"] else 0,
+        "compliance_sum": float(compliance["score"])
+    }
+
+def sum_deltas(deltas: Iterable[Dict]) -> Dict:
+    """Combine several meals' contributions into one"""
+    total: Dict = {}
+    for delta in deltas:
+        for field, amount in delta.items():
+            total[field] = total.get(field, 0) + amount
+    return total
+
+def apply_deltas(stats: Dict, deltas: Dict) -> Dict:
+    """Fold counter deltas into a copy of a user's meal_stats"""
+    stats = dict(stats or {})
+    total = stats.get("total_meals", 0)
+    # Stats written before compliance_sum existed only kept the average
+    compliance_sum = stats.get("compliance_sum", stats.get("average_compliance", 0) * total)
+
+    stats["total_meals"] = total + int(deltas.get("total_meals", 0))
+    stats["compliant_meals"] = stats.get("compliant_meals", 0) + int(deltas.get("compliant_meals", 0))
+    stats["compliance_sum"] = compliance_sum + float(deltas.get("compliance_sum", 0.0))
+    stats["average_compliance"] = (
+        stats["compliance_sum"] / stats["total_meals"] if stats["total_meals"] else 0
+    )
+    return stats
+
+class UserStatsCounters:
+    """Per-user meal compliance counters kept in Redis hashes.
+
+    Logging a meal only increments hash fields, which Redis applies
+    atomically, so concurrent meals never contend on the users row. A
+    periodic flush folds the accumulated deltas into User.meal_stats.
+    """
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+
+    async def record(self, user_id: int, deltas: Dict) -> bool:
+        """Count logged meals' deltas; call only once the meals are committed"""
+        pipe = self.cache.pipeline()
+        for field, amount in deltas.items():
+            pipe.increment_field(pending_key(user_id), field, amount)
+        pipe.add_members(DIRTY_KEY, user_id)
+        return await pipe.execute() is not None
+
+    async def get_stats(self, user: User) -> Dict:
+        """Get a user's meal_stats including deltas not yet flushed"""
+        stats = user.meal_stats
+        for key in (flushing_key(user.id), pending_key(user.id)):
+            deltas = await self.cache.get_fields(key)
+            flush_id = deltas.pop(FLUSH_ID_FIELD, None)
+            # A claimed hash whose flush committed is already in meal_stats
+            if deltas and (flush_id is None or flush_id != (stats or {}).get(FLUSH_ID_FIELD)):
+                stats = apply_deltas(stats, deltas)
+        return stats or {}
+
+    async def flush(self, session_factory: Callable, batch_size: int) -> int:
+        """Persist pending counters to User.meal_stats, returning the users flushed.
+
+        One worker flushes at a time, under FLUSH_LOCK_KEY; the others
+        return 0. Each user's hash is renamed before it is read, so
+        increments that arrive during the flush land in a fresh hash for
+        the next one. A renamed hash left behind by a failed flush is
+        applied before any newer deltas are claimed. Every claimed hash
+        carries a flush id that is stored in meal_stats in the same
+        commit as its deltas, so a hash whose flush committed but was
+        never deleted is recognised and not applied again.
+        """
+        token = uuid.uuid4().hex
+        if not await self.cache.acquire_lock(FLUSH_LOCK_KEY, token, settings.USER_STATS_FLUSH_LOCK_TIMEOUT):
+            return 0
+        try:
+            return await self._flush(session_factory, batch_size)
+        finally:
+            await self.cache.release_lock(FLUSH_LOCK_KEY, token)
+
+    async def _flush(self, session_factory: Callable, batch_size: int) -> int:
+        flushed = 0
+        # Users to flush again next time rather than in this flush
+        requeue = []
+        try:
+            while True:
+                user_ids = [int(user_id) for user_id in await self.cache.pop_members(DIRTY_KEY, batch_size)]
+                if not user_ids:
+                    return flushed
+
+                try:
+                    claimed: Dict[int, Tuple[str, Dict]] = {}
+                    named = []
+                    for user_id in user_ids:
+                        if await self.cache.exists(flushing_key(user_id)):
+                            requeue.append(user_id)  # newer deltas wait for the next flush
+                        elif not await self.cache.claim(pending_key(user_id), flushing_key(user_id)):
+                            continue
+                        flush_id = await self.cache.set_field_default(
+                            flushing_key(user_id), FLUSH_ID_FIELD, uuid.uuid4().hex
+                        )
+                        if flush_id is None:
+                            requeue.append(user_id)
+                            continue
+                        named.append(user_id)
+                        deltas = await self.cache.get_fields(flushing_key(user_id))
+                        deltas.pop(FLUSH_ID_FIELD, None)
+                        if deltas:
+                            claimed[user_id] = (flush_id, deltas)
+
+                    async with session_factory() as db:
+                        try:
+                            users = await db.execute(
+                                select(User).where(User.id.in_(list(claimed))).with_for_update()
+                            )
+                            for user in users.scalars():
+                                flush_id, deltas = claimed[user.id]
+                                if (user.meal_stats or {}).get(FLUSH_ID_FIELD) == flush_id:
+                                    continue  # committed by a flush that failed before deleting the hash
+                                user.meal_stats = {**apply_deltas(user.meal_stats, deltas), FLUSH_ID_FIELD: flush_id}
+                            await db.commit()
+                        except Exception:
+                            await db.rollback()
+                            raise
+
+                    if not await self.cache.delete_many([flushing_key(user_id) for user_id in named]):
+                        # Their flush ids keep the next flush from applying them twice
+                        requeue.extend(named)
+                except Exception:
+                    # Whatever this batch claimed is picked up again next time
+                    requeue.extend(user_ids)
+                    raise
+                flushed += len(claimed)
+        finally:
+            if requeue:
+                await self._mark_dirty(requeue)
+
+    async def _mark_dirty(self, user_ids) -> None:
+        pipe = self.cache.pipeline()
+        pipe.add_members(DIRTY_KEY, *user_ids)
+        await pipe.execute()
+
+async def user_stats_flush_loop(
+    counters: UserStatsCounters,
+    session_factory: Callable,
+    interval: float,
+    batch_size: int
+) -> None:
+    """Flush user statistics counters every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            flushed = await counters.flush(session_factory, batch_size)
+            if flushed:
+                logger.info(f"Flushed meal statistics for {flushed} users")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"User statistics flush failed: {str(e)}")
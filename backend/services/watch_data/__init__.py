@@ -3,5 +3,6 @@ Watch Data Services Package
 """
 
 from .collector import WatchDataCollector
+from .rollups import WatchRollupService
 
-__all__ = ['WatchDataCollector'] 
\ No newline at end of file
+__all__ = ['WatchDataCollector', 'WatchRollupService'] 
\ No newline at end of file
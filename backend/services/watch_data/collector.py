@@ -2,15 +2,24 @@ from typing import Dict, List, Optional
 import logging
 import asyncio
 from datetime import datetime, timedelta
+from sqlalchemy import select
 from ...database.models import User, WatchData
+from ...database.models.watch_data import DeviceType
+from ...database.raw_payloads import RawPayloadStore
+from .rollups import WatchRollupService
 from ...config import settings
 from ...utils.exceptions import WatchConnectionError
 
 logger = logging.getLogger(__name__)
 
+# Collector device names that differ from DeviceType values
+DEVICE_TYPES = {"samsung_watch": DeviceType.SAMSUNG}
+
 class WatchDataCollector:
     def __init__(self, db_session):
         self.db = db_session
+        self.raw_store = RawPayloadStore(db_session)
+        self.rollups = WatchRollupService(db_session)
         self.collection_interval = settings.WATCH_DATA_COLLECTION_INTERVAL
         self.retry_attempts = 3
         self.supported_devices = {
@@ -51,10 +60,59 @@ class WatchDataCollector:
                 "error": str(e)
             }
 
+    async def collect_health_data(
+        self,
+        user: User,
+        start_time: datetime,
+        end_time: datetime,
+        include_raw: bool = False
+    ) -> List[Dict]:
+        """Get stored watch data for a time range, oldest first.
+
+        The timestamp bounds let PostgreSQL scan only the monthly
+        partitions that overlap the range. Raw device payloads are only
+        loaded when include_raw is set.
+        """
+        try:
+            result = await self.db.execute(
+                select(WatchData).where(
+                    WatchData.user_id == user.id,
+                    WatchData.timestamp >= start_time,
+                    WatchData.timestamp < end_time
+                ).order_by(WatchData.timestamp)
+            )
+            records = [record.to_dict() for record in result.scalars()]
+
+            if include_raw:
+                payloads = await self.raw_store.get_many(
+                    record["raw_data_ref"] for record in records
+                )
+                for record in records:
+                    record["raw_data"] = payloads.get(record["raw_data_ref"])
+            return records
+        except Exception as e:
+            logger.error(f"Error getting health data: {str(e)}")
+            raise
+
+    async def get_rollups(
+        self,
+        user: User,
+        granularity: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> List[Dict]:
+        """Get hourly or daily metric aggregates for a time range, oldest first"""
+        try:
+            rollups = await self.rollups.get_rollups(user.id, granularity, start_time, end_time)
+            return [rollup.to_dict() for rollup in rollups]
+        except Exception as e:
+            logger.error(f"Error getting watch rollups: {str(e)}")
+            raise
+
     async def _get_user(self, user_id: int) -> User:
         """Get user from database"""
         try:
-            user = await self.db.query(User).filter(User.id == user_id).first()
+            user = await self.db.get(User, user_id)
             if not user:
                 raise ValueError(f"User not found: {user_id}")
             return user
@@ -157,14 +215,19 @@ class WatchDataCollector:
     async def _save_watch_data(self, user_id: int, watch_data: Dict) -> None:
         """Save watch data to database"""
         try:
+            raw_data_ref = None
+            if watch_data.get("raw_data"):
+                raw_data_ref = await self.raw_store.put(watch_data["raw_data"])
+
             watch_data_model = WatchData(
                 user_id=user_id,
-                device_type=watch_data["device_type"],
-                metrics=watch_data["metrics"],
-                raw_data=watch_data["raw_data"],
-                collected_at=datetime.now()
+                device_type=DEVICE_TYPES.get(watch_data["device_type"]) or DeviceType(watch_data["device_type"]),
+                timestamp=datetime.fromisoformat(watch_data["timestamp"]),
+                raw_data_ref=raw_data_ref,
+                **self._metric_columns(watch_data["metrics"])
             )
             self.db.add(watch_data_model)
+            await self.rollups.record(watch_data_model)
             await self.db.commit()
             
         except Exception as e:
@@ -172,6 +235,44 @@ class WatchDataCollector:
             await self.db.rollback()
             raise
 
+    def _metric_columns(self, metrics: Dict) -> Dict:
+        """Map standardized metrics onto WatchData's typed columns"""
+        columns = {
+            "steps": metrics.get("steps") or 0,
+            "calories_burned": metrics.get("calories") or 0.0,
+            "distance": metrics.get("distance") or 0.0
+        }
+
+        heart_rate = metrics.get("heart_rate")
+        if isinstance(heart_rate, dict):
+            columns.update(
+                heart_rate_avg=heart_rate.get("average"),
+                heart_rate_max=heart_rate.get("max"),
+                heart_rate_min=heart_rate.get("min"),
+                heart_rate_resting=heart_rate.get("resting")
+            )
+        elif heart_rate is not None:
+            # A single reading for the whole interval
+            columns.update(heart_rate_avg=heart_rate, heart_rate_max=heart_rate, heart_rate_min=heart_rate)
+
+        active_minutes = metrics.get("active_minutes")
+        if isinstance(active_minutes, dict):
+            columns.update(
+                sedentary_minutes=active_minutes.get("sedentary") or 0,
+                lightly_active_minutes=active_minutes.get("lightly_active") or 0,
+                fairly_active_minutes=active_minutes.get("fairly_active") or 0,
+                very_active_minutes=active_minutes.get("very_active") or 0
+            )
+
+        sleep_data = metrics.get("sleep_data")
+        if isinstance(sleep_data, dict):
+            columns.update(
+                sleep_duration=sleep_data.get("duration"),
+                sleep_efficiency=sleep_data.get("efficiency"),
+                sleep_stages=sleep_data.get("stages")
+            )
+        return columns
+
     async def _init_healthkit(self, device_id: str):
         """Initialize HealthKit connection"""
         # Implementation for HealthKit initialization
@@ -0,0 +1,171 @@
+from typing import Dict, List, Optional
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from ...database.models import WatchData, WatchMetricRollup
+from ...database.upsert import accumulate
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day")
+
+# Columns that accumulate by addition
+ADDITIVE_COLUMNS = (
+    "sample_count",
+    "steps",
+    "calories_burned",
+    "distance",
+    "heart_rate_sum",
+    "heart_rate_samples",
+    "sedentary_minutes",
+    "lightly_active_minutes",
+    "fairly_active_minutes",
+    "very_active_minutes",
+    "sleep_duration",
+    "sleep_efficiency_sum",
+    "sleep_samples"
+)
+
+# Columns that accumulate by keeping the lowest or highest value
+MIN_COLUMNS = ("heart_rate_min", "heart_rate_resting")
+MAX_COLUMNS = ("heart_rate_max",)
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Get the start of the hour or day bucket containing timestamp"""
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+def sample_values(sample: WatchData) -> Dict:
+    """Get one watch sample's contribution to a rollup bucket"""
+    return {
+        "sample_count": 1,
+        "steps": sample.steps or 0,
+        "calories_burned": sample.calories_burned or 0.0,
+        "distance": sample.distance or 0.0,
+        "heart_rate_sum": sample.heart_rate_avg or 0.0,
+        "heart_rate_samples": 1 if sample.heart_rate_avg is not None else 0,
+        "heart_rate_min": sample.heart_rate_min,
+        "heart_rate_max": sample.heart_rate_max,
+        "heart_rate_resting": sample.heart_rate_resting,
+        "sedentary_minutes": sample.sedentary_minutes or 0,
+        "lightly_active_minutes": sample.lightly_active_minutes or 0,
+        "fairly_active_minutes": sample.fairly_active_minutes or 0,
+        "very_active_minutes": sample.very_active_minutes or 0,
+        "sleep_duration": sample.sleep_duration or 0,
+        "sleep_efficiency_sum": sample.sleep_efficiency or 0.0,
+        "sleep_samples": 1 if sample.sleep_efficiency is not None else 0
+    }
+
+def merge_values(total: Dict, values: Dict) -> Dict:
+    """Fold a sample's contribution into a bucket's running values"""
+    for column in ADDITIVE_COLUMNS:
+        total[column] += values[column]
+    for column in MIN_COLUMNS + MAX_COLUMNS:
+        pick = min if column in MIN_COLUMNS else max
+        candidates = [v for v in (total[column], values[column]) if v is not None]
+        total[column] = pick(candidates) if candidates else None
+    return total
+
+class WatchRollupService:
+    """Maintains and serves hourly and daily aggregates of watch metrics.
+
+    Buckets are updated with one upsert per sample in the ingesting
+    transaction, so reads never aggregate raw watch_data rows.
+    """
+
+    def __init__(self, db_session):
+        self.db = db_session
+
+    async def record(self, sample: WatchData) -> None:
+        """Add a watch sample to its hour and day buckets without committing"""
+        values = sample_values(sample)
+        await self.db.execute(accumulate(
+            self.db.get_bind().dialect.name,
+            WatchMetricRollup.__table__,
+            [
+                {
+                    "user_id": sample.user_id,
+                    "granularity": granularity,
+                    "bucket_start": bucket_start(sample.timestamp, granularity),
+                    **values
+                }
+                for granularity in GRANULARITIES
+            ],
+            key_columns=("user_id", "granularity", "bucket_start"),
+            additive_columns=ADDITIVE_COLUMNS,
+            min_columns=MIN_COLUMNS,
+            max_columns=MAX_COLUMNS
+        ))
+
+    async def get_rollups(
+        self,
+        user_id: int,
+        granularity: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> List[WatchMetricRollup]:
+        """Get the buckets starting in [start_time, end_time), oldest first"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+        result = await self.db.execute(
+            select(WatchMetricRollup).where(
+                WatchMetricRollup.user_id == user_id,
+                WatchMetricRollup.granularity == granularity,
+                WatchMetricRollup.bucket_start >= start_time,
+                WatchMetricRollup.bucket_start < end_time
+            ).order_by(WatchMetricRollup.bucket_start)
+        )
+        return list(result.scalars())
+
+    async def rebuild(
+        self,
+        user_id: int,
+        start_time: datetime,
+        end_time: Optional[datetime] = None
+    ) -> int:
+        """Recompute a user's buckets from watch_data, e.g. after a backfill.
+
+        The range is widened to whole days. Returns the number of
+        buckets written; the caller commits.
+        """
+        start_time = bucket_start(start_time, "day")
+        end_time = bucket_start(end_time or datetime.utcnow(), "day") + timedelta(days=1)
+
+        await self.db.execute(
+            delete(WatchMetricRollup).where(
+                WatchMetricRollup.user_id == user_id,
+                WatchMetricRollup.bucket_start >= start_time,
+                WatchMetricRollup.bucket_start < end_time
+            )
+        )
+
+        buckets: Dict = {}
+        samples = await self.db.execute(
+            select(WatchData).where(
+                WatchData.user_id == user_id,
+                WatchData.timestamp >= start_time,
+                WatchData.timestamp < end_time
+            )
+        )
+        for sample in samples.scalars():
+            values = sample_values(sample)
+            for granularity in GRANULARITIES:
+                key = (granularity, bucket_start(sample.timestamp, granularity))
+                if key in buckets:
+                    merge_values(buckets[key], values)
+                else:
+                    buckets[key] = dict(values)
+
+        if buckets:
+            await self.db.execute(
+                WatchMetricRollup.__table__.insert(),
+                [
+                    {"user_id": user_id, "granularity": granularity, "bucket_start": start, **values}
+                    for (granularity, start), values in buckets.items()
+                ]
+            )
+        return len(buckets)
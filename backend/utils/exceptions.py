@@ -0,0 +1,5 @@
+class MealTrackingError(Exception):
+    """A meal could not be logged, e.g. outside its meal-time window"""
+
+class WatchConnectionError(Exception):
+    """A watch or its vendor API could not be reached"""
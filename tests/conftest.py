@@ -0,0 +1,12 @@
+import os
+
+# Settings are read at import; the tests need no real services behind them
+for name, value in {
+    "DATABASE_URL": "sqlite://",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "OPENAI_API_KEY": "test",
+    "VISION_API_KEY": "test",
+    "SECRET_KEY": "test"
+}.items():
+    os.environ.setdefault(name, value)
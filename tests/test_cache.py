@@ -0,0 +1,101 @@
+import asyncio
+import time
+import pytest
+from backend.config import settings
+from backend.database.cache import COMPUTED_MARKER, CachePipeline, RedisCache
+from backend.database.memory_cache import MemoryCache
+
+class FakeRedisCache(RedisCache):
+    """RedisCache against fakeredis, which runs the Lua scripts"""
+
+    def _create_client(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        return fakeredis.FakeAsyncRedis()
+
+@pytest.fixture(params=[MemoryCache, FakeRedisCache])
+def cache_class(request):
+    return request.param
+
+def test_tag_set_outlives_its_longest_member(cache_class):
+    async def scenario():
+        cache = cache_class()
+        await cache.set("a", 1, expire=600, tags=["user:1"])
+        await cache.set("b", 2, expire=60, tags=["user:1"])
+        return await cache.redis.pttl("tag:user:1")
+
+    assert 590_000 < asyncio.run(scenario()) <= 600_000
+
+def test_tag_set_stays_persistent_after_member_without_expiry(cache_class):
+    async def scenario():
+        cache = cache_class()
+        await cache.set("a", 1, tags=["user:1"])
+        await cache.set("b", 2, expire=60, tags=["user:1"])
+        persistent = await cache.redis.pttl("tag:user:1")
+        await cache.set_many({"c": 3, "d": 4}, ttls={"c": 30}, tags=["user:2"])
+        return persistent, await cache.redis.pttl("tag:user:2")
+
+    assert asyncio.run(scenario()) == (-1, -1)
+
+def test_invalidate_tag_deletes_members(cache_class):
+    async def scenario():
+        cache = cache_class()
+        await cache.set("a", 1, tags=["user:1"])
+        await cache.set("b", 2, expire=60, tags=["user:1"])
+        await cache.set("c", 3, tags=["user:2"])
+        assert await cache.invalidate_tag("user:1")
+        return [await cache.get(key) for key in ("a", "b", "c")], await cache.redis.exists("tag:user:1")
+
+    assert asyncio.run(scenario()) == ([None, None, 3], 0)
+
+def test_release_lock_only_with_own_token(cache_class):
+    async def scenario():
+        cache = cache_class()
+        await cache.acquire_lock("lock:a", "mine")
+        await cache.release_lock("lock:a", "theirs")
+        held = await cache.redis.get("lock:a")
+        await cache.release_lock("lock:a", "mine")
+        return held, await cache.redis.get("lock:a")
+
+    assert asyncio.run(scenario()) == (b"mine", None)
+
+def test_foreground_miss_does_not_join_a_refresh_that_gives_up(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_LOCK_POLL_INTERVAL", 0.01)
+
+    async def scenario():
+        cache = MemoryCache()
+        # Another worker is computing the key
+        await cache.acquire_lock("lock:report", "other-worker")
+
+        async def compute():
+            return "computed here"
+
+        async def other_worker_finishes():
+            await asyncio.sleep(0.05)
+            await cache.set(
+                "report",
+                {COMPUTED_MARKER: True, "value": "computed elsewhere", "expires_at": time.time() + 60, "compute_time": 0.0},
+                expire=60
+            )
+            await cache.release_lock("lock:report", "other-worker")
+
+        # A refresh already in flight gives up on the lock and returns None
+        cache._refresh_in_background("report", compute, 60, None, 0)
+        await asyncio.sleep(0)
+        finisher = asyncio.ensure_future(other_worker_finishes())
+        value = await cache.get_or_compute("report", compute, expire=60)
+        await finisher
+        return value
+
+    assert asyncio.run(scenario()) == "computed elsewhere"
+
+def test_tagged_write_queues_the_tag_script_by_sha():
+    async def scenario():
+        cache = FakeRedisCache()
+        await cache.redis.script_flush()
+        pipe = CachePipeline(cache).set("a", 1, expire=60, tags=["user:1"])
+        queued = [command[0][0] for command in pipe._pipe.command_stack]
+        await pipe.execute()
+        return queued, await cache.redis.smembers("tag:user:1")
+
+    assert asyncio.run(scenario()) == (["SET", "EVALSHA"], {b"a"})
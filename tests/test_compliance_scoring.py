@@ -0,0 +1,23 @@
+import numpy as np
+from backend.benchmarks.compliance_scoring import scalar_scores, synthetic_pairs
+from backend.services.statistics.compliance_scoring import ComplianceScorer
+from backend.services.statistics.meal_tracker import MealTracker
+
+def test_batch_scores_match_tracker_exactly():
+    actual, expected = synthetic_pairs(2000)
+    tracker = MealTracker(db_session=None)
+    batch = ComplianceScorer(tracker.similarity_threshold).score(actual, expected)
+
+    scalar = scalar_scores(tracker, actual, expected)
+    assert np.array_equal(scalar, batch["score"])
+    assert np.array_equal(scalar >= tracker.similarity_threshold, batch["is_compliant"])
+
+def test_rescoring_encoded_history_matches_tracker():
+    actual, expected = synthetic_pairs(2000, seed=9)
+    tracker = MealTracker(db_session=None)
+    scorer = ComplianceScorer(tracker.similarity_threshold)
+    menu = [target for target in expected if target][:21]
+    assignment = np.random.default_rng(3).integers(0, len(menu), size=len(actual))
+
+    rescored = scorer.score_encoded(scorer.encode(actual), scorer.encode(menu), assignment)
+    assert np.array_equal(scalar_scores(tracker, actual, [menu[i] for i in assignment]), rescored["score"])
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import pytest
+from backend.benchmarks import historical_analyzer as bench
+from backend.services.statistics.historical_analyzer import MEAL_COLUMNS, HistoricalAnalyzer, meal_frame
+from backend.services.statistics.trend_partials import summarize_days
+
+@pytest.fixture
+def analyzer():
+    return HistoricalAnalyzer(None, None, None, None)
+
+@pytest.mark.parametrize("days", [1, 30, 200])
+def test_frame_pipeline_matches_legacy(analyzer, days):
+    rows, daily, health = bench.synthetic_history(days)
+    weeks = summarize_days(daily)
+    # Newest first, as Meal.to_dict rows used to arrive
+    meals = [dict(zip(MEAL_COLUMNS, row)) for row in reversed(rows)]
+    bench.check_equal(
+        bench.legacy_pipeline(analyzer, meals, weeks, health),
+        asyncio.run(bench.frame_pipeline(analyzer, rows, weeks, health))
+    )
+
+def test_meal_frame_sorts_unordered_rows():
+    rows, _, _ = bench.synthetic_history(3)
+    frame = meal_frame(reversed(rows))
+    assert frame['scheduled_time'].is_monotonic_increasing
+    assert len(frame) == len(rows)
+
+@pytest.mark.parametrize("days", [2, 10, 400])
+def test_weekday_stats_match_legacy_best_days(analyzer, days):
+    rows, _, _ = bench.synthetic_history(days)
+    meals = meal_frame(rows)
+    legacy = bench.legacy_best_days(meals[list(MEAL_COLUMNS)])
+    assert legacy == analyzer._find_best_compliance_days(analyzer._weekday_stats(meals))
+
+def test_weekend_comparison_pools_weekday_sums(analyzer):
+    rows, _, _ = bench.synthetic_history(60)
+    meals = meal_frame(rows)
+    comparison = analyzer._compare_weekend_weekday(analyzer._weekday_stats(meals))
+
+    for period, is_weekend in (("weekday", False), ("weekend", True)):
+        part = meals[meals['is_weekend'] == is_weekend]
+        assert comparison[period]["average_score"] == pytest.approx(part['compliance_score'].mean())
+        assert comparison[period]["score_std"] == pytest.approx(part['compliance_score'].std())
+        assert comparison[period]["meals_per_day"] == pytest.approx(len(part) / part['date'].nunique())
+
+def test_rewritten_hot_spots_match_legacy(analyzer):
+    rows, _, _ = bench.synthetic_history(500)
+    meals = meal_frame(rows)
+    meals['energy_level'] = meals['compliance_score'].fillna(0.5) * 4
+
+    # Through JSON, so NaN correlations compare equal
+    for legacy, current in (
+        (bench.legacy_challenging_meals(meals), analyzer._identify_challenging_meals(meals)),
+        (bench.legacy_time_consistency(meals), analyzer._analyze_time_consistency(meals)),
+        (bench.legacy_energy_correlation(analyzer, meals), analyzer._correlate_with_energy(meals))
+    ):
+        assert json.dumps(legacy) == json.dumps(current)
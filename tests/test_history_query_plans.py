@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy import create_engine
+from backend.benchmarks.history_query_plans import check_plan, create_history, explain, history_queries
+
+QUERIES = history_queries(user_id=10)
+
+@pytest.fixture(scope="module")
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        create_history(conn, users=20, rows_per_user=200)
+        yield conn
+    engine.dispose()
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_history_query_seeks_its_index(conn, name):
+    query, index = QUERIES[name]
+    check_plan(name, explain(conn, query), index)
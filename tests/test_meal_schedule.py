@@ -0,0 +1,23 @@
+from datetime import datetime
+from types import SimpleNamespace
+from backend.database.models import MealType
+from backend.services.statistics.meal_schedule import DEFAULT_WINDOWS, get_meal_schedule
+
+def test_malformed_meal_times_fall_back_to_default_windows():
+    user = SimpleNamespace(
+        meal_times={
+            "breakfast": {"start": "07:00"},
+            "lunch": [["12:00"], "13:00"],
+            "dinner": "19:00",
+            "brunch": "11:00"
+        },
+        app_settings={"timezone": "UTC"}
+    )
+    schedule = get_meal_schedule(user)
+
+    assert get_meal_schedule(user) is schedule
+    assert schedule.windows["breakfast"] == (6 * 60, 10 * 60)
+    assert schedule.windows["lunch"] == (12 * 60, 15 * 60)
+    assert set(schedule.windows) == set(DEFAULT_WINDOWS)
+    assert schedule.is_valid(MealType.BREAKFAST, datetime(2024, 3, 4, 9, 30))
+    assert not schedule.is_valid(MealType.DINNER, datetime(2024, 3, 4, 9, 30))
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from backend.benchmarks import meal_stream
+from backend.config import settings
+from backend.database.connection import Base
+from backend.database.models import Meal, MealStatus, MealType, User
+from backend.services.statistics.historical_analyzer import HistoricalAnalyzer
+
+def test_streamed_aggregates_match_meal_frame(monkeypatch):
+    # Small pages, so a year spans many of them
+    monkeypatch.setattr(settings, "MEAL_STREAM_CHUNK_SIZE", 500)
+    asyncio.run(meal_stream.run_async(years=(1, 2)))
+
+def test_keyset_pages_split_equal_timestamps(monkeypatch):
+    monkeypatch.setattr(settings, "MEAL_STREAM_CHUNK_SIZE", 3)
+    at = datetime(2024, 5, 6, 12)
+    rows = [
+        {
+            "user_id": 1,
+            "meal_type": MealType.LUNCH,
+            "status": MealStatus.COMPLETED,
+            # Pages end in the middle of runs of identical times
+            "scheduled_time": at + timedelta(days=i // 4),
+            "compliance_score": 0.1 * (i % 10)
+        }
+        for i in range(20)
+    ]
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=[User.__table__, Meal.__table__]))
+            await conn.execute(insert(User.__table__), [{"id": 1, "email": "a@example.com", "hashed_password": "x"}])
+            await conn.execute(insert(Meal.__table__), rows)
+        async with AsyncSession(engine) as db:
+            analyzer = HistoricalAnalyzer(db, None, None, None)
+            user = await db.get(User, 1)
+            aggregates = await analyzer._aggregate_meals(user, at, at + timedelta(days=10))
+            frame = await analyzer._get_meal_frame(user, at, at + timedelta(days=10))
+        await engine.dispose()
+        return aggregates, frame
+
+    aggregates, frame = asyncio.run(run())
+    assert aggregates.meals.sum() == len(rows)
+    assert aggregates.days.sum() == 5
+    meal_stream.check_close(
+        meal_stream.frame_analyses(HistoricalAnalyzer(None, None, None, None), frame),
+        meal_stream.stream_analyses(HistoricalAnalyzer(None, None, None, None), aggregates)
+    )
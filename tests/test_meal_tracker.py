@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from backend.database.connection import Base
+from backend.database.memory_cache import MemoryCache
+from backend.database.models import DailyNutritionRollup, Meal, MealIngestKey, User
+from backend.services.statistics.historical_analyzer import HistoricalAnalyzer
+from backend.services.statistics.meal_tracker import MealTracker
+from backend.services.statistics.user_stats import UserStatsCounters
+
+USER_ID = 1
+TABLES = [User.__table__, Meal.__table__, MealIngestKey.__table__, DailyNutritionRollup.__table__]
+
+BATCH = [
+    {"idempotency_key": "a", "meal_type": "breakfast", "consumed_at": "2024-03-04T08:00:00"},
+    {"idempotency_key": "b", "meal_type": "lunch", "consumed_at": "2024-03-04T13:00:00"},
+    {"idempotency_key": "a", "meal_type": "breakfast", "consumed_at": "2024-03-04T08:05:00"},
+    {"idempotency_key": "c", "meal_type": "dinner", "consumed_at": "2024-03-04T08:00:00"},
+    {"idempotency_key": "d", "meal_type": "brunch", "consumed_at": "2024-03-04T11:00:00"},
+    {"idempotency_key": "e", "meal_type": "snack"}
+]
+
+async def tracker_database():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=TABLES))
+        await conn.execute(insert(User.__table__), [
+            {"id": USER_ID, "email": "user@example.com", "hashed_password": "x", "meal_stats": {}}
+        ])
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+async def counted_meals(session_factory, cache) -> int:
+    async with session_factory() as db:
+        stats = await UserStatsCounters(cache).get_stats(await db.get(User, USER_ID))
+    return stats.get("total_meals", 0)
+
+async def stored_meals(session_factory) -> int:
+    async with session_factory() as db:
+        return await db.scalar(select(func.count(Meal.id)))
+
+def test_bulk_upload_retry_reports_duplicates_without_storing_them():
+    async def scenario():
+        engine, session_factory = await tracker_database()
+        cache = MemoryCache()
+        async with session_factory() as db:
+            first = await MealTracker(db, cache).track_meals_bulk(USER_ID, BATCH)
+        after_first = await stored_meals(session_factory), await counted_meals(session_factory, cache)
+        async with session_factory() as db:
+            retry = await MealTracker(db, cache).track_meals_bulk(USER_ID, BATCH)
+        after_retry = await stored_meals(session_factory), await counted_meals(session_factory, cache)
+        await engine.dispose()
+        return first, after_first, retry, after_retry
+
+    first, after_first, retry, after_retry = asyncio.run(scenario())
+    meal_ids = {entry["idempotency_key"]: entry["meal_id"] for entry in first["tracked"]}
+
+    assert first["success"]
+    assert sorted(meal_ids) == ["a", "b"]
+    # The key repeated within the batch is a duplicate of its first entry
+    assert first["duplicates"] == [{"index": 2, "idempotency_key": "a", "meal_id": meal_ids["a"]}]
+    assert [entry["index"] for entry in first["rejected"]] == [3, 4, 5]
+    assert after_first == (2, 2)
+
+    assert retry["success"]
+    assert retry["tracked"] == []
+    assert retry["duplicates"] == [
+        {"index": index, "idempotency_key": key, "meal_id": meal_ids[key]}
+        for index, key in [(0, "a"), (1, "b"), (2, "a")]
+    ]
+    assert [entry["index"] for entry in retry["rejected"]] == [3, 4, 5]
+    assert after_retry == after_first
+
+def test_bulk_meals_reach_the_analyzer():
+    async def scenario():
+        engine, session_factory = await tracker_database()
+        async with session_factory() as db:
+            await MealTracker(db, MemoryCache()).track_meals_bulk(USER_ID, BATCH)
+        async with session_factory() as db:
+            user = await db.get(User, USER_ID)
+            analyzer = HistoricalAnalyzer(db, None, None, MemoryCache())
+            start, end = datetime(2024, 3, 1), datetime(2024, 3, 8)
+            frame = await analyzer._get_meal_frame(user, start, end)
+            aggregates = await analyzer._aggregate_meals(user, start, end)
+        await engine.dispose()
+        return frame, aggregates
+
+    frame, aggregates = asyncio.run(scenario())
+    assert len(frame) == 2
+    assert aggregates.meals.sum() == 2
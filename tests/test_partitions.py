@@ -0,0 +1,85 @@
+import asyncio
+import importlib
+from datetime import datetime
+import uuid
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.config import settings
+from backend.database.connection import Base, _async_url
+from backend.database.models import User, WatchData
+from backend.database.models.watch_data import DeviceType, WatchDataRaw
+from backend.database.partitions import (
+    default_partition_name, month_filter_sql, month_start, partition_name, run_partition_maintenance
+)
+
+pytestmark = pytest.mark.skipif(
+    not settings.DATABASE_URL.startswith("postgresql"),
+    reason="partitioning needs a PostgreSQL DATABASE_URL"
+)
+
+PARTITION_MIGRATION = "backend.database.migrations.versions.0002_partition_watch_data"
+DEFAULT = default_partition_name("watch_data")
+
+def partition_watch_data(sync_conn) -> None:
+    migration = importlib.import_module(PARTITION_MIGRATION)
+    with Operations.context(MigrationContext.configure(sync_conn)):
+        migration.upgrade()
+
+async def count(conn, table: str, where: str = "true") -> int:
+    return await conn.scalar(text(f"SELECT count(*) FROM {table} WHERE {where}"))
+
+def test_maintenance_moves_default_partition_rows_into_new_months():
+    pytest.importorskip("asyncpg")
+    # A month past the partitions the migration creates, as if maintenance fell behind
+    today = month_start(datetime.utcnow().date(), settings.WATCH_DATA_PARTITIONS_AHEAD + 2)
+    stranded = partition_name("watch_data", today)
+    schema = f"test_partitions_{uuid.uuid4().hex[:8]}"
+
+    async def scenario():
+        admin = create_async_engine(_async_url(settings.DATABASE_URL))
+        async with admin.begin() as conn:
+            await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        engine = create_async_engine(
+            _async_url(settings.DATABASE_URL),
+            connect_args={"server_settings": {"search_path": schema}}
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(lambda sync: Base.metadata.create_all(
+                    sync, tables=[User.__table__, WatchData.__table__, WatchDataRaw.__table__]
+                ))
+                await conn.run_sync(partition_watch_data)
+                await conn.execute(insert(User.__table__), [
+                    {"id": 1, "email": "user@example.com", "hashed_password": "x"}
+                ])
+                await conn.execute(insert(WatchData.__table__), [
+                    {"user_id": 1, "device_type": DeviceType.APPLE_WATCH, "timestamp": timestamp}
+                    for timestamp in [
+                        datetime(today.year, today.month, 2, 8),
+                        datetime(today.year, today.month, 20, 21),
+                        datetime(2000, 1, 1)
+                    ]
+                ])
+                assert await count(conn, DEFAULT) == 3
+
+            assert await run_partition_maintenance(engine, today=today)
+
+            async with engine.connect() as conn:
+                return (
+                    await count(conn, stranded),
+                    await count(conn, DEFAULT, month_filter_sql("watch_data", today)),
+                    await count(conn, DEFAULT),
+                    await conn.scalar(text(
+                        "SELECT pg_get_expr(relpartbound, oid) FROM pg_class WHERE oid = to_regclass(:name)"
+                    ), {"name": DEFAULT})
+                )
+        finally:
+            await engine.dispose()
+            async with admin.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+            await admin.dispose()
+
+    assert asyncio.run(scenario()) == (2, 0, 1, "DEFAULT")
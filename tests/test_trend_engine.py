@@ -0,0 +1,47 @@
+import asyncio
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from backend.benchmarks.trend_engine import (
+    legacy_labels, reference_theil_sen, run_user_base, synthetic_rollups, synthetic_series
+)
+from backend.config import settings
+from backend.services.statistics.historical_analyzer import HistoricalAnalyzer
+from backend.services.statistics.trend_engine import least_squares_slopes, theil_sen_slopes, trend_labels
+from backend.services.statistics.trend_partials import (
+    TREND_SERIES, TrendPartial, series_values, summarize_days, week_numbers
+)
+
+def test_closed_form_labels_match_polyfit():
+    values = synthetic_series(2000, 26)
+    assert trend_labels(least_squares_slopes(values)).tolist() == legacy_labels(values)
+
+def test_theil_sen_matches_pairwise_median():
+    values = synthetic_series(300, 26, seed=5)
+    reference = [reference_theil_sen(row) for row in values]
+    np.testing.assert_allclose(theil_sen_slopes(values), reference, rtol=1e-12, atol=1e-15)
+
+def test_engine_matches_per_user_partials():
+    # run_user_base checks every user's labels against their partials
+    row = asyncio.run(run_user_base(users=30, days=60))
+    assert row["users"] == 30
+
+@pytest.mark.parametrize("method", ["least_squares", "theil_sen"])
+def test_analyzer_labels_follow_trend_method(monkeypatch, method):
+    daily = pd.DataFrame(synthetic_rollups(1, 120, date(2024, 3, 6), seed=2))
+    daily['day'] = pd.to_datetime(daily['day'])
+    weeks = summarize_days(daily)
+    monkeypatch.setattr(settings, "TREND_METHOD", method)
+
+    labels = HistoricalAnalyzer(None, None, None, None)._trend_labels(weeks, TrendPartial.of_summary(weeks))
+    values = series_values(weeks)[list(TREND_SERIES)].to_numpy().T
+    if method == "least_squares":
+        expected = legacy_labels(values)
+    else:
+        x = week_numbers(weeks.index)
+        expected = trend_labels([
+            reference_theil_sen(pd.Series(row, index=x).reindex(range(x[0], x[-1] + 1)).to_numpy())
+            for row in values
+        ]).tolist()
+    assert labels == dict(zip(TREND_SERIES, expected))
@@ -0,0 +1,20 @@
+import asyncio
+import numpy as np
+from backend.benchmarks.trend_partials import run_async
+from backend.services.statistics.trend_partials import TREND_SERIES, TrendPartial
+
+def test_sliding_windows_match_batch_recompute():
+    # run_async checks every window, and the last one again after an invalidation
+    row = asyncio.run(run_async(history_days=400, window_weeks=8, shifts=10))
+    assert row["partial_days"] < row["batch_days"]
+
+def test_partials_of_disjoint_weeks_add():
+    rng = np.random.default_rng(4)
+    values = rng.uniform(0, 1, (12, len(TREND_SERIES)))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    weeks = np.arange(100, 112)
+
+    whole = TrendPartial.of_weeks(weeks, values)
+    halves = TrendPartial.of_weeks(weeks[:5], values[:5]) + TrendPartial.of_weeks(weeks[5:], values[5:])
+    np.testing.assert_allclose(halves.slopes(), whole.slopes(), rtol=1e-9)
+    np.testing.assert_allclose(halves.consistency(), whole.consistency(), rtol=1e-9)
@@ -0,0 +1,96 @@
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from backend.database.connection import Base
+from backend.database.memory_cache import MemoryCache
+from backend.database.models import User
+from backend.services.statistics.user_stats import UserStatsCounters, compliance_deltas
+
+USERS = (1, 2, 3)
+
+async def user_database():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=[User.__table__]))
+        await conn.execute(insert(User.__table__), [
+            {"id": user_id, "email": f"user{user_id}@example.com", "hashed_password": "x", "meal_stats": {}}
+            for user_id in USERS
+        ])
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+async def record_meals(counters: UserStatsCounters, meals: int) -> None:
+    for _ in range(meals):
+        for user_id in USERS:
+            await counters.record(user_id, compliance_deltas({"is_compliant": True, "score": 0.5}))
+
+async def stored_totals(session_factory):
+    async with session_factory() as db:
+        return {user_id: (await db.get(User, user_id)).meal_stats.get("total_meals", 0) for user_id in USERS}
+
+def slow_commits(session_factory):
+    """A session factory whose commits wait first, to hold a flush mid-transaction"""
+    @asynccontextmanager
+    async def factory():
+        async with session_factory() as db:
+            commit = db.commit
+            async def slow_commit():
+                await asyncio.sleep(0.05)
+                await commit()
+            db.commit = slow_commit
+            yield db
+    return factory
+
+def test_concurrent_flushes_count_every_meal_once():
+    async def scenario():
+        engine, session_factory = await user_database()
+        counters = UserStatsCounters(MemoryCache())
+        await record_meals(counters, 3)
+
+        first = asyncio.ensure_future(counters.flush(slow_commits(session_factory), batch_size=10))
+        await asyncio.sleep(0.01)
+        # New meals re-dirty the users while another worker flushes
+        await record_meals(counters, 2)
+        await counters.flush(session_factory, batch_size=10)
+        await first
+        await counters.flush(session_factory, batch_size=10)
+        totals = await stored_totals(session_factory)
+        await engine.dispose()
+        return totals
+
+    assert asyncio.run(scenario()) == dict.fromkeys(USERS, 5)
+
+@pytest.mark.parametrize("failure", ["raises", "returns_false"])
+def test_flush_failing_after_commit_is_not_applied_twice(failure):
+    async def scenario():
+        engine, session_factory = await user_database()
+        cache = MemoryCache()
+        counters = UserStatsCounters(cache)
+        await record_meals(counters, 2)
+
+        delete_many = cache.delete_many
+        async def failing_delete_many(keys):
+            cache.delete_many = delete_many
+            if failure == "raises":
+                raise RuntimeError("worker died before deleting the claimed counters")
+            return False
+        cache.delete_many = failing_delete_many
+
+        if failure == "raises":
+            with pytest.raises(RuntimeError):
+                await counters.flush(session_factory, batch_size=10)
+        else:
+            await counters.flush(session_factory, batch_size=10)
+
+        async with session_factory() as db:
+            shown = (await counters.get_stats(await db.get(User, 1)))["total_meals"]
+        await record_meals(counters, 1)
+        await counters.flush(session_factory, batch_size=10)
+        await counters.flush(session_factory, batch_size=10)
+        totals = await stored_totals(session_factory)
+        await engine.dispose()
+        return shown, totals
+
+    assert asyncio.run(scenario()) == (2, dict.fromkeys(USERS, 3))